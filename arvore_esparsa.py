@@ -0,0 +1,292 @@
+# arvore_esparsa.py
+# Árvore de Merkle esparsa para estado chave -> valor (ex.: saldos): o caminho de cada chave são os
+# 256 bits do SHA-256 dela, subárvores vazias usam hashes padrão pré-calculados e só os nós
+# não vazios ficam guardados. Uma subárvore com uma folha só é representada pela própria folha
+# (no nível mais alto possível), então cada atualização custa O(log n) hashes e não 256
+import os
+import sys
+import csv
+import time
+import random
+import hashlib
+
+PROFUNDIDADE = 256
+PREFIXO_FOLHA = b'\x00'  # separação de domínio entre folha e nó interno
+PREFIXO_NO = b'\x01'
+TAMANHO_HASH = 32
+
+
+def _h(dados):
+    return hashlib.sha256(dados).digest()
+
+
+# PADRAO[d] = hash de uma subárvore vazia cuja raiz está na profundidade d (PADRAO[256] = folha vazia)
+PADRAO = [b'\x00' * TAMANHO_HASH] * (PROFUNDIDADE + 1)
+for _d in range(PROFUNDIDADE - 1, -1, -1):
+    PADRAO[_d] = _h(PREFIXO_NO + PADRAO[_d + 1] + PADRAO[_d + 1])
+
+
+def chave_caminho(chave):
+    """Os 256 bits do caminho de uma chave (str ou bytes)"""
+    if isinstance(chave, str):
+        chave = chave.encode('utf-8')
+    return _h(chave)
+
+
+def hash_valor(valor):
+    if isinstance(valor, str):
+        valor = valor.encode('utf-8')
+    return _h(valor)
+
+
+def hash_folha(caminho, valor_hash):
+    return _h(PREFIXO_FOLHA + caminho + valor_hash)
+
+
+def _bit(k, profundidade):
+    # bit do caminho que escolhe o filho na profundidade dada (0 = esquerda)
+    return (k >> (PROFUNDIDADE - 1 - profundidade)) & 1
+
+
+def _hash_no(no, profundidade):
+    # nó guardado: bytes (interno) ou tupla (hash da folha, caminho, valor); ausente = vazio
+    if no is None:
+        return PADRAO[profundidade]
+    return no[0] if isinstance(no, tuple) else no
+
+
+class Arvore_esparsa:
+    def __init__(self):
+        # só os nós não vazios, numerados como heap: raiz = 1, filhos de i = 2i e 2i+1
+        self.nos = {}
+        self.num_chaves = 0
+        self.hashes_calculados = 0
+
+    @property
+    def raiz(self):
+        return _hash_no(self.nos.get(1), 0)
+
+    def obter(self, chave):
+        """Valor da chave, ou None se não existir"""
+        caminho = chave_caminho(chave)
+        k = int.from_bytes(caminho, 'big')
+        no_id, profundidade = 1, 0
+        while True:
+            no = self.nos.get(no_id)
+            if no is None:
+                return None
+            if isinstance(no, tuple):
+                return no[2] if no[1] == caminho else None
+            no_id = 2 * no_id + _bit(k, profundidade)
+            profundidade += 1
+
+    def atualizar_lote(self, alteracoes):
+        """Aplica {chave: valor} (valor None remove a chave). Cada ancestral comum é recalculado uma vez"""
+        itens = {}
+        for chave, valor in alteracoes.items():
+            caminho = chave_caminho(chave)
+            itens[int.from_bytes(caminho, 'big')] = None if valor is None else (caminho, valor)
+        if itens:
+            self._atualizar(1, 0, itens)
+        return self.raiz
+
+    def atualizar(self, chave, valor):
+        return self.atualizar_lote({chave: valor})
+
+    def remover(self, chave):
+        return self.atualizar_lote({chave: None})
+
+    def _atualizar(self, no_id, profundidade, itens):
+        # itens: {caminho como inteiro: (caminho, valor) ou None}, todos dentro desta subárvore.
+        # Devolve o nó que ficou nesta posição (ou None se a subárvore ficou vazia)
+        atual = self.nos.pop(no_id, None)
+        if isinstance(atual, tuple):
+            # a folha que estava aqui desce junto com as alterações (a não ser que seja alterada)
+            k_folha = int.from_bytes(atual[1], 'big')
+            if k_folha not in itens:
+                itens[k_folha] = atual
+            else:
+                self.num_chaves -= 1
+            atual = None
+
+        if atual is None:
+            vivos = {k: v for k, v in itens.items() if v is not None}
+            if not vivos:
+                return None
+            if len(vivos) == 1:
+                (item,) = vivos.values()
+                if len(item) == 3:
+                    folha = item  # folha existente só mudou de lugar
+                else:
+                    caminho, valor = item
+                    folha = (hash_folha(caminho, hash_valor(valor)), caminho, valor)
+                    self.hashes_calculados += 2
+                    self.num_chaves += 1
+                self.nos[no_id] = folha
+                return folha
+            itens = vivos
+
+        esquerda, direita = {}, {}
+        for k, item in itens.items():
+            (direita if _bit(k, profundidade) else esquerda)[k] = item
+
+        filho_esq, filho_dir = 2 * no_id, 2 * no_id + 1
+        esq = self._atualizar(filho_esq, profundidade + 1, esquerda) if esquerda else self.nos.get(filho_esq)
+        dir = self._atualizar(filho_dir, profundidade + 1, direita) if direita else self.nos.get(filho_dir)
+
+        if esq is None and dir is None:
+            return None
+        # uma folha sozinha sobe para esta posição
+        if dir is None and isinstance(esq, tuple):
+            del self.nos[filho_esq]
+            self.nos[no_id] = esq
+            return esq
+        if esq is None and isinstance(dir, tuple):
+            del self.nos[filho_dir]
+            self.nos[no_id] = dir
+            return dir
+
+        novo = _h(PREFIXO_NO + _hash_no(esq, profundidade + 1) + _hash_no(dir, profundidade + 1))
+        self.hashes_calculados += 1
+        self.nos[no_id] = novo
+        return novo
+
+    def gerar_prova(self, chave):
+        """Prova comprimida de inclusão (se a chave existe) ou de exclusão:
+        (profundidade, mapa de bits dos irmãos não padrão, irmãos não padrão, folha encontrada).
+        folha encontrada é None (subárvore vazia) ou (caminho, hash do valor) da folha que ocupa o lugar"""
+        caminho = chave_caminho(chave)
+        k = int.from_bytes(caminho, 'big')
+        no_id, profundidade = 1, 0
+        mapa = 0
+        irmaos = []
+        while True:
+            no = self.nos.get(no_id)
+            if no is None:
+                return profundidade, mapa, irmaos, None
+            if isinstance(no, tuple):
+                return profundidade, mapa, irmaos, (no[1], hash_valor(no[2]))
+            bit = _bit(k, profundidade)
+            irmao = self.nos.get(2 * no_id + (1 - bit))
+            if irmao is not None:
+                mapa |= 1 << profundidade
+                irmaos.append(_hash_no(irmao, profundidade + 1))
+            no_id = 2 * no_id + bit
+            profundidade += 1
+
+
+def verificar_prova(raiz, chave, valor, prova):
+    """Inclusão: valor é o valor esperado. Exclusão: valor None (a chave não pode existir)"""
+    profundidade, mapa, irmaos, folha = prova
+    caminho = chave_caminho(chave)
+    k = int.from_bytes(caminho, 'big')
+
+    if valor is not None:
+        if folha is None or folha[0] != caminho or folha[1] != hash_valor(valor):
+            return False
+        atual = hash_folha(caminho, folha[1])
+    elif folha is None:
+        atual = PADRAO[profundidade]
+    else:
+        # outra chave ocupa o lugar: tem que ter o mesmo prefixo e ser diferente
+        outra = int.from_bytes(folha[0], 'big')
+        if outra == k or (outra >> (PROFUNDIDADE - profundidade)) != (k >> (PROFUNDIDADE - profundidade)):
+            return False
+        atual = hash_folha(folha[0], folha[1])
+
+    if bin(mapa).count('1') != len(irmaos) or mapa >> profundidade:
+        return False
+    proximo = len(irmaos) - 1
+    for d in range(profundidade - 1, -1, -1):
+        if (mapa >> d) & 1:
+            irmao = irmaos[proximo]
+            proximo -= 1
+        else:
+            irmao = PADRAO[d + 1]
+        if _bit(k, d):
+            atual = _h(PREFIXO_NO + irmao + atual)
+        else:
+            atual = _h(PREFIXO_NO + atual + irmao)
+    return atual == raiz
+
+
+def tamanho_prova_bytes(prova):
+    """Bytes da prova serializada: profundidade (2), mapa de bits (32), irmãos e a folha (1 + 64)"""
+    _, _, irmaos, folha = prova
+    return 2 + 32 + TAMANHO_HASH * len(irmaos) + 1 + (2 * TAMANHO_HASH if folha is not None else 0)
+
+
+def benchmark_arvore_esparsa(tamanhos=(10**5, 10**6, 10**7), tamanho_lote=10000, num_provas=1000,
+                             prefixo_saida="resultados"):
+    """Vazão de atualização (em lote e uma a uma), latência e tamanho das provas para cada número de chaves"""
+    print(f"{'='*70}")
+    print("BENCHMARK: ÁRVORE DE MERKLE ESPARSA")
+    print(f"{'='*70}")
+
+    linhas = []
+    for n in tamanhos:
+        arvore = Arvore_esparsa()
+        inicio = time.perf_counter()
+        for base in range(0, n, tamanho_lote):
+            arvore.atualizar_lote({f"conta-{i}": str(i) for i in range(base, min(base + tamanho_lote, n))})
+        tempo_carga = time.perf_counter() - inicio
+
+        # lote de alterações em chaves existentes e a mesma quantidade de alterações uma a uma
+        escolhidas = random.sample(range(n), min(tamanho_lote, n))
+        inicio = time.perf_counter()
+        arvore.atualizar_lote({f"conta-{i}": str(i + 1) for i in escolhidas})
+        tempo_lote = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        for i in escolhidas[:1000]:
+            arvore.atualizar(f"conta-{i}", str(i + 2))
+        tempo_individual = (time.perf_counter() - inicio) / min(1000, len(escolhidas))
+
+        # provas de inclusão (chaves existentes) e exclusão (chaves novas)
+        tempos_prova, tempos_verificacao, tamanhos_prova = [], [], []
+        raiz = arvore.raiz
+        validas = 0
+        for j in range(num_provas):
+            if j % 2 == 0:
+                i = random.randrange(n)
+                chave, valor = f"conta-{i}", arvore.obter(f"conta-{i}")
+            else:
+                chave, valor = f"ausente-{j}", None
+            inicio = time.perf_counter()
+            prova = arvore.gerar_prova(chave)
+            tempos_prova.append(time.perf_counter() - inicio)
+            inicio = time.perf_counter()
+            validas += verificar_prova(raiz, chave, valor, prova)
+            tempos_verificacao.append(time.perf_counter() - inicio)
+            tamanhos_prova.append(tamanho_prova_bytes(prova))
+
+        taxa_carga = n / tempo_carga
+        taxa_lote = len(escolhidas) / tempo_lote
+        prova_media_us = sum(tempos_prova) / len(tempos_prova) * 1e6
+        verificacao_media_us = sum(tempos_verificacao) / len(tempos_verificacao) * 1e6
+        tamanho_medio = sum(tamanhos_prova) / len(tamanhos_prova)
+        print(f"  {n:>10,} chaves: carga {taxa_carga:,.0f}/s, lote de {len(escolhidas):,} {taxa_lote:,.0f}/s, "
+              f"uma a uma {1 / tempo_individual:,.0f}/s")
+        print(f"  {'':>17} prova {prova_media_us:.1f} µs, verificação {verificacao_media_us:.1f} µs, "
+              f"{tamanho_medio:.0f} bytes (sem compressão: {PROFUNDIDADE * TAMANHO_HASH:,}), "
+              f"válidas {validas}/{num_provas}, {len(arvore.nos):,} nós guardados")
+        linhas.append([n, round(taxa_carga, 1), round(taxa_lote, 1), round(1 / tempo_individual, 1),
+                       round(prova_media_us, 2), round(verificacao_media_us, 2), round(tamanho_medio, 1),
+                       len(arvore.nos), validas])
+        del arvore
+
+    os.makedirs(prefixo_saida, exist_ok=True)
+    nome_csv = f"{prefixo_saida}/benchmark_arvore_esparsa.csv"
+    with open(nome_csv, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['num_chaves', 'atualizacoes_por_segundo_carga', 'atualizacoes_por_segundo_lote',
+                         'atualizacoes_por_segundo_individual', 'tempo_prova_us', 'tempo_verificacao_us',
+                         'bytes_prova', 'nos_guardados', 'provas_validas'])
+        writer.writerows(linhas)
+    print(f"\n✓ Resultados salvos em: {nome_csv}")
+
+
+if __name__ == "__main__":
+    # python3 arvore_esparsa.py [maior número de chaves]
+    maximo = int(sys.argv[1]) if len(sys.argv) > 1 else 10**7
+    benchmark_arvore_esparsa(tuple(n for n in (10**5, 10**6, 10**7) if n <= maximo))
@@ -0,0 +1,301 @@
+# auditoria.py
+# Auditoria de integridade da árvore inteira: recalcula cada nó interno a partir dos filhos e
+# compara com o hash guardado. A árvore é dividida em subárvores (faixas de um nível de corte),
+# cada processo audita as suas direto do snapshot (mmap) ou da memória compartilhada, sem copiar
+# os níveis, e o processo principal termina os poucos níveis acima do corte e confirma a raiz
+import os
+import sys
+import csv
+import mmap
+import time
+import struct
+import random
+import hashlib
+import multiprocessing
+from multiprocessing import shared_memory, util
+
+TAMANHO_HASH = 32
+LIMITE_ERROS = 10  # posições corrompidas guardadas por faixa (o total é contado inteiro)
+FAIXAS_POR_TRABALHADOR = 4
+TAMANHO_PEDACO = 65536  # nós pais lidos de uma vez do buffer
+
+
+def ler_num_niveis_aridade(campo):
+    # mesmo campo do exportar_niveis: número de níveis nos 16 bits baixos, aridade nos altos (0 = binária)
+    return campo & 0xFFFF, (campo >> 16) or 2
+
+
+def ler_cabecalho_snapshot(buffer):
+    """Tamanhos dos níveis, onde começa o primeiro hash e a aridade, no formato do exportar_niveis"""
+    num_niveis, aridade = ler_num_niveis_aridade(struct.unpack_from('<I', buffer, 0)[0])
+    tamanhos = list(struct.unpack_from(f'<{num_niveis}Q', buffer, 4))
+    return tamanhos, 4 + 8 * num_niveis, aridade
+
+
+def inicios_dos_niveis(tamanhos, base=0):
+    inicios = []
+    for tamanho in tamanhos:
+        inicios.append(base)
+        base += tamanho * TAMANHO_HASH
+    return inicios
+
+
+def auditar_faixa(buffer, inicios, tamanhos, aridade, nivel_corte, primeiro, ultimo, nivel_minimo=1):
+    """Confere os nós internos dos níveis nivel_minimo..nivel_corte que ficam abaixo dos nós
+    [primeiro, ultimo) do nível de corte. Devolve (nós verificados, primeiras posições erradas, total de erros)"""
+    sha256 = hashlib.sha256
+    verificados = 0
+    erros = []
+    num_erros = 0
+    largura = 2 * TAMANHO_HASH * aridade  # caracteres hex de um grupo completo de filhos
+    for nivel in range(nivel_minimo, nivel_corte + 1):
+        escala = aridade ** (nivel_corte - nivel)
+        inicio, fim = primeiro * escala, min(ultimo * escala, tamanhos[nivel])
+        base_filhos, base_pais = inicios[nivel - 1], inicios[nivel]
+        num_filhos = tamanhos[nivel - 1]
+        # em pedaços: um .hex() por pedaço de filhos em vez de um por nó
+        for pedaco in range(inicio, fim, TAMANHO_PEDACO):
+            fim_pedaco = min(pedaco + TAMANHO_PEDACO, fim)
+            a = base_filhos + pedaco * aridade * TAMANHO_HASH
+            b = base_filhos + min(fim_pedaco * aridade, num_filhos) * TAMANHO_HASH
+            filhos = buffer[a:b].hex()
+            pais = bytes(buffer[base_pais + pedaco * TAMANHO_HASH:base_pais + fim_pedaco * TAMANHO_HASH])
+            for j in range(fim_pedaco - pedaco):
+                # mesma regra do hash_pai / hash_grupo: hex dos filhos concatenado, SHA-256 duplo,
+                # grupo incompleto repete o último filho
+                grupo = filhos[j * largura:(j + 1) * largura]
+                if len(grupo) < largura:
+                    grupo += grupo[-2 * TAMANHO_HASH:] * ((largura - len(grupo)) // (2 * TAMANHO_HASH))
+                calculado = sha256(sha256(grupo.encode()).hexdigest().encode()).digest()
+                if pais[j * TAMANHO_HASH:(j + 1) * TAMANHO_HASH] != calculado:
+                    num_erros += 1
+                    if len(erros) < LIMITE_ERROS:
+                        erros.append((nivel, pedaco + j))
+        verificados += max(0, fim - inicio)
+    return verificados, erros, num_erros
+
+
+def escolher_corte(tamanhos, num_faixas):
+    """Nível mais alto que ainda tem pelo menos num_faixas nós (menos trabalho sequencial no fim)"""
+    corte = 1
+    for nivel in range(1, len(tamanhos)):
+        if tamanhos[nivel] >= num_faixas:
+            corte = nivel
+    return corte
+
+
+# fonte aberta no processo trabalhador: (buffer, função que fecha)
+_fonte_trabalhador = None
+
+def abrir_fonte(fonte):
+    """('arquivo', snapshot) via mmap ou ('memoria', nome do segmento). Devolve (buffer, fechar)"""
+    tipo, nome = fonte
+    if tipo == 'arquivo':
+        arquivo = open(nome, 'rb')
+        mapa = mmap.mmap(arquivo.fileno(), 0, access=mmap.ACCESS_READ)
+        buffer = memoryview(mapa)
+
+        def fechar():
+            buffer.release()
+            mapa.close()
+            arquivo.close()
+    else:
+        segmento = shared_memory.SharedMemory(name=nome)
+        buffer = segmento.buf.toreadonly()
+
+        def fechar():
+            buffer.release()
+            segmento.close()
+    return buffer, fechar
+
+def _abrir_fonte_trabalhador(fonte):
+    global _fonte_trabalhador
+    _fonte_trabalhador = abrir_fonte(fonte)
+    util.Finalize(None, _fonte_trabalhador[1], exitpriority=10)
+
+def _auditar_faixa_trabalhador(argumentos):
+    return auditar_faixa(_fonte_trabalhador[0], *argumentos)
+
+
+def auditar_fonte(fonte, tamanhos, base, num_trabalhadores=None, aridade=2, raiz_esperada=None):
+    """Audita os níveis guardados na fonte. Devolve um dicionário com o relatório"""
+    num_trabalhadores = num_trabalhadores or os.cpu_count() or 1
+    inicios = inicios_dos_niveis(tamanhos, base)
+    inicio_tempo = time.perf_counter()
+
+    # estrutura: cada nível tem ceil(n / aridade) nós e o último tem só a raiz
+    estrutura_ok = bool(tamanhos) and tamanhos[-1] == 1 and all(
+        tamanhos[i + 1] == -(-tamanhos[i] // aridade) for i in range(len(tamanhos) - 1))
+    verificados, erros, num_erros = 0, [], 0
+    buffer, fechar = abrir_fonte(fonte)
+    try:
+        raiz = buffer[inicios[-1]:inicios[-1] + TAMANHO_HASH].hex() if tamanhos else None
+        if estrutura_ok and len(tamanhos) > 1:
+            num_faixas = num_trabalhadores * FAIXAS_POR_TRABALHADOR
+            corte = escolher_corte(tamanhos, num_faixas)
+            passo = -(-tamanhos[corte] // num_faixas)
+            faixas = [(inicios, tamanhos, aridade, corte, a, min(a + passo, tamanhos[corte]))
+                      for a in range(0, tamanhos[corte], passo)]
+            if num_trabalhadores > 1:
+                contexto = multiprocessing.get_context("spawn")
+                with contexto.Pool(num_trabalhadores, initializer=_abrir_fonte_trabalhador, initargs=(fonte,)) as pool:
+                    resultados = pool.map(_auditar_faixa_trabalhador, faixas)
+            else:
+                resultados = [auditar_faixa(buffer, *faixa) for faixa in faixas]
+            # os níveis acima do corte têm poucos nós: ficam no processo principal
+            resultados.append(auditar_faixa(buffer, inicios, tamanhos, aridade, len(tamanhos) - 1, 0, 1, corte + 1))
+            for v, e, n in resultados:
+                verificados += v
+                erros.extend(e)
+                num_erros += n
+    finally:
+        fechar()
+
+    tempo = time.perf_counter() - inicio_tempo
+    erros.sort()
+    return {
+        'estrutura_ok': estrutura_ok,
+        'nos_verificados': verificados,
+        'num_erros': num_erros,
+        'primeiros_erros': erros[:LIMITE_ERROS],
+        'raiz': raiz,
+        'raiz_confirmada': estrutura_ok and num_erros == 0 and (raiz_esperada is None or raiz == raiz_esperada),
+        'tempo_seg': tempo,
+        'nos_por_segundo': verificados / tempo if tempo > 0 else 0,
+        'num_trabalhadores': num_trabalhadores,
+    }
+
+
+def auditar_snapshot(nome_arquivo, num_trabalhadores=None, aridade=None, raiz_esperada=None):
+    """Audita um snapshot gravado pelo exportar_niveis (ou --salvar-snapshot) sem carregá-lo na memória.
+    Sem aridade, usa a gravada no cabeçalho"""
+    with open(nome_arquivo, 'rb') as f:
+        cabecalho = f.read(4)
+        num_niveis, _ = ler_num_niveis_aridade(struct.unpack('<I', cabecalho)[0])
+        tamanhos, base, aridade_snapshot = ler_cabecalho_snapshot(cabecalho + f.read(8 * num_niveis))
+    aridade = aridade or aridade_snapshot
+    return auditar_fonte(('arquivo', nome_arquivo), tamanhos, base, num_trabalhadores, aridade, raiz_esperada)
+
+
+def auditar_niveis(niveis, num_trabalhadores=None, aridade=2, raiz_esperada=None):
+    """Audita níveis em memória: publica em memória compartilhada (memoria_compartilhada.py) e audita lá"""
+    from memoria_compartilhada import publicar_niveis
+    segmentos, descritor = publicar_niveis(niveis, aridade)
+    try:
+        return auditar_fonte(('memoria', descritor['niveis']), descritor['tamanhos'], 0,
+                             num_trabalhadores, aridade, raiz_esperada)
+    finally:
+        for segmento in segmentos:
+            segmento.close()
+            segmento.unlink()
+
+
+def auditar_arvore(arvore, num_trabalhadores=None):
+    """Audita uma Merkle_tree construída (os hashes guardados nos objetos No)"""
+    return auditar_niveis(arvore.niveis(), num_trabalhadores, arvore.aridade, arvore.raiz.hash if arvore.raiz else None)
+
+
+def mostrar_relatorio(relatorio):
+    print(f"  Estrutura dos níveis: {'ok' if relatorio['estrutura_ok'] else 'INVÁLIDA'}")
+    print(f"  Nós internos verificados: {relatorio['nos_verificados']:,} em {relatorio['tempo_seg']:.2f} s "
+          f"({relatorio['nos_por_segundo']:,.0f} nós/segundo, {relatorio['num_trabalhadores']} processos)")
+    if relatorio['num_erros']:
+        print(f"  ✗ {relatorio['num_erros']:,} nós corrompidos; primeiros (nível, posição): {relatorio['primeiros_erros']}")
+    print(f"  Raiz: {relatorio['raiz'][:32] if relatorio['raiz'] else 'N/A'}... "
+          f"{'✓ confirmada' if relatorio['raiz_confirmada'] else '✗ NÃO confirmada'}")
+
+
+def gravar_snapshot_sintetico(nome_arquivo, num_folhas, semente=0, aridade=2):
+    """Snapshot de num_folhas folhas aleatórias com os níveis calculados, no formato do exportar_niveis
+    (o conteúdo das folhas não importa para a auditoria, só os nós internos)"""
+    sha256 = hashlib.sha256
+    rng = random.Random(semente)
+    # randbytes tem limite de tamanho: folhas geradas em blocos
+    nivel = b''.join(rng.randbytes(min(2**20, num_folhas - i) * TAMANHO_HASH) for i in range(0, num_folhas, 2**20))
+    niveis = [nivel]
+    while len(nivel) > TAMANHO_HASH:
+        proximo = bytearray()
+        n = len(nivel) // TAMANHO_HASH
+        for i in range(0, n, aridade):
+            filhos = nivel[i * TAMANHO_HASH:min(i + aridade, n) * TAMANHO_HASH].hex()
+            filhos += filhos[-2 * TAMANHO_HASH:] * (aridade - min(aridade, n - i))
+            proximo += sha256(sha256(filhos.encode()).hexdigest().encode()).digest()
+        nivel = bytes(proximo)
+        niveis.append(nivel)
+    with open(nome_arquivo, 'wb') as f:
+        f.write(struct.pack('<I', len(niveis) | (aridade << 16)))
+        f.write(struct.pack(f'<{len(niveis)}Q', *[len(n) // TAMANHO_HASH for n in niveis]))
+        for n in niveis:
+            f.write(n)
+    return niveis[-1].hex()
+
+
+def corromper_snapshot(nome_arquivo, posicoes):
+    """Inverte um bit do hash em cada (nível, posição), para o benchmark mostrar a detecção"""
+    with open(nome_arquivo, 'r+b') as f:
+        cabecalho = f.read(4)
+        num_niveis, _ = ler_num_niveis_aridade(struct.unpack('<I', cabecalho)[0])
+        tamanhos, base, _ = ler_cabecalho_snapshot(cabecalho + f.read(8 * num_niveis))
+        inicios = inicios_dos_niveis(tamanhos, base)
+        for nivel, posicao in posicoes:
+            f.seek(inicios[nivel] + posicao * TAMANHO_HASH)
+            byte = f.read(1)[0]
+            f.seek(-1, os.SEEK_CUR)
+            f.write(bytes([byte ^ 1]))
+
+
+def benchmark_auditoria(num_folhas=10**6, trabalhadores=(1, 2, 4), prefixo_saida="resultados"):
+    """Audita um snapshot sintético íntegro e depois corrompido, com 1..p processos"""
+    print(f"{'='*70}")
+    print(f"BENCHMARK: AUDITORIA DE INTEGRIDADE ({num_folhas:,} folhas)")
+    print(f"{'='*70}")
+
+    os.makedirs(prefixo_saida, exist_ok=True)
+    nome_snapshot = f"{prefixo_saida}/auditoria_{num_folhas}.niveis"
+    inicio = time.perf_counter()
+    raiz = gravar_snapshot_sintetico(nome_snapshot, num_folhas)
+    print(f"Snapshot sintético gravado em {time.perf_counter() - inicio:.1f} s: {nome_snapshot} "
+          f"({os.path.getsize(nome_snapshot) / 2**20:,.0f} MiB)")
+
+    linhas = []
+    for corrompido in (False, True):
+        if corrompido:
+            # uma folha não conta (é o dado), então corrompe nós internos em três níveis
+            corromper_snapshot(nome_snapshot, [(1, num_folhas // 7 // 2), (2, num_folhas // 3 // 4), (5, 1)])
+            print("\nCorrompidos 3 nós internos (níveis 1, 2 e 5)")
+        for num_trabalhadores in trabalhadores:
+            print(f"\nAuditoria com {num_trabalhadores} processos:")
+            relatorio = auditar_snapshot(nome_snapshot, num_trabalhadores, raiz_esperada=raiz)
+            mostrar_relatorio(relatorio)
+            linhas.append([num_folhas, num_trabalhadores, int(corrompido), relatorio['nos_verificados'],
+                           round(relatorio['tempo_seg'], 3), round(relatorio['nos_por_segundo'], 1),
+                           relatorio['num_erros'], int(relatorio['raiz_confirmada'])])
+    os.remove(nome_snapshot)
+
+    nome_csv = f"{prefixo_saida}/benchmark_auditoria.csv"
+    with open(nome_csv, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['num_folhas', 'num_trabalhadores', 'corrompido', 'nos_verificados', 'tempo_seg',
+                         'nos_por_segundo', 'num_erros', 'raiz_confirmada'])
+        writer.writerows(linhas)
+    print(f"\n✓ Resultados salvos em: {nome_csv}")
+
+
+if __name__ == "__main__":
+    # auditoria.py <snapshot> [processos] [aridade] [raiz]  ou  auditoria.py --benchmark [folhas] [processos...]
+    if len(sys.argv) > 1 and sys.argv[1] != "--benchmark":
+        nome_arquivo = sys.argv[1]
+        if not os.path.exists(nome_arquivo):
+            print(f"ERRO: Arquivo '{nome_arquivo}' não encontrado!")
+            sys.exit(2)
+        print(f"{'='*70}")
+        print(f"AUDITORIA DE INTEGRIDADE: {nome_arquivo}")
+        print(f"{'='*70}")
+        relatorio = auditar_snapshot(nome_arquivo,
+                                     int(sys.argv[2]) if len(sys.argv) > 2 else None,
+                                     int(sys.argv[3]) if len(sys.argv) > 3 else None,
+                                     sys.argv[4] if len(sys.argv) > 4 else None)
+        mostrar_relatorio(relatorio)
+        sys.exit(0 if relatorio['raiz_confirmada'] else 1)
+    benchmark_auditoria(int(sys.argv[2]) if len(sys.argv) > 2 else 10**6,
+                        tuple(int(p) for p in sys.argv[3:]) or (1, 2, 4))
@@ -0,0 +1,182 @@
+# banco_resultados.py
+# Banco único de resultados (SQLite da biblioteca padrão) no lugar de um CSV por tamanho:
+# tabela de configurações, tabela de execuções e o histograma dos tempos de busca de cada execução
+import os
+import json
+import sqlite3
+
+CAMINHO_BANCO = "resultados/resultados.db"
+
+# colunas de configuração (o que define "o mesmo experimento"); novas colunas entram aqui
+COLUNAS_CONFIGURACAO = ['nome_arquivo', 'num_transacoes', 'num_threads', 'representacao', 'cache_folhas', 'executor',
+                        'aridade', 'compressao']
+
+# valor de cada coluna de configuração em execuções gravadas antes de a coluna existir
+PADROES_CONFIGURACAO = {'representacao': 'str', 'cache_folhas': 'desligado', 'executor': 'threads', 'aridade': 2,
+                        'compressao': 'nenhuma'}
+
+# configuração de referência da análise principal (resumo, tabela, gráficos O(n)): sem ela a "última
+# execução" de cada n seria a do último experimento da matriz, qualquer que fosse o executor, a aridade
+# ou os trabalhadores, e as construções sintéticas em fluxo entrariam junto
+CONFIGURACAO_BASE = {'executor': 'threads', 'representacao': 'str', 'aridade': 2, 'num_threads': 4,
+                     'compressao': 'nenhuma'}
+
+# métricas que as consultas leem direto: garantidas também em bancos gravados antes de existirem
+COLUNAS_METRICAS_CONSULTADAS = ['tempo_construcao_seg', 'tamanho_prova_bytes', 'tempo_verificacao_prova_us']
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS configuracoes (
+    id INTEGER PRIMARY KEY,
+    chave TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS execucoes (
+    id INTEGER PRIMARY KEY,
+    configuracao_id INTEGER NOT NULL REFERENCES configuracoes(id),
+    data_execucao TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS amostras_busca (
+    execucao_id INTEGER NOT NULL REFERENCES execucoes(id),
+    numero_busca INTEGER NOT NULL,
+    tempo_busca_ms REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS histograma_busca (
+    execucao_id INTEGER NOT NULL REFERENCES execucoes(id),
+    limite_inferior_ns INTEGER NOT NULL,
+    limite_superior_ns INTEGER NOT NULL,
+    contagem INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_execucoes_configuracao ON execucoes(configuracao_id);
+CREATE INDEX IF NOT EXISTS idx_execucoes_data ON execucoes(data_execucao);
+CREATE INDEX IF NOT EXISTS idx_amostras_execucao ON amostras_busca(execucao_id);
+CREATE INDEX IF NOT EXISTS idx_histograma_execucao ON histograma_busca(execucao_id);
+"""
+
+
+def _garantir_colunas(conexao, tabela, colunas):
+    # o esquema cresce junto com as estatísticas: coluna nova vira ALTER TABLE ADD COLUMN
+    existentes = {linha[1] for linha in conexao.execute(f"PRAGMA table_info({tabela})")}
+    for coluna in colunas:
+        if coluna not in existentes:
+            conexao.execute(f'ALTER TABLE {tabela} ADD COLUMN "{coluna}"')
+
+
+def abrir_banco(caminho=CAMINHO_BANCO):
+    diretorio = os.path.dirname(caminho)
+    if diretorio:
+        os.makedirs(diretorio, exist_ok=True)
+    conexao = sqlite3.connect(caminho)
+    conexao.executescript(ESQUEMA)
+    _garantir_colunas(conexao, 'configuracoes', COLUNAS_CONFIGURACAO)
+    _garantir_colunas(conexao, 'execucoes', COLUNAS_METRICAS_CONSULTADAS)
+    conexao.execute("CREATE INDEX IF NOT EXISTS idx_configuracoes_n ON configuracoes(num_transacoes)")
+    return conexao
+
+
+def configuracao_da_arvore(arvore):
+    estatisticas = arvore.estatisticas
+    return {
+        'nome_arquivo': estatisticas.get('nome_arquivo', ''),
+        'num_transacoes': estatisticas.get('transacoes_processadas', 0),
+        'num_threads': estatisticas.get('num_threads', 0),
+        'representacao': estatisticas.get('representacao', 'str'),
+        'cache_folhas': estatisticas.get('cache_folhas', 'desligado'),
+        'executor': estatisticas.get('executor', 'threads'),
+        'aridade': estatisticas.get('aridade', 2),
+        'compressao': estatisticas.get('compressao', 'nenhuma'),
+    }
+
+
+def obter_configuracao(conexao, configuracao):
+    """Id da configuração, criando a linha se ainda não existir"""
+    _garantir_colunas(conexao, 'configuracoes', configuracao.keys())
+    chave = json.dumps(configuracao, sort_keys=True)
+    linha = conexao.execute("SELECT id FROM configuracoes WHERE chave = ?", (chave,)).fetchone()
+    if linha:
+        return linha[0]
+    colunas = ', '.join(f'"{c}"' for c in configuracao)
+    marcadores = ', '.join('?' for _ in configuracao)
+    cursor = conexao.execute(f'INSERT INTO configuracoes (chave, {colunas}) VALUES (?, {marcadores})',
+                             (chave, *configuracao.values()))
+    return cursor.lastrowid
+
+
+def registrar_execucao(arvore, caminho=CAMINHO_BANCO):
+    """Grava as estatísticas da árvore (mesmas colunas do CSV) e o histograma dos tempos de busca.
+    Retorna o id da execução"""
+    conexao = abrir_banco(caminho)
+    try:
+        with conexao:
+            configuracao_id = obter_configuracao(conexao, configuracao_da_arvore(arvore))
+            metricas = [(nome, None if valor == '' else valor) for nome, valor in arvore.linha_estatisticas()
+                        if nome != 'data_execucao']
+            _garantir_colunas(conexao, 'execucoes', [nome for nome, _ in metricas])
+
+            colunas = ', '.join(f'"{nome}"' for nome, _ in metricas)
+            marcadores = ', '.join('?' for _ in metricas)
+            cursor = conexao.execute(
+                f'INSERT INTO execucoes (configuracao_id, data_execucao, {colunas}) VALUES (?, ?, {marcadores})',
+                (configuracao_id, arvore.estatisticas.get('data_execucao', ''), *[valor for _, valor in metricas]))
+            execucao_id = cursor.lastrowid
+
+            # amostras_busca (uma linha por busca) fica só para bancos antigos; agora vão os baldes não vazios
+            conexao.executemany(
+                "INSERT INTO histograma_busca (execucao_id, limite_inferior_ns, limite_superior_ns, contagem) "
+                "VALUES (?, ?, ?, ?)",
+                [(execucao_id, *balde) for balde in arvore.histograma_busca.baldes()])
+        return execucao_id
+    finally:
+        conexao.close()
+
+
+def _condicoes_configuracao(filtros, desde):
+    condicoes = []
+    parametros = []
+    for coluna, valor in (filtros or {}).items():
+        if coluna not in COLUNAS_CONFIGURACAO:
+            raise ValueError(f"Coluna de configuração desconhecida: {coluna}")
+        if coluna in PADROES_CONFIGURACAO:
+            condicoes.append(f'COALESCE(c."{coluna}", ?) = ?')
+            parametros += [PADROES_CONFIGURACAO[coluna], valor]
+        else:
+            condicoes.append(f'c."{coluna}" = ?')
+            parametros.append(valor)
+    if desde:
+        condicoes.append("e.data_execucao >= ?")
+        parametros.append(desde)
+    return condicoes, parametros
+
+
+def consulta_ultimas_execucoes(filtros=None, desde=None, configuracao_base=CONFIGURACAO_BASE):
+    """SQL (e parâmetros) da última execução de cada número de transações, já com a configuração.
+    filtros: {coluna de configuração: valor}, que substituem os da configuracao_base (None = sem base);
+    desde: data mínima 'AAAA-MM-DD'"""
+    condicoes, parametros = _condicoes_configuracao({**(configuracao_base or {}), **(filtros or {})}, desde)
+    onde = ("WHERE " + " AND ".join(condicoes)) if condicoes else ""
+
+    sql = f"""
+        SELECT c.num_transacoes, c.representacao, c.cache_folhas, COALESCE(c.executor, 'threads') AS executor, e.*
+        FROM (
+            SELECT e.*, ROW_NUMBER() OVER (PARTITION BY c.num_transacoes ORDER BY e.data_execucao DESC, e.id DESC) AS ordem
+            FROM execucoes e JOIN configuracoes c ON c.id = e.configuracao_id
+            {onde}
+        ) e JOIN configuracoes c ON c.id = e.configuracao_id
+        WHERE e.ordem = 1
+        ORDER BY c.num_transacoes
+    """
+    return sql, parametros
+
+
+def consulta_matriz(filtros=None, desde=None):
+    """SQL (e parâmetros) com todas as execuções e a configuração de cada uma, para as curvas de escala"""
+    condicoes, parametros = _condicoes_configuracao(filtros, desde)
+    onde = ("WHERE " + " AND ".join(condicoes)) if condicoes else ""
+
+    sql = f"""
+        SELECT c.num_transacoes, c.num_threads, COALESCE(c.executor, 'threads') AS executor,
+               c.representacao, COALESCE(c.aridade, 2) AS aridade, e.data_execucao, e.tempo_construcao_seg,
+               e.tamanho_prova_bytes, e.tempo_verificacao_prova_us
+        FROM execucoes e JOIN configuracoes c ON c.id = e.configuracao_id
+        {onde}
+        ORDER BY c.num_transacoes, c.num_threads
+    """
+    return sql, parametros
@@ -5,8 +5,18 @@ import random
 import sys
 import time
 import csv
+import binascii
+import tracemalloc
 from datetime import datetime
 
+from histograma import Histograma_latencia
+from compressao import formato_compressao, abrir_binario, abrir_texto, hash_em_fluxo
+
+try:
+    import numpy as np  # opcional: usado só na representação em lote de largura fixa
+except ImportError:
+    np = None
+
 # lock para acessar e salvar as transações feitas
 lock_feitas = threading.Lock()
 
@@ -19,14 +29,387 @@ def sha_256(dados):
         dados = dados.encode('utf-8')
     return hashlib.sha256(dados).hexdigest()
 
+# memória residente (RSS) atual do processo em bytes; None se o sistema não informar
+def rss_atual():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+# pico de RSS do processo desde que ele começou (ru_maxrss vem em KB no Linux e em bytes no macOS)
+def rss_pico():
+    try:
+        import resource
+    except ImportError:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return pico if sys.platform == "darwin" else pico * 1024
+
+# hash duplo usado nas folhas (mesma regra de salva_transacao)
+def hash_transacao(transacao):
+    return sha_256(sha_256(transacao))
+
+# hash duplo usado nos nós internos (mesma regra de monta_tudo)
+def hash_pai(hash_esq, hash_dir):
+    return sha_256(sha_256(hash_esq + hash_dir))
+
+# aridades aceitas: número de filhos de cada nó interno (2 = árvore binária)
+ARIDADES = (2, 4, 8, 16)
+
+# hash do pai de um grupo de k filhos; com 2 filhos é o próprio hash_pai
+def hash_grupo(hashes_filhos):
+    return sha_256(sha_256(''.join(hashes_filhos)))
+
+# grupo incompleto repete o último filho até ter k, a mesma regra do nível ímpar na binária
+def completar_grupo(grupo, aridade):
+    return grupo + [grupo[-1]] * (aridade - len(grupo))
+
+# monta a árvore nível por nível só com os hashes (sem objetos No), da folha até a raiz
+# nível ímpar duplica o último hash, igual ao monta_tudo
+def montar_niveis(hashes_folhas, aridade=2):
+    niveis = [list(hashes_folhas)]
+    while len(niveis[-1]) > 1:
+        atual = niveis[-1]
+        proximo = []
+        if aridade == 2:
+            for i in range(0, len(atual), 2):
+                esq = atual[i]
+                dir = atual[i+1] if i+1 < len(atual) else atual[i]
+                proximo.append(hash_pai(esq, dir))
+        else:
+            for i in range(0, len(atual), aridade):
+                proximo.append(hash_grupo(completar_grupo(atual[i:i + aridade], aridade)))
+        niveis.append(proximo)
+    return niveis
+
+# gera o caminho de prova (hash_irmao, direcao) no mesmo formato do gerar_prova_inclusao.
+# Com aridade k > 2 cada passo é (irmãos reais do grupo, posição no grupo): os repetidos do
+# grupo incompleto não vão na prova, o verificador completa o grupo sozinho
+def caminho_dos_niveis(niveis, posicao, aridade=2):
+    caminho = []
+    for nivel in niveis[:-1]:
+        if aridade > 2:
+            inicio = posicao - posicao % aridade
+            grupo = nivel[inicio:inicio + aridade]
+            indice = posicao - inicio
+            caminho.append((grupo[:indice] + grupo[indice + 1:], indice))
+        elif posicao % 2 == 0:
+            irmao = posicao + 1 if posicao + 1 < len(nivel) else posicao
+            caminho.append((nivel[irmao], "direita"))
+        else:
+            caminho.append((nivel[posicao - 1], "esquerda"))
+        posicao //= aridade
+    return caminho
+
+# calcula a raiz lendo as folhas uma a uma (qualquer iterável, até de um gerador) guardando só
+# um hash pendente por nível: memória O(log n). Dá a mesma raiz do montar_niveis (ímpar duplica).
+# posicoes_prova: folhas cujo caminho de prova é guardado durante a passada
+def raiz_incremental(hashes_folhas, posicoes_prova=()):
+    pendentes = []  # hash esquerdo esperando o irmão, por nível
+    contagem = []  # nós já vistos em cada nível
+    caminhos = {p: [] for p in posicoes_prova}
+    alvos = []  # por nível: índice do ancestral -> posições de prova abaixo dele
+
+    def alvos_do_nivel(nivel):
+        while len(alvos) <= nivel:
+            n = len(alvos)
+            por_indice = {}
+            for p in caminhos:
+                por_indice.setdefault(p >> n, []).append(p)
+            alvos.append(por_indice)
+        return alvos[nivel]
+
+    def empurrar(nivel, h):
+        while True:
+            if nivel == len(contagem):
+                contagem.append(0)
+                pendentes.append(None)
+            indice = contagem[nivel]
+            contagem[nivel] += 1
+            if indice % 2 == 0:
+                pendentes[nivel] = h
+                return
+            esq = pendentes[nivel]
+            if caminhos:
+                por_indice = alvos_do_nivel(nivel)
+                for p in por_indice.get(indice - 1, ()):
+                    caminhos[p].append((h, "direita"))
+                for p in por_indice.get(indice, ()):
+                    caminhos[p].append((esq, "esquerda"))
+            h = hash_pai(esq, h)
+            nivel += 1
+
+    for h in hashes_folhas:
+        empurrar(0, h)
+    if not contagem:
+        return None, 0, caminhos
+
+    # fecha os níveis de baixo para cima: quem ficou sem irmão é pareado consigo mesmo
+    num_folhas = contagem[0]
+    nivel = 0
+    while contagem[nivel] > 1 or nivel + 1 < len(contagem):
+        if contagem[nivel] % 2 == 1:
+            sozinho = pendentes[nivel]
+            if caminhos:
+                for p in alvos_do_nivel(nivel).get(contagem[nivel] - 1, ()):
+                    caminhos[p].append((sozinho, "direita"))
+            contagem[nivel] += 1
+            empurrar(nivel + 1, hash_pai(sozinho, sozinho))
+        nivel += 1
+    return pendentes[nivel], num_folhas, caminhos
+
+# sobe da folha até a raiz aplicando o caminho; devolve o hash calculado
+def aplicar_caminho(hash_folha, caminho, aridade=2):
+    atual = hash_folha
+    for hash_irmao, direcao in caminho:
+        if aridade > 2:
+            # passo k-ário: (irmãos, posição do nó no grupo)
+            irmaos, indice = list(hash_irmao), direcao
+            atual = hash_grupo(completar_grupo(irmaos[:indice] + [atual] + irmaos[indice:], aridade))
+        elif direcao == "esquerda":
+            atual = hash_pai(hash_irmao, atual)
+        else:
+            atual = hash_pai(atual, hash_irmao)
+    return atual
+
+# bytes de um caminho de prova: 32 por hash irmão mais 1 byte por nível (direção ou posição no grupo)
+def tamanho_caminho_bytes(caminho):
+    total = 0
+    for hash_irmao, _ in caminho:
+        irmaos = [hash_irmao] if isinstance(hash_irmao, str) else hash_irmao
+        total += sum(len(h) // 2 for h in irmaos) + 1
+    return total
+
+# executores da criação das folhas: "threads" (o GIL serializa o hash de mensagens curtas)
+# ou "processos" (ProcessPoolExecutor com num_threads trabalhadores, cada um com um bloco contínuo)
+EXECUTORES = ("threads", "processos")
+
+# hash de um lote de transações em outro processo (função de módulo para poder ser serializada)
+def hash_lote_transacoes(transacoes):
+    return [sha_256(sha_256(t)) for t in transacoes]
+
+# detecta se todas as linhas do arquivo têm o mesmo tamanho (registros de largura fixa)
+# retorna a largura (sem o '\n') ou None se o arquivo não for uniforme
+def detectar_largura_fixa(dados):
+    if np is None or not dados:
+        return None
+    largura = dados.find(b'\n')
+    if largura <= 0 or len(dados) % (largura + 1) != 0:
+        return None
+
+    bruto = np.frombuffer(dados, dtype=np.uint8).reshape(-1, largura + 1)
+    if not (bruto[:, largura] == ord('\n')).all():
+        return None
+    if (bruto[:, :largura] == ord('\n')).any():
+        return None
+
+    # o caminho por string faz strip() em cada linha, então registros com espaço
+    # nas pontas (ou '\r' de arquivos do Windows) ficam no caminho antigo
+    for coluna in (0, largura - 1):
+        if np.isin(bruto[:, coluna], (ord(' '), ord('\t'), ord('\r'))).any():
+            return None
+    return largura
+
+def carregar_transacoes_largura_fixa(nome_arquivo):
+    """Carrega um arquivo de registros de largura fixa em um único array NumPy S<n> contíguo"""
+    if np is None:
+        return None
+
+    with abrir_binario(nome_arquivo) as f:
+        dados = f.read()
+    if dados and not dados.endswith(b'\n'):
+        dados += b'\n'
+
+    largura = detectar_largura_fixa(dados)
+    if largura is None:
+        return None
+
+    # descarta a coluna do '\n' e junta tudo em um buffer só, sem criar um str por registro
+    bruto = np.frombuffer(dados, dtype=np.uint8).reshape(-1, largura + 1)
+    return np.ascontiguousarray(bruto[:, :largura]).view(f'S{largura}').ravel()
+
+def hash_folhas_largura_fixa(registros, indices):
+    """Calcula o hash duplo das folhas lendo fatias do buffer do array, sem cópia"""
+    largura = registros.dtype.itemsize
+    buffer = memoryview(registros.view(np.uint8))
+    sha256 = hashlib.sha256
+    hexlify = binascii.hexlify
+
+    # equivalente a sha_256(sha_256(transacao)), mas o hash interno já sai em bytes
+    return [sha256(hexlify(sha256(buffer[i * largura:(i + 1) * largura]).digest())).hexdigest()
+            for i in indices]
+
+# cache de folhas em disco: um arquivo por (conteúdo do arquivo de entrada, backend de hash),
+# com os digests binários de 32 bytes de todas as transações na ordem do arquivo
+DIRETORIO_CACHE_FOLHAS = ".cache_folhas"
+BACKEND_HASH = "sha256-duplo-hex"  # regra das folhas: sha_256(sha_256(transacao)) sobre o hex
+TAMANHO_DIGEST = 32
+MAGICO_CACHE = b'MKLC'
+
+def impressao_digital_arquivo(nome_arquivo):
+    """SHA-256 do conteúdo do arquivo (qualquer mudança no arquivo muda a impressão digital)"""
+    h = hashlib.sha256()
+    with open(nome_arquivo, 'rb') as f:
+        for bloco in iter(lambda: f.read(1 << 20), b''):
+            h.update(bloco)
+    return h.hexdigest()
+
+def caminho_cache_folhas(nome_arquivo, diretorio=DIRETORIO_CACHE_FOLHAS, backend=BACKEND_HASH):
+    chave = sha_256(f"{impressao_digital_arquivo(nome_arquivo)}:{backend}")
+    return os.path.join(diretorio, f"{chave}.folhas")
+
+def carregar_cache_folhas(nome_arquivo, diretorio=DIRETORIO_CACHE_FOLHAS, num_transacoes=None, backend=BACKEND_HASH):
+    """Devolve os digests concatenados (bytes) ou None se não houver cache válido"""
+    caminho = caminho_cache_folhas(nome_arquivo, diretorio, backend)
+    if not os.path.exists(caminho):
+        return None
+    with open(caminho, 'rb') as f:
+        dados = f.read()
+
+    # cabeçalho: mágico + quantidade de digests; qualquer inconsistência invalida o cache
+    if len(dados) < 12 or dados[:4] != MAGICO_CACHE:
+        return None
+    quantidade = int.from_bytes(dados[4:12], 'little')
+    if len(dados) != 12 + quantidade * TAMANHO_DIGEST:
+        return None
+    if num_transacoes is not None and quantidade != num_transacoes:
+        return None
+    return dados[12:]
+
+def salvar_cache_folhas(nome_arquivo, diretorio, digests, backend=BACKEND_HASH):
+    try:
+        os.makedirs(diretorio, exist_ok=True)
+        caminho = caminho_cache_folhas(nome_arquivo, diretorio, backend)
+        temporario = caminho + ".tmp"
+        with open(temporario, 'wb') as f:
+            f.write(MAGICO_CACHE)
+            f.write((len(digests) // TAMANHO_DIGEST).to_bytes(8, 'little'))
+            f.write(digests)
+        os.replace(temporario, caminho)  # troca atômica: nunca fica um cache pela metade
+        return caminho
+    except OSError as e:
+        print(f"✗ Erro ao gravar cache de folhas: {e}")
+        return None
+
+class TransacoesLarguraFixa:
+    """Sequência somente leitura sobre o array S<n>; só decodifica o registro quando alguém pede"""
+    def __init__(self, registros, indices):
+        self.registros = registros
+        self.indices = indices
+
+    def __len__(self):
+        return len(self.indices)
+
+    def __getitem__(self, posicao):
+        if isinstance(posicao, slice):
+            return [self.registros[i].decode('utf-8') for i in self.indices[posicao]]
+        return self.registros[self.indices[posicao]].decode('utf-8')
+
+    def __iter__(self):
+        for i in self.indices:
+            yield self.registros[i].decode('utf-8')
+
+    def copy(self):
+        return TransacoesLarguraFixa(self.registros, list(self.indices))
+
+# quando o CSV já existe com um cabeçalho antigo (menos colunas), reescreve o arquivo
+# com o cabeçalho novo e completa as linhas antigas com campos vazios
+def atualizar_cabecalho_csv(nome_arquivo, cabecalho):
+    if not os.path.exists(nome_arquivo):
+        return
+    with open(nome_arquivo, 'r', newline='', encoding='utf-8') as f:
+        linhas = list(csv.reader(f))
+    if not linhas or linhas[0] == cabecalho:
+        return
+
+    antigo = linhas[0]
+    with open(nome_arquivo, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(cabecalho)
+        for linha in linhas[1:]:
+            valores = dict(zip(antigo, linha))
+            writer.writerow([valores.get(coluna, '') for coluna in cabecalho])
+
+def linha_estatisticas(estatisticas, histograma_busca):
+    """Lista de (coluna, valor) com as estatísticas, na ordem usada no CSV e no banco de resultados.
+    Serve para a Merkle_tree e para qualquer resultado com o mesmo dicionário de estatísticas"""
+    # Calcula estatísticas de busca
+    histograma = histograma_busca
+    if histograma:
+        tempo_medio_busca = histograma.media() * 1000
+        tempo_min_busca = histograma.minimo() * 1000
+        tempo_max_busca = histograma.maximo() * 1000
+        buscas_por_segundo = 1 / (tempo_medio_busca / 1000) if tempo_medio_busca > 0 else 0
+    else:
+        tempo_medio_busca = 0
+        tempo_min_busca = 0
+        tempo_max_busca = 0
+        buscas_por_segundo = 0
+
+    # (coluna, valor) na ordem em que vão para o arquivo
+    colunas = [
+        ('data_execucao', estatisticas.get('data_execucao', '')),
+        ('nome_arquivo', estatisticas.get('nome_arquivo', '')),
+        ('total_transacoes_arquivo', estatisticas.get('total_transacoes_arquivo', 0)),
+        ('transacoes_processadas', estatisticas.get('transacoes_processadas', 0)),
+        ('num_threads', estatisticas.get('num_threads', 0)),
+        ('folhas_criadas', estatisticas.get('folhas_criadas', 0)),
+        ('altura_arvore', estatisticas.get('altura_arvore', 0)),
+        ('tempo_construcao_seg', round(estatisticas.get('tempo_construcao', 0), 4)),
+        ('taxa_processamento_trans_seg', round(estatisticas.get('taxa_processamento', 0), 1)),
+        ('tamanho_raiz_bytes', estatisticas.get('tamanho_raiz_bytes', 0)),
+        ('hash_raiz_32chars', estatisticas.get('hash_raiz', '')),
+        ('total_buscas_realizadas', len(histograma)),
+        ('tempo_medio_busca_ms', round(tempo_medio_busca, 2)),
+        ('tempo_min_busca_ms', round(tempo_min_busca, 2)),
+        ('tempo_max_busca_ms', round(tempo_max_busca, 2)),
+        ('buscas_por_segundo', round(buscas_por_segundo, 0)),
+        # percentis do histograma, em ms com resolução de ns
+        ('tempo_p50_busca_ms', round(histograma.percentil(50) * 1000, 6)),
+        ('tempo_p99_busca_ms', round(histograma.percentil(99) * 1000, 6)),
+        ('tempo_p999_busca_ms', round(histograma.percentil(99.9) * 1000, 6)),
+        ('memoria_pico_bytes', estatisticas.get('memoria_pico_bytes', '')),
+        ('memoria_retida_bytes', estatisticas.get('memoria_retida_bytes', '')),
+        ('memoria_transacoes_bytes', estatisticas.get('memoria_transacoes_bytes', '')),
+        ('memoria_folhas_bytes', estatisticas.get('memoria_folhas_bytes', '')),
+        ('memoria_nos_internos_bytes', estatisticas.get('memoria_nos_internos_bytes', '')),
+        ('memoria_indices_bytes', estatisticas.get('memoria_indices_bytes', '')),
+        ('rss_retido_bytes', estatisticas.get('rss_retido_bytes', '')),
+        ('rss_pico_bytes', estatisticas.get('rss_pico_bytes', '')),
+        ('bytes_por_folha', round(estatisticas['bytes_por_folha'], 1) if 'bytes_por_folha' in estatisticas else ''),
+        ('tamanho_prova_bytes', round(estatisticas['tamanho_prova_bytes'], 1) if 'tamanho_prova_bytes' in estatisticas else ''),
+        ('tempo_verificacao_prova_us', round(estatisticas['tempo_verificacao_prova_us'], 2) if 'tempo_verificacao_prova_us' in estatisticas else ''),
+    ]
+    return colunas
+
+def salvar_estatisticas_banco(arvore, caminho="resultados/resultados.db"):
+    """Salva as estatísticas e o histograma de busca de 'arvore' (Merkle_tree ou Arvore_sintetica)
+    no banco consolidado de resultados (SQLite)"""
+    from banco_resultados import registrar_execucao
+    try:
+        execucao_id = registrar_execucao(arvore, caminho)
+        print(f"\n✓ Estatísticas salvas no banco: {caminho} (execução {execucao_id})")
+        return True
+    except Exception as e:
+        print(f"✗ Erro ao salvar estatísticas no banco: {e}")
+        return False
+
+
 class No:
-    def __init__(self, valor_hash, esq=None, dir=None):
+    filhos = None  # só nos nós k-ários (aridade > 2): todos os k filhos, esq e dir são o primeiro e o último
+
+    def __init__(self, valor_hash, esq=None, dir=None, filhos=None):
         self.hash = valor_hash
         self.esq = esq
         self.dir = dir
+        if filhos is not None:
+            self.filhos = filhos
 
 class Merkle_tree:
-    def __init__(self,nome_arquivo, num_threads=4,transacoes_por_thread=None):
+    def __init__(self,nome_arquivo, num_threads=4,transacoes_por_thread=None, representacao="str", medir_memoria=False,
+                 cache_folhas=False, diretorio_cache=DIRETORIO_CACHE_FOLHAS, executor="threads", filtro_bloom=False,
+                 taxa_falsos_positivos=0.01, aridade=2):
         self.folhas = []
         self.raiz = None
         self.num_threads=num_threads
@@ -35,16 +418,68 @@ class Merkle_tree:
         self.transacoes_originais = []  # Para armazenar as transações originais
         self.transacoes_selecionadas = []  # Transações realmente selecionadas para a árvore
         self.estatisticas = {}  # Dicionário para armazenar estatísticas
-        self.tempos_busca = []  # Lista para armazenar tempos de busca
+        self.histograma_busca = Histograma_latencia()  # tempos de busca em baldes logarítmicos (memória constante)
         self.nome_arquivo = nome_arquivo
+        self.representacao = representacao  # "str", "numpy" ou "auto"
+        self.medir_memoria = medir_memoria  # tracemalloc deixa a construção mais lenta, por isso é opcional
+        self.memoria = {}  # bytes por categoria, preenchido quando medir_memoria=True
+        self.cache_folhas = cache_folhas  # reaproveita os hashes das folhas gravados em disco
+        self.diretorio_cache = diretorio_cache
+        self.situacao_cache = "desligado"  # "desligado", "quente" (usou o cache) ou "frio" (gerou o cache)
+        if executor not in EXECUTORES:
+            raise ValueError(f"Executor desconhecido: {executor} (use {' ou '.join(EXECUTORES)})")
+        self.executor = executor
+        # filtro de Bloom na frente da busca: True monta junto com as folhas, um caminho carrega um
+        # filtro gravado antes pelo salvar_filtro_bloom
+        self.filtro_bloom = filtro_bloom
+        self.taxa_falsos_positivos = taxa_falsos_positivos
+        self.bloom = None
+        if aridade not in ARIDADES:
+            raise ValueError(f"Aridade inválida: {aridade} (use {', '.join(map(str, ARIDADES))})")
+        self.aridade = aridade  # filhos por nó interno
+        self.compressao = "nenhuma"  # "gz", "bz2" ou "xz" quando a entrada é comprimida
+        self._marcas_memoria = {}
+
+        if medir_memoria:
+            self._iniciar_medicao_memoria()
 
         if not os.path.exists(nome_arquivo):
             print(f"Erro: Arquivo '{nome_arquivo}' não encontrado!")
+            self._parar_medicao_memoria()
             return
 
-        transacoes_nao_feitas = self.leitura_arquivo(nome_arquivo)
+        self.compressao = formato_compressao(nome_arquivo) or "nenhuma"
+        hashes_em_fluxo = None
+        tempo_fluxo = 0
+
+        # "numpy"/"auto": tenta carregar tudo em um array S<n> contíguo (arquivo de largura fixa)
+        registros = None
+        if representacao in ("numpy", "auto"):
+            registros = carregar_transacoes_largura_fixa(nome_arquivo)
+            if registros is None:
+                if representacao == "numpy":
+                    print("Arquivo não é de largura fixa (ou NumPy indisponível), usando strings")
+            else:
+                print(f"Registros de largura fixa detectados: {registros.dtype.itemsize} bytes cada")
+
+        if registros is not None:
+            self.representacao = "numpy"
+            transacoes_nao_feitas = TransacoesLarguraFixa(registros, range(len(registros)))
+        else:
+            self.representacao = "str"
+            if self.compressao != "nenhuma" and executor == "threads" and not cache_folhas and not self.transacoes_por_thread:
+                # arquivo comprimido usado inteiro: a descompressão e o hash das folhas rodam juntos
+                # (produtor/consumidor). Com um sorteio de n transações a leitura é a normal, para o tempo
+                # de construção cobrir só as n folhas, como na entrada sem compressão
+                print(f"Entrada comprimida ({self.compressao}): descompressão em fluxo com {num_threads} threads de hash")
+                inicio_fluxo = time.time()
+                transacoes_nao_feitas, hashes_em_fluxo = hash_em_fluxo(nome_arquivo, hash_lote_transacoes, num_threads)
+                tempo_fluxo = time.time() - inicio_fluxo
+            else:
+                transacoes_nao_feitas = self.leitura_arquivo(nome_arquivo)
         if not transacoes_nao_feitas:
             print("Problema na leitura das transacoes")
+            self._parar_medicao_memoria()
             return
 
         total_transacoes = len(transacoes_nao_feitas)
@@ -54,7 +489,29 @@ class Merkle_tree:
         self.transacoes_originais = transacoes_nao_feitas.copy()
         
         # Seleciona transações aleatórias para processamento
-        if self.transacoes_por_thread and self.transacoes_por_thread < total_transacoes:
+        if registros is not None:
+            # no modo numpy só os índices são sorteados, os registros continuam no array
+            if self.transacoes_por_thread and self.transacoes_por_thread < total_transacoes:
+                indices = random.sample(range(total_transacoes), self.transacoes_por_thread)
+                print(f"Selecionadas {self.transacoes_por_thread} transações aleatoriamente")
+            else:
+                indices = list(range(total_transacoes))
+                print(f"Processando todas as {total_transacoes} transações")
+            self.transacoes_selecionadas = TransacoesLarguraFixa(registros, indices)
+        elif hashes_em_fluxo is not None:
+            # os hashes já saíram do fluxo na ordem do arquivo, para todas as transações
+            print(f"Processando todas as {total_transacoes} transações")
+            self.transacoes_selecionadas = transacoes_nao_feitas.copy()
+        elif self.cache_folhas:
+            # com cache as folhas vêm da posição no arquivo, então sorteia índices
+            if self.transacoes_por_thread and self.transacoes_por_thread < total_transacoes:
+                indices = random.sample(range(total_transacoes), self.transacoes_por_thread)
+                print(f"Selecionadas {self.transacoes_por_thread} transações aleatoriamente")
+            else:
+                indices = list(range(total_transacoes))
+                print(f"Processando todas as {total_transacoes} transações")
+            self.transacoes_selecionadas = [transacoes_nao_feitas[i] for i in indices]
+        elif self.transacoes_por_thread and self.transacoes_por_thread < total_transacoes:
             # Seleciona transações aleatórias
             self.transacoes_selecionadas = random.sample(transacoes_nao_feitas, self.transacoes_por_thread)
             print(f"Selecionadas {self.transacoes_por_thread} transações aleatoriamente")
@@ -63,30 +520,59 @@ class Merkle_tree:
             self.transacoes_selecionadas = transacoes_nao_feitas.copy()
             print(f"Processando todas as {len(self.transacoes_selecionadas)} transações")
         
-        # Cria cópia para processamento em threads
-        transacoes_para_processar = self.transacoes_selecionadas.copy()
-        
+        # custos de uma vez só (importar o filtro e a maquinaria do pool de processos) ficam antes
+        # da marca e do cronômetro, senão entram como memória e tempo das folhas
+        if self.filtro_bloom:
+            from bloom import Filtro_bloom
+        if self.executor == "processos" and hashes_em_fluxo is None and not self.cache_folhas:
+            import concurrent.futures.process
+            import multiprocessing.synchronize
+
+        self._marcar_memoria('transacoes')
         inicio = time.time()
-        print(f"\nIniciando o processo de criar as folhas com {self.num_threads} threads")
-        threads = []
+        print(f"\nIniciando o processo de criar as folhas com {self.num_threads} {self.executor}")
+        if self.filtro_bloom and not isinstance(self.filtro_bloom, str):
+            # dimensionado pelo número de folhas; cada folha entra no filtro assim que é criada
+            self.bloom = Filtro_bloom(len(self.transacoes_selecionadas), self.taxa_falsos_positivos)
 
-        for i in range(self.num_threads):
-            t = threading.Thread(target=self.salva_transacao, args=(transacoes_para_processar,))
-            t.start()
-            threads.append(t)
-        
-        for t in threads:
-            t.join()
+        if hashes_em_fluxo is not None:
+            # folhas já calculadas durante a descompressão: o tempo do fluxo entra na construção
+            inicio -= tempo_fluxo
+            self.folhas = [self._nova_folha(h) for h in hashes_em_fluxo]
+        elif self.cache_folhas:
+            self.criar_folhas_com_cache(nome_arquivo, transacoes_nao_feitas, registros, indices)
+        elif self.executor == "processos":
+            self.criar_folhas_processos(registros, self.transacoes_selecionadas)
+        elif registros is not None:
+            self.criar_folhas_largura_fixa(registros, self.transacoes_selecionadas.indices)
+        else:
+            # Cria cópia para processamento em threads
+            transacoes_para_processar = self.transacoes_selecionadas.copy()
+            threads = []
+
+            for i in range(self.num_threads):
+                t = threading.Thread(target=self.salva_transacao, args=(transacoes_para_processar,))
+                t.start()
+                threads.append(t)
+            
+            for t in threads:
+                t.join()
         
         print(f"Folhas criadas: {len(self.folhas)}")
         print("Terminou o processo de criar as folhas")
 
         if not self.folhas:
             print("Problema ao criar as folhas")
+            self._parar_medicao_memoria()
             return
 
-        print("Iniciando o processo de montar a árvore com o hash dos filhos e vizinhos")
+        if isinstance(self.filtro_bloom, str):
+            self.anexar_filtro_bloom(Filtro_bloom.carregar(self.filtro_bloom))
+
+        self._marcar_memoria('folhas')
+        print(f"Iniciando o processo de montar a árvore com o hash dos filhos e vizinhos (aridade {self.aridade})")
         self.raiz = self.monta_tudo(self.folhas)
+        self._marcar_memoria('nos_internos')
         fim = time.time()
         self.tempo_construcao = fim - inicio 
         
@@ -105,6 +591,11 @@ class Merkle_tree:
             'total_transacoes_arquivo': total_transacoes,
             'transacoes_processadas': len(self.transacoes_selecionadas),
             'num_threads': num_threads,
+            'representacao': self.representacao,
+            'cache_folhas': self.situacao_cache,
+            'executor': self.executor,
+            'aridade': self.aridade,
+            'compressao': self.compressao,
             'folhas_criadas': len(self.folhas),
             'altura_arvore': altura,
             'tempo_construcao': self.tempo_construcao,
@@ -113,6 +604,55 @@ class Merkle_tree:
             'hash_raiz': self.raiz.hash[:32] + '...' if self.raiz else '',
         }
 
+        if medir_memoria:
+            self._finalizar_medicao_memoria()
+            self.estatisticas.update(self.memoria)
+            print(f"Memória retida: {self.memoria['memoria_retida_bytes']:,} bytes "
+                  f"({self.memoria['bytes_por_folha']:.1f} bytes por folha)")
+
+    def _iniciar_medicao_memoria(self):
+        self._tracemalloc_externo = tracemalloc.is_tracing()
+        if not self._tracemalloc_externo:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        self._rss_inicial = rss_atual()
+        self._marcas_memoria = {'inicio': tracemalloc.get_traced_memory()[0]}
+
+    def _marcar_memoria(self, fase):
+        if self.medir_memoria and tracemalloc.is_tracing():
+            self._marcas_memoria[fase] = tracemalloc.get_traced_memory()[0]
+
+    def _parar_medicao_memoria(self):
+        if self.medir_memoria and tracemalloc.is_tracing() and not self._tracemalloc_externo:
+            tracemalloc.stop()
+
+    def _memoria_indices(self):
+        # estruturas auxiliares de consulta construídas junto com a árvore: o filtro de Bloom
+        return self.bloom.bytes_memoria() if self.bloom is not None else 0
+
+    def _finalizar_medicao_memoria(self):
+        # as fases da construção são sequenciais, então a diferença entre marcas é o que cada uma reteve
+        marcas = self._marcas_memoria
+        self._marcar_memoria('indices')
+        atual, pico = tracemalloc.get_traced_memory()
+        self._parar_medicao_memoria()
+
+        rss_final = rss_atual()
+        retida = atual - marcas['inicio']
+        self.memoria = {
+            'memoria_pico_bytes': pico - marcas['inicio'],
+            'memoria_retida_bytes': retida,
+            'memoria_transacoes_bytes': marcas['transacoes'] - marcas['inicio'],
+            # o filtro é alocado na fase das folhas, mas conta como índice
+            'memoria_folhas_bytes': marcas['folhas'] - marcas['transacoes'] - self._memoria_indices(),
+            'memoria_nos_internos_bytes': marcas['nos_internos'] - marcas['folhas'],
+            'memoria_indices_bytes': self._memoria_indices(),
+            'rss_retido_bytes': rss_final - self._rss_inicial if rss_final is not None and self._rss_inicial is not None else 0,
+            'rss_pico_bytes': rss_pico() or 0,
+            # só a representação da árvore: as transações lidas dependem do arquivo inteiro, não de n
+            'bytes_por_folha': (marcas['indices'] - marcas['transacoes']) / len(self.folhas) if self.folhas else 0,
+        }
+
     def calcular_altura(self, no):
         if no is None:
             return 0
@@ -125,7 +665,8 @@ class Merkle_tree:
             print("Erro ao abrir o arquivo")
             return transacoes_nao_feitas
 
-        with open(nome_arquivo, "r", encoding="utf-8") as f:
+        # .gz, .bz2 e .xz são descomprimidos em fluxo (ver compressao.py)
+        with abrir_texto(nome_arquivo) as f:
             for linha in f:
                 dado = linha.strip()
                 if dado:
@@ -133,6 +674,31 @@ class Merkle_tree:
         
         return transacoes_nao_feitas
 
+    def anexar_filtro_bloom(self, filtro):
+        """Passa a usar um filtro já montado (ex.: Filtro_bloom.carregar); só vale se foi feito com estas folhas"""
+        if filtro.itens != len(self.folhas):
+            print(f"Aviso: filtro de Bloom com {filtro.itens:,} itens e árvore com {len(self.folhas):,} folhas, "
+                  f"filtro ignorado")
+            return False
+        # mesmo número de itens não garante as mesmas folhas (outro sorteio de n transações):
+        # uma folha fora do filtro viraria um falso negativo
+        if not filtro.contem_todos(folha.hash for folha in self.folhas):
+            print("Aviso: filtro de Bloom não contém todas as folhas desta árvore, filtro ignorado")
+            return False
+        self.bloom = filtro
+        print(f"Filtro de Bloom carregado: {filtro.bytes_memoria():,} bytes, {filtro.itens:,} itens")
+        return True
+
+    def _bloom_confiavel(self):
+        # um negativo só é definitivo se o filtro tem uma entrada por folha desta árvore
+        return self.bloom is not None and self.bloom.itens == len(self.folhas)
+
+    # cria o nó da folha e já registra o hash no filtro de Bloom (quando ligado)
+    def _nova_folha(self, hash_folha):
+        if self.bloom is not None:
+            self.bloom.adicionar(hash_folha)
+        return No(valor_hash=hash_folha)
+
     # funcao que irá ser chamada por todas as threads para criar todas as folhas
     def salva_transacao(self, transacoes_para_processar):
         contador = 0
@@ -150,7 +716,7 @@ class Merkle_tree:
             dado_hash = sha_256(sha_256(transacao))
 
             with lock_feitas:
-                self.folhas.append(No(valor_hash=dado_hash))
+                self.folhas.append(self._nova_folha(dado_hash))
                 contador += 1
                 
                 # Mostra progresso a cada 500 transações (para não poluir muito)
@@ -159,6 +725,68 @@ class Merkle_tree:
         
         print(f"Thread {thread_id % 1000} finalizou: processou {contador} transações")
 
+    # cria as folhas a partir do array S<n>: cada thread cuida de um bloco contínuo de índices
+    def criar_folhas_largura_fixa(self, registros, indices):
+        num_threads = max(1, min(self.num_threads, len(indices)))
+        tamanho_bloco = (len(indices) + num_threads - 1) // num_threads
+        hashes_por_bloco = [None] * num_threads
+
+        def processa_bloco(posicao):
+            bloco = indices[posicao * tamanho_bloco:(posicao + 1) * tamanho_bloco]
+            hashes_por_bloco[posicao] = hash_folhas_largura_fixa(registros, bloco)
+            print(f"Thread {threading.get_ident() % 1000} finalizou: processou {len(bloco)} transações")
+
+        threads = [threading.Thread(target=processa_bloco, args=(i,)) for i in range(num_threads)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.folhas = [self._nova_folha(h) for hashes in hashes_por_bloco for h in hashes]
+
+    # cria as folhas em num_threads processos; a ordem das folhas é a ordem da seleção
+    def criar_folhas_processos(self, registros, transacoes):
+        from concurrent.futures import ProcessPoolExecutor
+        num_processos = max(1, min(self.num_threads, len(transacoes)))
+        tamanho_bloco = (len(transacoes) + num_processos - 1) // num_processos
+        inicios = range(0, len(transacoes), tamanho_bloco)
+
+        with ProcessPoolExecutor(max_workers=num_processos) as pool:
+            if registros is not None:
+                # só os registros do bloco vão para o processo, não o array inteiro
+                blocos = [registros[np.asarray(transacoes.indices[i:i + tamanho_bloco])] for i in inicios]
+                futuros = [pool.submit(hash_folhas_largura_fixa, bloco, range(len(bloco))) for bloco in blocos]
+            else:
+                futuros = [pool.submit(hash_lote_transacoes, transacoes[i:i + tamanho_bloco]) for i in inicios]
+            resultados = [futuro.result() for futuro in futuros]
+        # as folhas só são criadas com o pool já fechado e os futuros soltos, para a marca de memória
+        # das folhas não pegar a maquinaria do pool nem os resultados guardados nos futuros
+        del futuros
+        self.folhas = [self._nova_folha(h) for hashes in resultados for h in hashes]
+        del resultados
+        print(f"{num_processos} processos finalizaram: processaram {len(self.folhas)} transações")
+
+    # cria as folhas a partir do cache em disco; se o cache não existe (ou o arquivo mudou),
+    # calcula o hash de todas as transações do arquivo uma vez e grava para as próximas execuções
+    def criar_folhas_com_cache(self, nome_arquivo, transacoes, registros, indices):
+        digests = carregar_cache_folhas(nome_arquivo, self.diretorio_cache, len(transacoes))
+        if digests is not None:
+            self.situacao_cache = "quente"
+            print("Cache de folhas encontrado: pulando o hash das folhas")
+        else:
+            self.situacao_cache = "frio"
+            print("Cache de folhas ausente ou inválido: calculando todas as folhas do arquivo")
+            if registros is not None:
+                hashes = hash_folhas_largura_fixa(registros, range(len(registros)))
+            else:
+                hashes = [sha_256(sha_256(t)) for t in transacoes]
+            digests = b''.join(bytes.fromhex(h) for h in hashes)
+            caminho = salvar_cache_folhas(nome_arquivo, self.diretorio_cache, digests)
+            if caminho:
+                print(f"Cache de folhas gravado em: {caminho}")
+
+        self.folhas = [self._nova_folha(digests[i * TAMANHO_DIGEST:(i + 1) * TAMANHO_DIGEST].hex()) for i in indices]
+
     def monta_tudo(self, nos):
         if not nos:
             return None
@@ -167,6 +795,13 @@ class Merkle_tree:
             return nos[0]
         
         altura_atual = []
+        if self.aridade > 2:
+            for i in range(0, len(nos), self.aridade):
+                grupo = completar_grupo(nos[i:i + self.aridade], self.aridade)
+                pai = hash_grupo([no.hash for no in grupo])
+                altura_atual.append(No(pai, grupo[0], grupo[-1], grupo))
+            return self.monta_tudo(altura_atual)
+
         for i in range(0, len(nos), 2):
             esq = nos[i]
             if i+1 < len(nos):
@@ -179,6 +814,23 @@ class Merkle_tree:
 
         return self.monta_tudo(altura_atual)
     
+    # devolve os hashes da árvore nível por nível (folhas primeiro), no formato do montar_niveis
+    def niveis(self):
+        if not self.raiz:
+            return []
+        niveis = [[self.raiz]]
+        while niveis[-1][0].esq is not None:
+            proximo = []
+            for no in niveis[-1]:
+                # no nó duplicado (nível ímpar ou grupo incompleto) os filhos repetidos são o mesmo objeto
+                anterior = None
+                for filho in no.filhos or (no.esq, no.dir):
+                    if filho is not anterior:
+                        proximo.append(filho)
+                    anterior = filho
+            niveis.append(proximo)
+        return [[no.hash for no in nivel] for nivel in reversed(niveis)]
+
     def busca_transacao(self, transacao):
         # para buscar uma transação
         if not self.raiz:
@@ -188,12 +840,19 @@ class Merkle_tree:
         # Calcula o hash da transação (mesmo processo usado na criação)
         hash_procurado = sha_256(sha_256(transacao))
         
-        inicio = time.time()
-        resultado = self._busca_no(self.raiz, hash_procurado)
-        fim = time.time()
+        inicio = time.perf_counter_ns()
+        bloom_confiavel = self._bloom_confiavel()
+        if bloom_confiavel and not self.bloom.contem(hash_procurado):
+            # negativo do filtro é definitivo: nenhum nó é visitado
+            resultado = None
+        else:
+            resultado = self._busca_no(self.raiz, hash_procurado)
+            if resultado is None and bloom_confiavel:
+                self.bloom.registrar_falso_positivo()
+        fim = time.perf_counter_ns()
         
-        tempo_busca = fim - inicio
-        self.tempos_busca.append(tempo_busca)  # Armazena tempo de busca
+        self.histograma_busca.registrar_ns(fim - inicio)  # Armazena tempo de busca
+        tempo_busca = (fim - inicio) / 1e9
         
         if resultado:
             print(f"✓ Transação encontrada na árvore")
@@ -214,6 +873,12 @@ class Merkle_tree:
             return no
         
         # senão busca nos filhos
+        if no.filhos is not None:
+            for filho in no.filhos:
+                achou = self._busca_no(filho, hash_procura)
+                if achou:
+                    return achou
+            return None
         achou_esq = self._busca_no(no.esq, hash_procura)
         if achou_esq:
             return achou_esq
@@ -254,7 +919,10 @@ class Merkle_tree:
             print("\nCaminho até a raiz:")
             
             for i, (hash_irmao, direcao) in enumerate(caminho):
-                print(f"  Nível {i+1}: {direcao} -> {hash_irmao[:16]}...")
+                if self.aridade > 2:
+                    print(f"  Nível {i+1}: posição {direcao} no grupo, {len(hash_irmao)} irmãos")
+                else:
+                    print(f"  Nível {i+1}: {direcao} -> {hash_irmao[:16]}...")
             
             print(f"\nHash raiz: {self.raiz.hash[:32]}...")
             
@@ -279,6 +947,15 @@ class Merkle_tree:
         if no.hash == hash_procura:
             return True
         
+        # nó k-ário: o passo leva os irmãos reais do grupo (sem os repetidos) e a posição do filho
+        if no.filhos is not None:
+            reais = [filho for i, filho in enumerate(no.filhos) if i == 0 or filho is not no.filhos[i - 1]]
+            for indice, filho in enumerate(reais):
+                if self._encontrar_caminho(filho, hash_procura, caminho):
+                    caminho.append(([irmao.hash for j, irmao in enumerate(reais) if j != indice], indice))
+                    return True
+            return False
+        
         # procura no filho esquerdo
         if self._encontrar_caminho(no.esq, hash_procura, caminho):
             # adiciona o hash do irmão direito (se existir)
@@ -305,6 +982,8 @@ class Merkle_tree:
     def verificar_prova(self, transacao, caminho):
         
         current_hash = sha_256(sha_256(transacao))
+        if self.aridade > 2:
+            return aplicar_caminho(current_hash, caminho, self.aridade) == self.raiz.hash
         
         # percorre o caminho da folha até a raiz
         for hash_irmao, direcao in caminho:
@@ -328,24 +1007,61 @@ class Merkle_tree:
         print(f"Total de transações no arquivo: {self.estatisticas.get('total_transacoes_arquivo', 0):,}")
         print(f"Transações processadas: {self.estatisticas.get('transacoes_processadas', 0):,}")
         print(f"Número de threads: {self.estatisticas.get('num_threads', 0)}")
+        print(f"Executor das folhas: {self.estatisticas.get('executor', 'threads')}")
+        print(f"Representação das transações: {self.estatisticas.get('representacao', 'str')}")
+        print(f"Cache de folhas: {self.estatisticas.get('cache_folhas', 'desligado')}")
         print(f"Folhas criadas: {self.estatisticas.get('folhas_criadas', 0):,}")
+        print(f"Aridade: {self.estatisticas.get('aridade', 2)}")
+        print(f"Compressão da entrada: {self.estatisticas.get('compressao', 'nenhuma')}")
         print(f"Altura da árvore: {self.estatisticas.get('altura_arvore', 0)}")
         print(f"Tempo de construção: {self.estatisticas.get('tempo_construcao', 0):.4f} segundos")
         print(f"Taxa de processamento: {self.estatisticas.get('taxa_processamento', 0):.1f} transações/segundo")
         print(f"Tamanho da raiz: {self.estatisticas.get('tamanho_raiz_bytes', 0)} bytes")
         print(f"Hash raiz: {self.estatisticas.get('hash_raiz', 'N/A')}")
+
+        # Estatísticas de memória (só quando a árvore foi construída com medir_memoria=True)
+        if self.memoria:
+            print(f"\nESTATÍSTICAS DE MEMÓRIA:")
+            print(f"  Pico durante a construção: {self.memoria['memoria_pico_bytes']:,} bytes")
+            print(f"  Retida após a construção: {self.memoria['memoria_retida_bytes']:,} bytes")
+            print(f"    Transações: {self.memoria['memoria_transacoes_bytes']:,} bytes")
+            print(f"    Folhas: {self.memoria['memoria_folhas_bytes']:,} bytes")
+            print(f"    Nós internos: {self.memoria['memoria_nos_internos_bytes']:,} bytes")
+            print(f"    Índices: {self.memoria['memoria_indices_bytes']:,} bytes")
+            print(f"  RSS retido: {self.memoria['rss_retido_bytes']:,} bytes (pico do processo: {self.memoria['rss_pico_bytes']:,} bytes)")
+            print(f"  Bytes por folha: {self.memoria['bytes_por_folha']:.1f}")
+        
+        # Estatísticas do filtro de Bloom
+        if self.bloom is not None:
+            bloom = self.bloom.estatisticas()
+            print(f"\nFILTRO DE BLOOM:")
+            print(f"  Tamanho: {bloom['bloom_bytes']:,} bytes ({bloom['bloom_bits']:,} bits, {bloom['bloom_hashes']} hashes, "
+                  f"{bloom['bloom_itens']:,} folhas)")
+            print(f"  Taxa de falsos positivos: alvo {self.taxa_falsos_positivos:.2%}, "
+                  f"estimada {bloom['bloom_taxa_fp_estimada']:.2%}, observada {bloom['bloom_taxa_fp_observada']:.2%}")
+            print(f"  Consultas: {bloom['bloom_consultas']:,} (rejeitadas pelo filtro: {bloom['bloom_negativos']:,}, "
+                  f"passaram: {bloom['bloom_positivos']:,}, falsos positivos: {bloom['bloom_falsos_positivos']:,})")
         
         # Estatísticas de busca
-        if self.tempos_busca:
-            tempo_medio_busca = sum(self.tempos_busca) / len(self.tempos_busca)
+        if self.histograma_busca:
+            histograma = self.histograma_busca
+            tempo_medio_busca = histograma.media()
             print(f"\nESTATÍSTICAS DE BUSCA:")
-            print(f"  Total de buscas realizadas: {len(self.tempos_busca)}")
+            print(f"  Total de buscas realizadas: {len(histograma)}")
             print(f"  Tempo médio de busca: {tempo_medio_busca*1000:.2f} ms")
             print(f"  Buscas por segundo: {1/tempo_medio_busca:.0f}")
-            print(f"  Tempo mínimo de busca: {min(self.tempos_busca)*1000:.2f} ms")
-            print(f"  Tempo máximo de busca: {max(self.tempos_busca)*1000:.2f} ms")
+            print(f"  Tempo mínimo de busca: {histograma.minimo()*1000:.2f} ms")
+            print(f"  Tempo máximo de busca: {histograma.maximo()*1000:.2f} ms")
+            print(f"  Percentis: p50 {histograma.percentil(50)*1e6:.1f} µs, p99 {histograma.percentil(99)*1e6:.1f} µs, "
+                  f"p99.9 {histograma.percentil(99.9)*1e6:.1f} µs")
         else:
             print(f"\nESTATÍSTICAS DE BUSCA: Nenhuma busca realizada ainda")
+
+        # Estatísticas das provas (preenchidas pelo testar_provas)
+        if 'tamanho_prova_bytes' in self.estatisticas:
+            print(f"\nESTATÍSTICAS DE PROVA:")
+            print(f"  Tamanho médio da prova: {self.estatisticas['tamanho_prova_bytes']:.0f} bytes")
+            print(f"  Tempo médio de verificação: {self.estatisticas['tempo_verificacao_prova_us']:.1f} µs")
     
     # testa performance de busca com transações reais
     def testar_performance_busca(self):
@@ -358,7 +1074,7 @@ class Merkle_tree:
         print("="*60)
         
         num_testes = min(20, len(self.transacoes_selecionadas))
-        tempos_busca = []
+        histograma = Histograma_latencia()
         
         print(f"Realizando {num_testes} buscas aleatórias...")
         
@@ -366,31 +1082,63 @@ class Merkle_tree:
             transacao_teste = random.choice(self.transacoes_selecionadas)
             print(f"  Teste {i+1}/{num_testes}: {transacao_teste[:30]}...")
             
-            inicio = time.time()
+            inicio = time.perf_counter_ns()
             resultado = self._busca_no(self.raiz, sha_256(sha_256(transacao_teste)))
-            fim = time.time()
+            fim = time.perf_counter_ns()
             
             if resultado:
-                tempos_busca.append(fim - inicio)
+                histograma.registrar_ns(fim - inicio)
         
-        if tempos_busca:
-            tempo_medio = sum(tempos_busca) / len(tempos_busca)
+        if histograma:
+            tempo_medio = histograma.media()
             print(f"\nRESULTADOS DO TESTE DE PERFORMANCE:")
-            print(f"  Buscas realizadas: {len(tempos_busca)}")
-            print(f"  Buscas bem-sucedidas: {len(tempos_busca)}")
+            print(f"  Buscas realizadas: {len(histograma)}")
+            print(f"  Buscas bem-sucedidas: {len(histograma)}")
             print(f"  Tempo médio de busca: {tempo_medio*1000:.2f} ms")
-            print(f"  Tempo mínimo de busca: {min(tempos_busca)*1000:.2f} ms")
-            print(f"  Tempo máximo de busca: {max(tempos_busca)*1000:.2f} ms")
+            print(f"  Tempo mínimo de busca: {histograma.minimo()*1000:.2f} ms")
+            print(f"  Tempo máximo de busca: {histograma.maximo()*1000:.2f} ms")
             print(f"  Buscas por segundo: {1/tempo_medio:.0f}")
             
             # Adiciona ao histórico de tempos de busca
-            self.tempos_busca.extend(tempos_busca)
+            self.histograma_busca.mesclar(histograma)
         else:
             print("Nenhuma busca bem-sucedida para calcular estatísticas.")
     
+    # mede o tamanho médio e o tempo médio de verificação das provas de folhas sorteadas
+    def testar_provas(self, num_provas=50):
+        if not self.raiz:
+            return None
+        niveis = self.niveis()
+        tamanhos = []
+        tempos = []
+        invalidas = 0
+        for _ in range(num_provas):
+            posicao = random.randrange(len(niveis[0]))
+            caminho = caminho_dos_niveis(niveis, posicao, self.aridade)
+            inicio = time.perf_counter()
+            valida = aplicar_caminho(niveis[0][posicao], caminho, self.aridade) == self.raiz.hash
+            tempos.append(time.perf_counter() - inicio)
+            tamanhos.append(tamanho_caminho_bytes(caminho))
+            invalidas += not valida
+        if invalidas:
+            print(f"✗ {invalidas} provas inválidas de {num_provas}!")
+        self.estatisticas['tamanho_prova_bytes'] = sum(tamanhos) / num_provas
+        self.estatisticas['tempo_verificacao_prova_us'] = sum(tempos) / num_provas * 1e6
+        print(f"Provas: {self.estatisticas['tamanho_prova_bytes']:.0f} bytes em média, "
+              f"verificação em {self.estatisticas['tempo_verificacao_prova_us']:.1f} µs")
+        return invalidas == 0
+
+    def linha_estatisticas(self):
+        """Lista de (coluna, valor) com as estatísticas, na ordem usada no CSV e no banco de resultados"""
+        return linha_estatisticas(self.estatisticas, self.histograma_busca)
+
     def salvar_estatisticas_csv(self, nome_arquivo="estatisticas_merkle.csv"):
         """Salva as estatísticas em um arquivo CSV"""
         try:
+            colunas = self.linha_estatisticas()
+            cabecalho = [nome for nome, _ in colunas]
+            atualizar_cabecalho_csv(nome_arquivo, cabecalho)
+
             # Determina se o arquivo já existe para adicionar cabeçalho
             arquivo_existe = os.path.exists(nome_arquivo)
             
@@ -399,68 +1147,21 @@ class Merkle_tree:
                 
                 # Escreve cabeçalho se o arquivo não existe
                 if not arquivo_existe:
-                    writer.writerow([
-                        'data_execucao',
-                        'nome_arquivo',
-                        'total_transacoes_arquivo',
-                        'transacoes_processadas',
-                        'num_threads',
-                        'folhas_criadas',
-                        'altura_arvore',
-                        'tempo_construcao_seg',
-                        'taxa_processamento_trans_seg',
-                        'tamanho_raiz_bytes',
-                        'hash_raiz_32chars',
-                        'total_buscas_realizadas',
-                        'tempo_medio_busca_ms',
-                        'tempo_min_busca_ms',
-                        'tempo_max_busca_ms',
-                        'buscas_por_segundo'
-                    ])
-                
-                # Calcula estatísticas de busca
-                if self.tempos_busca:
-                    tempo_medio_busca = sum(self.tempos_busca) / len(self.tempos_busca) * 1000
-                    tempo_min_busca = min(self.tempos_busca) * 1000
-                    tempo_max_busca = max(self.tempos_busca) * 1000
-                    buscas_por_segundo = 1 / (tempo_medio_busca / 1000) if tempo_medio_busca > 0 else 0
-                else:
-                    tempo_medio_busca = 0
-                    tempo_min_busca = 0
-                    tempo_max_busca = 0
-                    buscas_por_segundo = 0
+                    writer.writerow(cabecalho)
                 
                 # Escreve linha de dados
-                writer.writerow([
-                    self.estatisticas.get('data_execucao', ''),
-                    self.estatisticas.get('nome_arquivo', ''),
-                    self.estatisticas.get('total_transacoes_arquivo', 0),
-                    self.estatisticas.get('transacoes_processadas', 0),
-                    self.estatisticas.get('num_threads', 0),
-                    self.estatisticas.get('folhas_criadas', 0),
-                    self.estatisticas.get('altura_arvore', 0),
-                    round(self.estatisticas.get('tempo_construcao', 0), 4),
-                    round(self.estatisticas.get('taxa_processamento', 0), 1),
-                    self.estatisticas.get('tamanho_raiz_bytes', 0),
-                    self.estatisticas.get('hash_raiz', ''),
-                    len(self.tempos_busca),
-                    round(tempo_medio_busca, 2),
-                    round(tempo_min_busca, 2),
-                    round(tempo_max_busca, 2),
-                    round(buscas_por_segundo, 0)
-                ])
+                writer.writerow([valor for _, valor in colunas])
             
             print(f"\n✓ Estatísticas salvas em CSV: {nome_arquivo}")
             
-            # Também salva os tempos de busca individuais em um arquivo separado
-            if self.tempos_busca:
-                nome_arquivo_tempos = nome_arquivo.replace('.csv', '_tempos_busca.csv')
-                with open(nome_arquivo_tempos, 'w', newline='', encoding='utf-8') as f:
+            # Também salva o histograma dos tempos de busca (só os baldes não vazios) em um arquivo separado
+            if self.histograma_busca:
+                nome_arquivo_histograma = nome_arquivo.replace('.csv', '_histograma_busca.csv')
+                with open(nome_arquivo_histograma, 'w', newline='', encoding='utf-8') as f:
                     writer = csv.writer(f)
-                    writer.writerow(['numero_busca', 'tempo_busca_ms'])
-                    for i, tempo in enumerate(self.tempos_busca):
-                        writer.writerow([i+1, round(tempo*1000, 3)])
-                print(f"✓ Tempos de busca individuais salvos em: {nome_arquivo_tempos}")
+                    writer.writerow(['limite_inferior_ns', 'limite_superior_ns', 'contagem'])
+                    writer.writerows(self.histograma_busca.baldes())
+                print(f"✓ Histograma dos tempos de busca salvo em: {nome_arquivo_histograma}")
             
             return True
             
@@ -468,6 +1169,20 @@ class Merkle_tree:
             print(f"✗ Erro ao salvar estatísticas CSV: {e}")
             return False
     
+    def salvar_estatisticas_banco(self, caminho="resultados/resultados.db"):
+        """Salva as estatísticas e o histograma de busca no banco consolidado de resultados (SQLite)"""
+        return salvar_estatisticas_banco(self, caminho)
+    
+    def salvar_filtro_bloom(self, nome_arquivo=None):
+        """Grava o filtro de Bloom (padrão: ao lado do arquivo de transações, com extensão .bloom)"""
+        if self.bloom is None:
+            print("Árvore construída sem filtro de Bloom!")
+            return None
+        nome_arquivo = nome_arquivo or os.path.splitext(self.nome_arquivo)[0] + ".bloom"
+        self.bloom.salvar(nome_arquivo)
+        print(f"✓ Filtro de Bloom salvo em: {nome_arquivo}")
+        return nome_arquivo
+
     def salvar_transacoes_selecionadas_csv(self, nome_arquivo="transacoes_selecionadas.csv"):
         """Salva as transações selecionadas em um arquivo CSV"""
         try:
@@ -520,6 +1235,14 @@ def main():
         nome_arquivo = sys.argv[1]
         num_threads = int(sys.argv[2]) if len(sys.argv) > 2 else 4
         num_transacoes = int(sys.argv[3]) if len(sys.argv) > 3 else 10000
+        representacao = sys.argv[4] if len(sys.argv) > 4 else "str"
+        opcoes = sys.argv[5:]
+        cache_folhas = "cache" in opcoes
+        executor = "processos" if "processos" in opcoes else "threads"
+        # bloom monta o filtro; bloom=<arquivo> carrega um filtro gravado pelo salvar_filtro_bloom
+        filtro_bloom = next((o.split("=", 1)[1] for o in opcoes if o.startswith("bloom=")), "bloom" in opcoes)
+        # aridade=k (k em ARIDADES); sem a opção a árvore é binária
+        aridade = next((int(o.split("=", 1)[1]) for o in opcoes if o.startswith("aridade=")), 2)
     else:
         # Interface interativa
         print("\nConfiguração da Merkle Tree:")
@@ -532,12 +1255,30 @@ def main():
         
         num_transacoes = input("Número de transações a processar (padrão: 10000): ").strip()
         num_transacoes = int(num_transacoes) if num_transacoes else 10000
+
+        representacao = input("Representação das transações - str, numpy ou auto (padrão: str): ").strip()
+        representacao = representacao if representacao else "str"
+
+        cache_folhas = input("Usar cache de folhas em disco? (s/n, padrão: n): ").strip().lower() == 's'
+
+        executor = input("Executor das folhas - threads ou processos (padrão: threads): ").strip()
+        executor = executor if executor else "threads"
+
+        filtro_bloom = input("Usar filtro de Bloom na busca? (s/n, padrão: n): ").strip().lower() == 's'
+
+        aridade = input("Aridade da árvore - 2, 4, 8 ou 16 (padrão: 2): ").strip()
+        aridade = int(aridade) if aridade else 2
     
     print(f"\n" + "="*60)
     print("PARÂMETROS DE EXECUÇÃO:")
     print(f"Arquivo: {nome_arquivo}")
     print(f"Threads: {num_threads}")
     print(f"Transações a processar: {num_transacoes}")
+    print(f"Representação: {representacao}")
+    print(f"Cache de folhas: {'sim' if cache_folhas else 'não'}")
+    print(f"Executor das folhas: {executor}")
+    print(f"Filtro de Bloom: {filtro_bloom if isinstance(filtro_bloom, str) else ('sim' if filtro_bloom else 'não')}")
+    print(f"Aridade: {aridade}")
     print("="*60)
     
     try:
@@ -547,7 +1288,12 @@ def main():
         merkle_tree = Merkle_tree(
             nome_arquivo=nome_arquivo,
             num_threads=num_threads,
-            transacoes_por_thread=num_transacoes
+            transacoes_por_thread=num_transacoes,
+            representacao=representacao,
+            cache_folhas=cache_folhas,
+            executor=executor,
+            filtro_bloom=filtro_bloom,
+            aridade=aridade
         )
         fim_total = time.time()
         
@@ -651,10 +1397,10 @@ def main():
                         merkle_tree.salvar_estatisticas_csv()
                     
                     # Mostra resumo final
-                    if merkle_tree.tempos_busca:
-                        tempo_medio = sum(merkle_tree.tempos_busca) / len(merkle_tree.tempos_busca)
+                    if merkle_tree.histograma_busca:
+                        tempo_medio = merkle_tree.histograma_busca.media()
                         print(f"\nRESUMO FINAL:")
-                        print(f"  Total de buscas realizadas: {len(merkle_tree.tempos_busca)}")
+                        print(f"  Total de buscas realizadas: {len(merkle_tree.histograma_busca)}")
                         print(f"  Tempo médio de busca: {tempo_medio*1000:.2f} ms")
                     
                     break
@@ -672,7 +1418,8 @@ def main():
         import traceback
         traceback.print_exc()
 
-def executar_experimento_automatico(nome_arquivo, num_threads, num_transacoes, prefixo_saida="resultados"):
+def executar_experimento_automatico(nome_arquivo, num_threads, num_transacoes, prefixo_saida="resultados", medir_memoria=True,
+                                    cache_folhas=False, representacao="str", executor="threads", aridade=2):
     """Executa um experimento automaticamente sem interação do usuário"""
     import os
     
@@ -680,7 +1427,7 @@ def executar_experimento_automatico(nome_arquivo, num_threads, num_transacoes, p
     os.makedirs(prefixo_saida, exist_ok=True)
     
     print(f"\n{'='*60}")
-    print(f"EXPERIMENTO AUTOMÁTICO: {num_transacoes} transações")
+    print(f"EXPERIMENTO AUTOMÁTICO: {num_transacoes} transações, {num_threads} {executor}, {representacao}, aridade {aridade}")
     print(f"{'='*60}")
     
     # Cria a Merkle Tree
@@ -688,7 +1435,11 @@ def executar_experimento_automatico(nome_arquivo, num_threads, num_transacoes, p
     merkle_tree = Merkle_tree(
         nome_arquivo=nome_arquivo,
         num_threads=num_threads,
-        transacoes_por_thread=num_transacoes
+        transacoes_por_thread=num_transacoes,
+        representacao=representacao,
+        cache_folhas=cache_folhas,
+        executor=executor,
+        aridade=aridade
     )
     fim_total = time.time()
     
@@ -698,8 +1449,25 @@ def executar_experimento_automatico(nome_arquivo, num_threads, num_transacoes, p
     
     print(f"\n✓ Árvore construída em {fim_total - inicio_total:.4f} segundos")
     
+    # A memória é medida em uma segunda construção com tracemalloc ligado,
+    # para o rastreamento não distorcer o tempo de construção da primeira
+    if medir_memoria:
+        print("\nMedindo memória em uma construção separada (tracemalloc)...")
+        arvore_memoria = Merkle_tree(
+            nome_arquivo=nome_arquivo,
+            num_threads=num_threads,
+            transacoes_por_thread=num_transacoes,
+            representacao=representacao,
+            medir_memoria=True,
+            executor=executor,
+            aridade=aridade
+        )
+        merkle_tree.memoria = arvore_memoria.memoria
+        merkle_tree.estatisticas.update(arvore_memoria.memoria)
+        del arvore_memoria
+    
     # Nomes dos arquivos de saída
-    csv_estatisticas = f"{prefixo_saida}/estatisticas_merkle_{num_transacoes}.csv"
+    banco_resultados = f"{prefixo_saida}/resultados.db"
     csv_transacoes = f"{prefixo_saida}/transacoes_{num_transacoes}.csv"
     
     # Realiza algumas buscas para coletar estatísticas
@@ -712,9 +1480,12 @@ def executar_experimento_automatico(nome_arquivo, num_threads, num_transacoes, p
             if resultado:
                 tempos_testes.append(tempo)
     
+    # Tamanho e verificação das provas (o que a aridade troca por menos níveis)
+    merkle_tree.testar_provas()
+    
     # Salva estatísticas
-    print(f"\nSalvando estatísticas em: {csv_estatisticas}")
-    sucesso1 = merkle_tree.salvar_estatisticas_csv(csv_estatisticas)
+    print(f"\nSalvando estatísticas em: {banco_resultados}")
+    sucesso1 = merkle_tree.salvar_estatisticas_banco(banco_resultados)
     
     # Salva transações selecionadas
     print(f"Salvando transações em: {csv_transacoes}")
@@ -728,14 +1499,40 @@ def executar_experimento_automatico(nome_arquivo, num_threads, num_transacoes, p
         return False
 
 
-def executar_todos_experimentos():
-    """Executa todos os experimentos automaticamente"""
+# matriz de configurações do executar_todos_experimentos: cada combinação de tamanho, executor,
+# representação, aridade e número de trabalhadores roda "repeticoes" vezes. Um arquivo JSON (--matriz)
+# pode substituir qualquer uma das chaves
+MATRIZ_PADRAO = {
+    'tamanhos': [2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 2048, 4096, 8192, 10000,
+                 10**6, 10**7, 10**8, 10**9],
+    'num_threads': [4],
+    'executores': ['threads'],
+    'representacoes': ['str'],
+    'aridades': [2],
+    'repeticoes': 1,
+    'medir_memoria': True,
+    'pausa_seg': 1,
+}
+
+def carregar_matriz(nome_arquivo):
+    import json
+    with open(nome_arquivo, 'r', encoding='utf-8') as f:
+        matriz = json.load(f)
+    desconhecidas = set(matriz) - set(MATRIZ_PADRAO)
+    if desconhecidas:
+        raise ValueError(f"Chaves desconhecidas na matriz: {', '.join(sorted(desconhecidas))}")
+    return matriz
+
+def executar_todos_experimentos(cache_folhas=False, tamanho_maximo=None, semente=0, matriz=None):
+    """Executa todos os experimentos automaticamente, uma vez para cada combinação da matriz.
+    Tamanhos maiores que o arquivo usam transações geradas (gerador.py) com construção em fluxo,
+    que é sequencial e binária e por isso roda uma vez por tamanho; tamanho_maximo corta a lista"""
     print(f"{'='*70}")
     print("EXECUTANDO TODOS OS EXPERIMENTOS DE MERKLE TREE")
     print(f"{'='*70}")
     
     nome_arquivo = "transacoes.txt"
-    num_threads = 4
+    matriz = {**MATRIZ_PADRAO, **(matriz or {})}
     
     # Verifica se o arquivo existe
     if not os.path.exists(nome_arquivo):
@@ -743,21 +1540,51 @@ def executar_todos_experimentos():
         return
     
     # Lista de números de transações para testar
-    numeros_transacoes = [2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 2048, 4096, 8192, 10000]
+    numeros_transacoes = matriz['tamanhos']
+    if tamanho_maximo:
+        numeros_transacoes = [n for n in numeros_transacoes if n <= tamanho_maximo]
+    
+    with open(nome_arquivo, "rb") as f:
+        total_arquivo = sum(1 for linha in f if linha.strip())
+    
+    combinacoes = [(n, executor, representacao, aridade, num_threads)
+                   for n in numeros_transacoes
+                   for executor in matriz['executores']
+                   for representacao in matriz['representacoes']
+                   for aridade in matriz['aridades']
+                   for num_threads in matriz['num_threads']]
+    print(f"Matriz: {len(combinacoes)} combinações x {matriz['repeticoes']} repetições")
     
     resultados = []
+    sinteticos_feitos = set()
     
-    for n in numeros_transacoes:
-        sucesso = executar_experimento_automatico(
-            nome_arquivo=nome_arquivo,
-            num_threads=num_threads,
-            num_transacoes=n,
-            prefixo_saida="resultados"
-        )
-        resultados.append((n, sucesso))
-        
-        # Pequena pausa entre experimentos
-        time.sleep(1)
+    for repeticao in range(matriz['repeticoes']):
+        for n, executor, representacao, aridade, num_threads in combinacoes:
+            if n > total_arquivo:
+                # o arquivo não tem transações suficientes: gera com semente fixa e constrói em fluxo
+                if (n, repeticao) in sinteticos_feitos:
+                    continue
+                sinteticos_feitos.add((n, repeticao))
+                from gerador import executar_experimento_sintetico
+                sucesso = executar_experimento_sintetico(n, semente=semente, prefixo_saida="resultados")
+                descricao = f"{n:13,} transações (fluxo)"
+            else:
+                sucesso = executar_experimento_automatico(
+                    nome_arquivo=nome_arquivo,
+                    num_threads=num_threads,
+                    num_transacoes=n,
+                    prefixo_saida="resultados",
+                    medir_memoria=matriz['medir_memoria'],
+                    cache_folhas=cache_folhas,
+                    representacao=representacao,
+                    executor=executor,
+                    aridade=aridade
+                )
+                descricao = f"{n:13,} transações ({num_threads} {executor}, {representacao}, aridade {aridade})"
+            resultados.append((descricao, sucesso))
+            
+            # Pequena pausa entre experimentos
+            time.sleep(matriz['pausa_seg'])
     
     # Resumo
     print(f"\n{'='*70}")
@@ -769,9 +1596,9 @@ def executar_todos_experimentos():
     
     print(f"Experimentos concluídos: {sucessos}/{total}")
     
-    for n, sucesso in resultados:
+    for descricao, sucesso in resultados:
         status = "✓" if sucesso else "✗"
-        print(f"  {status} {n:5} transações")
+        print(f"  {status} {descricao}")
     
     print(f"\nArquivos salvos no diretório: resultados/")
     if os.path.exists("resultados"):
@@ -780,10 +1607,126 @@ def executar_todos_experimentos():
         for arquivo in sorted(arquivos)[:10]:  # Mostra os primeiros 10
             print(f"  - {arquivo}")
 
+def benchmark_folhas_numpy(nome_arquivo="transacoes.txt", repeticoes=5, prefixo_saida="resultados"):
+    """Compara folhas por segundo entre o caminho por string e o caminho NumPy de largura fixa"""
+    print(f"{'='*70}")
+    print("BENCHMARK: FOLHAS POR SEGUNDO (STRING x NUMPY LARGURA FIXA)")
+    print(f"{'='*70}")
+
+    if np is None:
+        print("ERRO: NumPy não está instalado (pip install numpy)")
+        return None
+
+    if not os.path.exists(nome_arquivo):
+        print(f"ERRO: Arquivo '{nome_arquivo}' não encontrado!")
+        return None
+
+    registros = carregar_transacoes_largura_fixa(nome_arquivo)
+    if registros is None:
+        print(f"ERRO: '{nome_arquivo}' não tem registros de largura fixa")
+        return None
+
+    with open(nome_arquivo, "r", encoding="utf-8") as f:
+        transacoes = [linha.strip() for linha in f if linha.strip()]
+    indices = range(len(registros))
+
+    # as duas representações têm que produzir exatamente as mesmas folhas
+    if [sha_256(sha_256(t)) for t in transacoes[:100]] != hash_folhas_largura_fixa(registros, range(100)):
+        print("ERRO: os hashes do caminho NumPy divergem do caminho por string")
+        return None
+
+    melhores = {'str': float('inf'), 'numpy': float('inf')}
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        [sha_256(sha_256(t)) for t in transacoes]
+        melhores['str'] = min(melhores['str'], time.perf_counter() - inicio)
+
+        inicio = time.perf_counter()
+        hash_folhas_largura_fixa(registros, indices)
+        melhores['numpy'] = min(melhores['numpy'], time.perf_counter() - inicio)
+
+    n = len(registros)
+    taxa_str = n / melhores['str']
+    taxa_numpy = n / melhores['numpy']
+    print(f"Registros: {n:,} de {registros.dtype.itemsize} bytes (melhor de {repeticoes})")
+    print(f"  Caminho por string: {taxa_str:,.0f} folhas/segundo")
+    print(f"  Caminho NumPy:      {taxa_numpy:,.0f} folhas/segundo")
+    print(f"  Ganho: {taxa_numpy / taxa_str:.2f}x")
+
+    os.makedirs(prefixo_saida, exist_ok=True)
+    nome_csv = f"{prefixo_saida}/benchmark_folhas_numpy.csv"
+    with open(nome_csv, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['representacao', 'num_transacoes', 'tempo_seg', 'folhas_por_segundo'])
+        writer.writerow(['str', n, round(melhores['str'], 6), round(taxa_str, 1)])
+        writer.writerow(['numpy', n, round(melhores['numpy'], 6), round(taxa_numpy, 1)])
+    print(f"\n✓ Resultados salvos em: {nome_csv}")
+
+    return taxa_str, taxa_numpy
+
+def benchmark_cache_folhas(nome_arquivo="transacoes.txt", num_threads=4, prefixo_saida="resultados"):
+    """Compara a construção fria (gera o cache) com a quente (usa o cache) e confere a invalidação"""
+    print(f"{'='*70}")
+    print("BENCHMARK: CACHE DE FOLHAS EM DISCO")
+    print(f"{'='*70}")
+
+    if not os.path.exists(nome_arquivo):
+        print(f"ERRO: Arquivo '{nome_arquivo}' não encontrado!")
+        return None
+
+    diretorio = os.path.join(prefixo_saida, "cache_folhas_benchmark")
+    caminho = caminho_cache_folhas(nome_arquivo, diretorio)
+    if os.path.exists(caminho):
+        os.remove(caminho)
+
+    fria = Merkle_tree(nome_arquivo, num_threads, cache_folhas=True, diretorio_cache=diretorio)
+    quente = Merkle_tree(nome_arquivo, num_threads, cache_folhas=True, diretorio_cache=diretorio)
+    sem_cache = Merkle_tree(nome_arquivo, num_threads)
+
+    # mesma multiset de folhas nos três casos (a ordem das folhas é sorteada)
+    mesmas_folhas = sorted(f.hash for f in quente.folhas) == sorted(f.hash for f in sem_cache.folhas)
+
+    # uma cópia do arquivo com uma transação a mais não pode reaproveitar o cache
+    copia = os.path.join(prefixo_saida, "transacoes_cache_alterado.txt")
+    with open(nome_arquivo, 'rb') as origem, open(copia, 'wb') as destino:
+        destino.write(origem.read().rstrip(b'\n') + b'\ntransacao-extra-para-invalidar\n')
+    alterada = Merkle_tree(copia, num_threads, cache_folhas=True, diretorio_cache=diretorio)
+    os.remove(copia)
+
+    print(f"\nResultados ({len(quente.folhas):,} folhas):")
+    # o frio calcula as folhas em sequência, como o quente as lê: a razão entre os dois é o ganho do cache.
+    # A construção sem cache passa pelo sorteio com list.remove das threads, então não entra na razão
+    ganho_cache = fria.tempo_construcao / quente.tempo_construcao if quente.tempo_construcao > 0 else 0
+    print(f"  Sem cache:       {sem_cache.tempo_construcao:.4f} s (threads com sorteio, só referência)")
+    print(f"  Cache frio:      {fria.tempo_construcao:.4f} s ({fria.situacao_cache})")
+    print(f"  Cache quente:    {quente.tempo_construcao:.4f} s ({quente.situacao_cache})")
+    print(f"  Ganho do cache (quente x frio): {ganho_cache:.2f}x")
+    print(f"  Mesmas folhas com e sem cache: {'✓' if mesmas_folhas else '✗'}")
+    print(f"  Arquivo alterado invalidou o cache: {'✓' if alterada.situacao_cache == 'frio' else '✗'}")
+
+    nome_csv = f"{prefixo_saida}/benchmark_cache_folhas.csv"
+    with open(nome_csv, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['num_transacoes', 'tempo_sem_cache_seg', 'tempo_cache_frio_seg', 'tempo_cache_quente_seg',
+                         'ganho_quente_x_frio'])
+        writer.writerow([len(quente.folhas), round(sem_cache.tempo_construcao, 4), round(fria.tempo_construcao, 4),
+                         round(quente.tempo_construcao, 4), round(ganho_cache, 2)])
+    print(f"\n✓ Resultados salvos em: {nome_csv}")
+
 if __name__ == "__main__":
     # Verifica se deve executar todos os experimentos
     if len(sys.argv) > 1 and sys.argv[1] == "--todos-experimentos":
-        executar_todos_experimentos()
+        tamanho_maximo = int(sys.argv[sys.argv.index("--ate") + 1]) if "--ate" in sys.argv else None
+        matriz = carregar_matriz(sys.argv[sys.argv.index("--matriz") + 1]) if "--matriz" in sys.argv else None
+        executar_todos_experimentos(cache_folhas="--cache" in sys.argv, tamanho_maximo=tamanho_maximo, matriz=matriz)
+    elif len(sys.argv) > 1 and sys.argv[1] == "--lote":
+        # consultas sem menu: python3 blockchain.py --lote transacoes.txt consultas.txt (ou - para stdin)
+        from consultas import main_lote
+        main_lote(sys.argv[2:])
+    elif len(sys.argv) > 1 and sys.argv[1] == "--benchmark-cache":
+        benchmark_cache_folhas(sys.argv[2] if len(sys.argv) > 2 else "transacoes.txt")
+    elif len(sys.argv) > 1 and sys.argv[1] == "--benchmark-numpy":
+        benchmark_folhas_numpy(sys.argv[2] if len(sys.argv) > 2 else "transacoes.txt")
     elif len(sys.argv) > 1:
         # Modo normal com argumentos
         main()
@@ -0,0 +1,389 @@
+# blocos_bitcoin.py
+# Leitura de blocos reais do Bitcoin (serialização binária da rede): cabeçalho de 80 bytes,
+# número de transações em varint e as transações. Calcula o txid de cada uma (SHA-256 duplo
+# sobre a serialização sem witness), monta a raiz de Merkle com a mesma regra de duplicação
+# do nó ímpar e confere com a raiz gravada no cabeçalho
+import os
+import sys
+import csv
+import time
+import random
+import struct
+import hashlib
+
+from cadeia import Block, TAMANHO_CABECALHO, hash_cabecalho
+from mineracao import bits_para_alvo
+
+DIRETORIO_EXEMPLOS = "blocos_exemplo"
+
+# bytes mágicos de cada rede no início de cada registro dos arquivos blk*.dat do Bitcoin Core
+MAGICOS = {
+    b'\xf9\xbe\xb4\xd9': 'main',
+    b'\x0b\x11\x09\x07': 'testnet3',
+    b'\x0a\x03\xcf\x40': 'signet',
+    b'\xfa\xbf\xb5\xda': 'regtest',
+}
+
+
+def hash_duplo(dados):
+    return hashlib.sha256(hashlib.sha256(dados).digest()).digest()
+
+
+def exibir_hash(hash_bytes):
+    """Hashes do Bitcoin são mostrados com os bytes invertidos (o inteiro little-endian em hex)"""
+    return hash_bytes[::-1].hex()
+
+
+def ler_varint(dados, pos):
+    """CompactSize: até 0xfc é o próprio byte; 0xfd, 0xfe e 0xff anunciam 2, 4 e 8 bytes little-endian"""
+    primeiro = dados[pos]
+    if primeiro < 0xfd:
+        return primeiro, pos + 1
+    tamanho = 2 if primeiro == 0xfd else 4 if primeiro == 0xfe else 8
+    return int.from_bytes(dados[pos + 1:pos + 1 + tamanho], 'little'), pos + 1 + tamanho
+
+
+def codificar_varint(valor):
+    if valor < 0xfd:
+        return bytes([valor])
+    if valor <= 0xffff:
+        return b'\xfd' + valor.to_bytes(2, 'little')
+    if valor <= 0xffffffff:
+        return b'\xfe' + valor.to_bytes(4, 'little')
+    return b'\xff' + valor.to_bytes(8, 'little')
+
+
+def ler_transacao(dados, pos):
+    """Lê uma transação a partir de 'pos' (dados é um memoryview). Devolve (txid, fim).
+    Em transações segwit (marcador 0x00 e flag 0x01 depois da versão) o txid deixa de fora
+    o marcador, a flag e as witnesses, então o hash é feito em pedaços, sem copiar"""
+    inicio = pos
+    pos += 4  # versão
+    segwit = dados[pos] == 0 and dados[pos + 1] != 0
+    if segwit:
+        pos += 2
+    inicio_corpo = pos
+
+    num_entradas, pos = ler_varint(dados, pos)
+    for _ in range(num_entradas):
+        pos += 36  # saída gasta: txid anterior (32) e índice (4)
+        tamanho_script, pos = ler_varint(dados, pos)
+        pos += tamanho_script + 4  # script de desbloqueio e sequência
+    num_saidas, pos = ler_varint(dados, pos)
+    for _ in range(num_saidas):
+        pos += 8  # valor em satoshis
+        tamanho_script, pos = ler_varint(dados, pos)
+        pos += tamanho_script
+    fim_corpo = pos
+
+    if segwit:
+        for _ in range(num_entradas):
+            num_itens, pos = ler_varint(dados, pos)
+            for _ in range(num_itens):
+                tamanho_item, pos = ler_varint(dados, pos)
+                pos += tamanho_item
+    pos += 4  # locktime
+    if pos > len(dados):
+        raise ValueError(f"Transação em {inicio} passa do fim do bloco")
+
+    if segwit:
+        primeiro = hashlib.sha256(dados[inicio:inicio + 4])
+        primeiro.update(dados[inicio_corpo:fim_corpo])
+        primeiro.update(dados[pos - 4:pos])
+        txid = hashlib.sha256(primeiro.digest()).digest()
+    else:
+        txid = hash_duplo(dados[inicio:pos])
+    return txid, pos
+
+
+def raiz_merkle_txids(txids):
+    """Raiz de Merkle do Bitcoin sobre os txids (bytes, ordem interna): nível ímpar repete o último
+    hash, a mesma regra do monta_tudo, só que concatenando os 32 bytes e não o hex.
+    Devolve (raiz, mutado): mutado indica dois hashes iguais lado a lado já vindos do bloco,
+    o caso em que um bloco diferente (com transações repetidas no fim) teria a mesma raiz"""
+    nivel = list(txids)
+    mutado = False
+    while len(nivel) > 1:
+        for i in range(0, len(nivel) - 1, 2):
+            if nivel[i] == nivel[i + 1]:
+                mutado = True
+        if len(nivel) % 2:
+            nivel.append(nivel[-1])
+        nivel = [hash_duplo(nivel[i] + nivel[i + 1]) for i in range(0, len(nivel), 2)]
+    return nivel[0], mutado
+
+
+def ler_bloco(dados, pos=0, fim=None):
+    """Lê o bloco que começa em 'pos'. Devolve (Block do cabeçalho, txids, fim do bloco)"""
+    dados = memoryview(dados)
+    fim = len(dados) if fim is None else fim
+    if fim - pos < TAMANHO_CABECALHO + 1:
+        raise ValueError(f"Bloco em {pos} menor que o cabeçalho")
+    bloco = Block.de_cabecalho(bytes(dados[pos:pos + TAMANHO_CABECALHO]))
+    num_transacoes, atual = ler_varint(dados, pos + TAMANHO_CABECALHO)
+    limite = dados[:fim]
+    txids = []
+    try:
+        for _ in range(num_transacoes):
+            txid, atual = ler_transacao(limite, atual)
+            txids.append(txid)
+    except IndexError:
+        raise ValueError(f"Bloco em {pos} termina no meio de uma transação") from None
+    return bloco, txids, atual
+
+
+def verificar_bloco(dados, pos=0, fim=None):
+    """Lê o bloco e confere a raiz de Merkle calculada com a do cabeçalho"""
+    bloco, txids, fim_bloco = ler_bloco(dados, pos, fim)
+    raiz, mutado = raiz_merkle_txids(txids) if txids else (None, False)
+    cabecalho = bytes(memoryview(dados)[pos:pos + TAMANHO_CABECALHO])
+    hash_bloco = hash_cabecalho(cabecalho)
+    raiz_cabecalho = bytes.fromhex(bloco.raiz_merkle)
+    return {
+        'hash': exibir_hash(hash_bloco),
+        'hash_anterior': exibir_hash(bytes.fromhex(bloco.hash_anterior)),
+        'num_transacoes': len(txids),
+        'tamanho_bytes': fim_bloco - pos,
+        'raiz_cabecalho': exibir_hash(raiz_cabecalho),
+        'raiz_calculada': exibir_hash(raiz) if raiz else '',
+        'raiz_ok': raiz == raiz_cabecalho and not mutado,
+        'mutado': mutado,
+        # o alvo vale para o hash lido como inteiro little-endian
+        'prova_trabalho_ok': int.from_bytes(hash_bloco, 'little') <= bits_para_alvo(bloco.bits),
+        'txids': [exibir_hash(txid) for txid in txids],
+    }
+
+
+def desofuscar(dados, chave):
+    """O Bitcoin Core 28+ grava os blk*.dat com XOR de uma chave de 8 bytes (arquivo xor.dat)"""
+    if not chave.strip(b'\0'):
+        return dados
+    repetida = (chave * (len(dados) // len(chave) + 1))[:len(dados)]
+    return (int.from_bytes(dados, 'little') ^ int.from_bytes(repetida, 'little')).to_bytes(len(dados), 'little')
+
+
+def ler_arquivo_blocos(nome_arquivo):
+    """Lê um arquivo de blocos e devolve [(rede, início, fim)] de cada bloco.
+    Aceita um blk*.dat (registros mágico + tamanho + bloco, com o xor.dat do diretório se existir)
+    ou um arquivo só com a serialização de um bloco"""
+    with open(nome_arquivo, 'rb') as f:
+        dados = f.read()
+    arquivo_xor = os.path.join(os.path.dirname(nome_arquivo), "xor.dat")
+    if os.path.exists(arquivo_xor):
+        with open(arquivo_xor, 'rb') as f:
+            dados = desofuscar(dados, f.read())
+
+    if dados[:4] not in MAGICOS:
+        return dados, [(None, 0, len(dados))]
+
+    blocos = []
+    pos = 0
+    while pos + 8 <= len(dados):
+        magico = dados[pos:pos + 4]
+        if magico == b'\0\0\0\0':
+            break  # o Bitcoin Core pré-aloca o arquivo com zeros
+        if magico not in MAGICOS:
+            raise ValueError(f"Bytes mágicos desconhecidos em {pos} de '{nome_arquivo}': {magico.hex()}")
+        tamanho = struct.unpack_from('<I', dados, pos + 4)[0]
+        if pos + 8 + tamanho > len(dados):
+            raise ValueError(f"Registro em {pos} de '{nome_arquivo}' passa do fim do arquivo")
+        blocos.append((MAGICOS[magico], pos + 8, pos + 8 + tamanho))
+        pos += 8 + tamanho
+    return dados, blocos
+
+
+def verificar_arquivo(nome_arquivo, mostrar_txids=False):
+    """Confere a raiz de Merkle de todos os blocos do arquivo; devolve a lista de resultados"""
+    dados, blocos = ler_arquivo_blocos(nome_arquivo)
+    resultados = []
+    for rede, inicio, fim in blocos:
+        resultado = verificar_bloco(dados, inicio, fim)
+        resultado['rede'] = rede or '-'
+        resultados.append(resultado)
+        marca = "✓" if resultado['raiz_ok'] else "✗"
+        print(f"  {marca} {resultado['hash']} ({resultado['rede']}): {resultado['num_transacoes']} transações, "
+              f"{resultado['tamanho_bytes']:,} bytes, prova de trabalho {'ok' if resultado['prova_trabalho_ok'] else 'inválida'}")
+        if not resultado['raiz_ok']:
+            print(f"      raiz do cabeçalho: {resultado['raiz_cabecalho']}")
+            print(f"      raiz calculada:    {resultado['raiz_calculada']}"
+                  + ("  (transações repetidas: bloco mutado)" if resultado['mutado'] else ""))
+        if mostrar_txids:
+            for txid in resultado['txids']:
+                print(f"      {txid}")
+    return resultados
+
+
+# ---------------------------------------------------------------------------
+# Blocos de exemplo: os gênesis reais de main, testnet3 e regtest, mais uma cadeia
+# regtest sintética (transações no formato real, legadas e segwit) com vários números
+# de transações, para exercitar a duplicação do nó ímpar
+
+TRANSACAO_GENESIS = bytes.fromhex(
+    "01000000" "01" + "00" * 32 + "ffffffff" "4d"
+    "04ffff001d0104455468652054696d65732030332f4a616e2f32303039204368616e63656c6c6f72206f6e20"
+    "6272696e6b206f66207365636f6e64206261696c6f757420666f722062616e6b73"
+    "ffffffff" "01" "00f2052a01000000" "43"
+    "4104678afdb0fe5548271967f1a67130b7105cd6a828e03909a67962e0ea1f61deb649f6bc3f4cef38c4f35504e5"
+    "1ec112de5c384df7ba0b8d578a4c702b6bf11d5fac" "00000000")
+
+# (nome, timestamp, bits, nonce) de cada gênesis; todos usam a mesma transação
+GENESIS = [
+    ("main", 1231006505, 0x1d00ffff, 2083236893),
+    ("testnet3", 1296688602, 0x1d00ffff, 414098458),
+    ("regtest", 1296688602, 0x207fffff, 2),
+]
+
+TRANSACOES_POR_BLOCO_EXEMPLO = (1, 2, 3, 5, 7, 16, 17, 64, 101, 255, 1001)
+
+
+def serializar_bloco(bloco, transacoes):
+    return bloco.cabecalho() + codificar_varint(len(transacoes)) + b''.join(transacoes)
+
+
+def bloco_genesis(timestamp, bits, nonce):
+    raiz, _ = raiz_merkle_txids([hash_duplo(TRANSACAO_GENESIS)])
+    bloco = Block('00' * 32, raiz.hex(), timestamp, nonce, bits, versao=1)
+    return serializar_bloco(bloco, [TRANSACAO_GENESIS])
+
+
+def transacao_sintetica(gerador, altura=None, segwit=False):
+    """Transação no formato da rede com scripts aleatórios de tamanhos típicos (P2PKH/P2WPKH).
+    Com altura, é a coinbase do bloco (altura no script, como manda o BIP34)"""
+    versao = struct.pack('<I', 2 if segwit else 1)
+    if altura is not None:
+        script = bytes([3]) + altura.to_bytes(3, 'little') + gerador.randbytes(gerador.randint(4, 40))
+        entradas = [b'\0' * 32 + b'\xff\xff\xff\xff' + codificar_varint(len(script)) + script + b'\xff\xff\xff\xff']
+    else:
+        entradas = []
+        for _ in range(gerador.choice((1, 1, 1, 2, 3))):
+            script = b'' if segwit else gerador.randbytes(gerador.randint(106, 108))
+            entradas.append(gerador.randbytes(32) + struct.pack('<I', gerador.randrange(4))
+                            + codificar_varint(len(script)) + script + b'\xfd\xff\xff\xff')
+    saidas = []
+    for _ in range(gerador.choice((1, 2, 2, 3))):
+        script = (b'\x00\x14' + gerador.randbytes(20) if segwit
+                  else b'\x76\xa9\x14' + gerador.randbytes(20) + b'\x88\xac')
+        saidas.append(struct.pack('<Q', gerador.randrange(1, 5 * 10**9)) + codificar_varint(len(script)) + script)
+
+    corpo = codificar_varint(len(entradas)) + b''.join(entradas) + codificar_varint(len(saidas)) + b''.join(saidas)
+    locktime = b'\0\0\0\0'
+    if not segwit or altura is not None:
+        return versao + corpo + locktime
+    witness = b''.join(b'\x02' + b'\x48' + gerador.randbytes(72) + b'\x21' + gerador.randbytes(33) for _ in entradas)
+    return versao + b'\x00\x01' + corpo + witness + locktime
+
+
+def gerar_blocos_exemplo(diretorio=DIRETORIO_EXEMPLOS, semente=0, transacoes_por_bloco=TRANSACOES_POR_BLOCO_EXEMPLO):
+    """Grava os gênesis reais (um bloco por arquivo) e um blk00000.dat regtest com o gênesis
+    seguido dos blocos sintéticos, cada um minerado no alvo do regtest e ligado ao anterior"""
+    os.makedirs(diretorio, exist_ok=True)
+    for nome, timestamp, bits, nonce in GENESIS:
+        with open(os.path.join(diretorio, f"genesis_{nome}.blk"), 'wb') as f:
+            f.write(bloco_genesis(timestamp, bits, nonce))
+
+    gerador = random.Random(semente)
+    magico = next(m for m, rede in MAGICOS.items() if rede == 'regtest')
+    _, timestamp, bits, nonce = GENESIS[2]
+    serializados = [bloco_genesis(timestamp, bits, nonce)]
+    anterior = hash_cabecalho(serializados[0][:TAMANHO_CABECALHO])
+    for altura, quantidade in enumerate(transacoes_por_bloco, start=1):
+        segwit = altura % 2 == 0
+        transacoes = [transacao_sintetica(gerador, altura=altura)]
+        transacoes += [transacao_sintetica(gerador, segwit=segwit and gerador.random() < 0.7)
+                       for _ in range(quantidade - 1)]
+        txids = [ler_transacao(memoryview(t), 0)[0] for t in transacoes]
+        raiz, _ = raiz_merkle_txids(txids)
+        bloco = Block(anterior.hex(), raiz.hex(), timestamp + 600 * altura, 0, bits, versao=0x20000000)
+        while int.from_bytes(hash_cabecalho(bloco.cabecalho()), 'little') > bits_para_alvo(bits):
+            bloco.nonce += 1
+        serializados.append(serializar_bloco(bloco, transacoes))
+        anterior = hash_cabecalho(bloco.cabecalho())
+
+    nome_blk = os.path.join(diretorio, "blk00000.dat")
+    with open(nome_blk, 'wb') as f:
+        for serializado in serializados:
+            f.write(magico + struct.pack('<I', len(serializado)) + serializado)
+    print(f"✓ {len(GENESIS)} gênesis e {len(serializados)} blocos regtest gravados em: {diretorio}")
+    return nome_blk
+
+
+def benchmark_blocos_bitcoin(diretorio=DIRETORIO_EXEMPLOS, duracao_minima=2.0, prefixo_saida="resultados"):
+    """Blocos por segundo (leitura, txids e raiz) sobre os blocos de exemplo, e a detecção de um byte alterado"""
+    print(f"{'='*70}")
+    print("BENCHMARK: LEITURA DE BLOCOS DO BITCOIN E RAIZ DE MERKLE DOS TXIDS")
+    print(f"{'='*70}")
+
+    if not os.path.isdir(diretorio):
+        print(f"ERRO: Diretório '{diretorio}' não encontrado!")
+        return None
+
+    arquivos = sorted(os.path.join(diretorio, nome) for nome in os.listdir(diretorio)
+                      if nome.endswith(('.blk', '.dat')) and nome != "xor.dat")
+    blocos = []  # (dados, início, fim) de todos os arquivos
+    for nome_arquivo in arquivos:
+        print(f"\n{nome_arquivo}:")
+        resultados = verificar_arquivo(nome_arquivo)
+        if not all(r['raiz_ok'] for r in resultados):
+            print(f"ERRO: raiz de Merkle não confere em '{nome_arquivo}'")
+            return None
+        dados, posicoes = ler_arquivo_blocos(nome_arquivo)
+        blocos += [(dados, inicio, fim) for _, inicio, fim in posicoes]
+
+    num_transacoes = sum(verificar_bloco(dados, inicio, fim)['num_transacoes'] for dados, inicio, fim in blocos)
+    num_bytes = sum(fim - inicio for _, inicio, fim in blocos)
+
+    # repete a passada inteira até somar pelo menos duracao_minima segundos
+    passadas = 0
+    inicio_total = time.perf_counter()
+    while True:
+        for dados, inicio, fim in blocos:
+            _, txids, _ = ler_bloco(dados, inicio, fim)
+            raiz_merkle_txids(txids)
+        passadas += 1
+        tempo_total = time.perf_counter() - inicio_total
+        if tempo_total >= duracao_minima:
+            break
+
+    blocos_por_segundo = passadas * len(blocos) / tempo_total
+    transacoes_por_segundo = passadas * num_transacoes / tempo_total
+    mb_por_segundo = passadas * num_bytes / tempo_total / 2**20
+    print(f"\n  {len(blocos)} blocos, {num_transacoes:,} transações, {num_bytes / 2**10:,.1f} KiB ({passadas} passadas)")
+    print(f"  {blocos_por_segundo:,.0f} blocos/s, {transacoes_por_segundo:,.0f} transações/s, {mb_por_segundo:.1f} MiB/s")
+
+    # um byte trocado dentro de uma transação do maior bloco tem que derrubar a raiz
+    dados, inicio, fim = max(blocos, key=lambda b: b[2] - b[1])
+    alterado = bytearray(dados[inicio:fim])
+    alterado[(len(alterado) + TAMANHO_CABECALHO) // 2] ^= 0x01
+    detectado = not verificar_bloco(bytes(alterado))['raiz_ok']
+    print(f"  Byte alterado no maior bloco: {'detectado' if detectado else 'NÃO detectado'}")
+
+    os.makedirs(prefixo_saida, exist_ok=True)
+    nome_csv = f"{prefixo_saida}/benchmark_blocos_bitcoin.csv"
+    with open(nome_csv, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['num_blocos', 'num_transacoes', 'num_bytes', 'passadas', 'blocos_por_segundo',
+                         'transacoes_por_segundo', 'mb_por_segundo', 'alteracao_detectada'])
+        writer.writerow([len(blocos), num_transacoes, num_bytes, passadas, round(blocos_por_segundo, 1),
+                         round(transacoes_por_segundo, 1), round(mb_por_segundo, 2), detectado])
+    print(f"\n✓ Resultados salvos em: {nome_csv}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--benchmark":
+        benchmark_blocos_bitcoin(sys.argv[2] if len(sys.argv) > 2 else DIRETORIO_EXEMPLOS)
+    elif len(sys.argv) > 1 and sys.argv[1] == "--gerar-exemplos":
+        gerar_blocos_exemplo(sys.argv[2] if len(sys.argv) > 2 else DIRETORIO_EXEMPLOS)
+    elif len(sys.argv) > 1:
+        todos_ok = True
+        for nome_arquivo in [a for a in sys.argv[1:] if a != "--txids"]:
+            if not os.path.exists(nome_arquivo):
+                print(f"ERRO: Arquivo '{nome_arquivo}' não encontrado!")
+                sys.exit(2)
+            print(f"{nome_arquivo}:")
+            todos_ok &= all(r['raiz_ok'] for r in verificar_arquivo(nome_arquivo, "--txids" in sys.argv))
+        sys.exit(0 if todos_ok else 1)
+    else:
+        print("Uso: python3 blocos_bitcoin.py <arquivo.blk|blk*.dat>... [--txids]")
+        print("     python3 blocos_bitcoin.py --benchmark [diretório]")
+        print("     python3 blocos_bitcoin.py --gerar-exemplos [diretório]")
+        sys.exit(2)
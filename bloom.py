@@ -0,0 +1,173 @@
+# bloom.py
+# Filtro de Bloom na frente da busca: a maioria das consultas é de transações que não estão
+# na árvore, e o filtro responde "com certeza não está" sem percorrer nenhum nó
+import os
+import sys
+import csv
+import math
+import time
+import struct
+
+MAGICO_BLOOM = b'MKBF'
+FORMATO_CABECALHO_BLOOM = struct.Struct('<4sQIQ')  # mágico, bits, funções de hash, itens
+
+
+class Filtro_bloom:
+    def __init__(self, num_itens, taxa_falsos_positivos=0.01, num_bits=None, num_hashes=None):
+        num_itens = max(1, num_itens)
+        # tamanho ótimo: m = -n ln p / (ln 2)^2 bits e k = (m / n) ln 2 funções de hash
+        if num_bits is None:
+            num_bits = max(8, math.ceil(-num_itens * math.log(taxa_falsos_positivos) / math.log(2) ** 2))
+        if num_hashes is None:
+            num_hashes = max(1, round(num_bits / num_itens * math.log(2)))
+        self.num_bits = num_bits
+        self.num_hashes = num_hashes
+        self.capacidade = num_itens
+        self.taxa_alvo = taxa_falsos_positivos
+        self.bits = bytearray((num_bits + 7) // 8)
+        self.itens = 0
+
+        # estatísticas das consultas
+        self.consultas = 0
+        self.negativos = 0  # rejeitadas pelo filtro sem tocar na árvore
+        self.falsos_positivos = 0  # o filtro deixou passar e a árvore não tinha
+
+    def _posicoes(self, hash_folha):
+        # o hash da folha já é um SHA-256: dois pedaços de 64 bits dele bastam para o hash duplo
+        # de Kirsch-Mitzenmacher, h1 + i*h2, sem calcular mais nenhum hash
+        h1 = int(hash_folha[:16], 16)
+        h2 = int(hash_folha[16:32], 16) | 1
+        m = self.num_bits
+        return [(h1 + i * h2) % m for i in range(self.num_hashes)]
+
+    def adicionar(self, hash_folha):
+        for p in self._posicoes(hash_folha):
+            self.bits[p >> 3] |= 1 << (p & 7)
+        self.itens += 1
+
+    def contem(self, hash_folha):
+        """False = com certeza não está; True = provavelmente está"""
+        self.consultas += 1
+        bits = self.bits
+        for p in self._posicoes(hash_folha):
+            if not bits[p >> 3] & (1 << (p & 7)):
+                self.negativos += 1
+                return False
+        return True
+
+    def contem_todos(self, hashes_folhas):
+        """Confere se todos os hashes passam no filtro, sem contar como consultas"""
+        bits = self.bits
+        return all(bits[p >> 3] & (1 << (p & 7)) for h in hashes_folhas for p in self._posicoes(h))
+
+    def registrar_falso_positivo(self):
+        self.falsos_positivos += 1
+
+    def bytes_memoria(self):
+        return len(self.bits)
+
+    def taxa_falsos_positivos_estimada(self):
+        # (1 - e^(-k n / m))^k com o número de itens realmente inseridos
+        return (1 - math.exp(-self.num_hashes * self.itens / self.num_bits)) ** self.num_hashes
+
+    def estatisticas(self):
+        positivos = self.consultas - self.negativos
+        return {
+            'bloom_bits': self.num_bits,
+            'bloom_hashes': self.num_hashes,
+            'bloom_bytes': self.bytes_memoria(),
+            'bloom_itens': self.itens,
+            'bloom_consultas': self.consultas,
+            'bloom_negativos': self.negativos,
+            'bloom_positivos': positivos,
+            'bloom_falsos_positivos': self.falsos_positivos,
+            'bloom_taxa_fp_estimada': self.taxa_falsos_positivos_estimada(),
+            'bloom_taxa_fp_observada': self.falsos_positivos / (self.falsos_positivos + self.negativos)
+                                       if self.falsos_positivos + self.negativos else 0.0,
+        }
+
+    def serializar(self):
+        return FORMATO_CABECALHO_BLOOM.pack(MAGICO_BLOOM, self.num_bits, self.num_hashes, self.itens) + bytes(self.bits)
+
+    @classmethod
+    def desserializar(cls, dados):
+        magico, num_bits, num_hashes, itens = FORMATO_CABECALHO_BLOOM.unpack_from(dados, 0)
+        if magico != MAGICO_BLOOM:
+            raise ValueError("Arquivo não é um filtro de Bloom")
+        filtro = cls(max(1, itens), num_bits=num_bits, num_hashes=num_hashes)
+        corpo = dados[FORMATO_CABECALHO_BLOOM.size:]
+        if len(corpo) != len(filtro.bits):
+            raise ValueError("Filtro de Bloom truncado")
+        filtro.bits[:] = corpo
+        filtro.itens = itens
+        return filtro
+
+    def salvar(self, nome_arquivo):
+        temporario = nome_arquivo + ".tmp"
+        with open(temporario, 'wb') as f:
+            f.write(self.serializar())
+        os.replace(temporario, nome_arquivo)
+
+    @classmethod
+    def carregar(cls, nome_arquivo):
+        with open(nome_arquivo, 'rb') as f:
+            return cls.desserializar(f.read())
+
+
+def benchmark_bloom(nome_arquivo="transacoes.txt", num_consultas=2000, fracao_ausentes=0.9,
+                    taxa_falsos_positivos=0.01, prefixo_saida="resultados"):
+    """Compara o tempo médio da busca com e sem filtro em um tráfego com maioria de transações ausentes"""
+    import io
+    import random
+    import contextlib
+    from blockchain import Merkle_tree
+
+    print(f"{'='*70}")
+    print(f"BENCHMARK: FILTRO DE BLOOM ({fracao_ausentes:.0%} das consultas ausentes)")
+    print(f"{'='*70}")
+
+    if not os.path.exists(nome_arquivo):
+        print(f"ERRO: Arquivo '{nome_arquivo}' não encontrado!")
+        return None
+
+    linhas = []
+    consultas = None
+    for com_filtro in (False, True):
+        with contextlib.redirect_stdout(io.StringIO()):
+            arvore = Merkle_tree(nome_arquivo, filtro_bloom=com_filtro, taxa_falsos_positivos=taxa_falsos_positivos)
+        if consultas is None:
+            presentes = list(arvore.transacoes_selecionadas)
+            consultas = [f"ausente-{i}" if random.random() < fracao_ausentes else random.choice(presentes)
+                         for i in range(num_consultas)]
+
+        inicio = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            for transacao in consultas:
+                arvore.busca_transacao(transacao)
+        tempo_total = time.perf_counter() - inicio
+
+        rotulo = "com filtro" if com_filtro else "sem filtro"
+        print(f"  {rotulo}: {tempo_total / num_consultas * 1000:.3f} ms por busca "
+              f"({num_consultas / tempo_total:,.0f} buscas/segundo)")
+        estatisticas = arvore.bloom.estatisticas() if arvore.bloom else {}
+        if estatisticas:
+            print(f"    {estatisticas['bloom_bytes']:,} bytes, {estatisticas['bloom_hashes']} hashes, "
+                  f"{estatisticas['bloom_negativos']:,} rejeitadas pelo filtro, "
+                  f"{estatisticas['bloom_falsos_positivos']} falsos positivos "
+                  f"(taxa observada {estatisticas['bloom_taxa_fp_observada']:.2%})")
+        linhas.append([len(arvore.folhas), num_consultas, fracao_ausentes, int(com_filtro),
+                       round(tempo_total / num_consultas * 1000, 4), estatisticas.get('bloom_bytes', 0),
+                       estatisticas.get('bloom_falsos_positivos', 0)])
+
+    os.makedirs(prefixo_saida, exist_ok=True)
+    nome_csv = f"{prefixo_saida}/benchmark_bloom.csv"
+    with open(nome_csv, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['num_folhas', 'num_consultas', 'fracao_ausentes', 'com_filtro', 'tempo_medio_busca_ms',
+                         'bloom_bytes', 'falsos_positivos'])
+        writer.writerows(linhas)
+    print(f"\n✓ Resultados salvos em: {nome_csv}")
+
+
+if __name__ == "__main__":
+    benchmark_bloom(sys.argv[1] if len(sys.argv) > 1 else "transacoes.txt")
@@ -0,0 +1,258 @@
+# cadeia.py
+# Camada de blocos: cabeçalhos ligados pelo hash anterior, gravados em arquivo binário
+# só de acréscimo (append-only) com índice hash -> altura e leitura via mmap
+import os
+import sys
+import csv
+import mmap
+import time
+import random
+import struct
+import hashlib
+
+from blockchain import hash_transacao, montar_niveis
+
+# cabeçalho no mesmo layout de 80 bytes do Bitcoin:
+# versão, hash anterior, raiz de Merkle, timestamp, bits (alvo compacto) e nonce
+FORMATO_CABECALHO = struct.Struct('<I32s32sIII')
+TAMANHO_CABECALHO = FORMATO_CABECALHO.size
+TAMANHO_HASH = 32
+HASH_ZERO = '00' * TAMANHO_HASH
+BITS_PADRAO = 0x207fffff  # alvo mais fácil possível (o mesmo do regtest do Bitcoin)
+
+
+def hash_cabecalho(cabecalho):
+    # hash duplo em binário sobre os 80 bytes do cabeçalho
+    return hashlib.sha256(hashlib.sha256(cabecalho).digest()).digest()
+
+
+class Block:
+    def __init__(self, hash_anterior, raiz_merkle, timestamp=None, nonce=0, bits=BITS_PADRAO, versao=1, transacoes=None):
+        self.versao = versao
+        self.hash_anterior = hash_anterior  # hex
+        self.raiz_merkle = raiz_merkle  # hex, o mesmo valor de Merkle_tree.raiz.hash
+        self.timestamp = int(time.time()) if timestamp is None else int(timestamp)
+        self.bits = bits
+        self.nonce = nonce
+        self.transacoes = transacoes  # ficam só em memória, o arquivo guarda apenas cabeçalhos
+
+    @classmethod
+    def de_transacoes(cls, transacoes, hash_anterior=HASH_ZERO, **kwargs):
+        """Cria um bloco calculando a raiz de Merkle das transações (mesma regra da Merkle_tree)"""
+        if not transacoes:
+            raise ValueError("O bloco precisa de pelo menos uma transação para ter raiz de Merkle")
+        niveis = montar_niveis([hash_transacao(t) for t in transacoes])
+        return cls(hash_anterior, niveis[-1][0], transacoes=list(transacoes), **kwargs)
+
+    @classmethod
+    def de_cabecalho(cls, cabecalho):
+        versao, anterior, raiz, timestamp, bits, nonce = FORMATO_CABECALHO.unpack(cabecalho)
+        return cls(anterior.hex(), raiz.hex(), timestamp, nonce, bits, versao)
+
+    def cabecalho(self):
+        return FORMATO_CABECALHO.pack(self.versao, bytes.fromhex(self.hash_anterior), bytes.fromhex(self.raiz_merkle),
+                                      self.timestamp, self.bits, self.nonce)
+
+    @property
+    def hash(self):
+        return hash_cabecalho(self.cabecalho()).hex()
+
+    def __repr__(self):
+        return f"Block(hash={self.hash[:16]}..., anterior={self.hash_anterior[:16]}..., nonce={self.nonce})"
+
+
+class Blockchain:
+    """Cadeia de cabeçalhos em disco.
+
+    <nome>.dat guarda os cabeçalhos de 80 bytes um atrás do outro (a altura é a posição),
+    <nome>.idx guarda os hashes de 32 bytes na mesma ordem, para reabrir sem recalcular nada.
+    """
+    def __init__(self, nome_arquivo="cadeia.dat"):
+        self.nome_arquivo = nome_arquivo
+        self.nome_indice = os.path.splitext(nome_arquivo)[0] + ".idx"
+        self.indice = {}  # hash (bytes) -> altura
+        self.hashes = []  # altura -> hash (bytes)
+        self._mapa = None
+        self._tamanho_mapa = 0
+
+        self._carregar_indice()
+        self._arquivo = open(self.nome_arquivo, 'ab')
+        self._arquivo_indice = open(self.nome_indice, 'ab')
+
+    def _carregar_indice(self):
+        tamanho_dados = os.path.getsize(self.nome_arquivo) if os.path.exists(self.nome_arquivo) else 0
+        num_blocos = tamanho_dados // TAMANHO_CABECALHO
+
+        dados_indice = b''
+        if os.path.exists(self.nome_indice):
+            with open(self.nome_indice, 'rb') as f:
+                dados_indice = f.read()
+
+        # o .dat é a fonte da verdade: se a gravação foi interrompida, só o cabeçalho incompleto do fim sai
+        if tamanho_dados != num_blocos * TAMANHO_CABECALHO:
+            with open(self.nome_arquivo, 'r+b') as f:
+                f.truncate(num_blocos * TAMANHO_CABECALHO)
+
+        # o .idx é derivado do .dat: os hashes que faltam (índice ausente ou curto) são recalculados
+        # a partir dos cabeçalhos completos e o que passar do número de blocos é descartado
+        num_indexados = min(num_blocos, len(dados_indice) // TAMANHO_HASH)
+        self.hashes = [dados_indice[i * TAMANHO_HASH:(i + 1) * TAMANHO_HASH] for i in range(num_indexados)]
+        if num_indexados < num_blocos:
+            with open(self.nome_arquivo, 'rb') as f:
+                f.seek(num_indexados * TAMANHO_CABECALHO)
+                for _ in range(num_indexados, num_blocos):
+                    self.hashes.append(hash_cabecalho(f.read(TAMANHO_CABECALHO)))
+        if len(dados_indice) != num_blocos * TAMANHO_HASH:
+            with open(self.nome_indice, 'wb') as f:
+                f.write(b''.join(self.hashes))
+
+        self.indice = {h: altura for altura, h in enumerate(self.hashes)}
+
+    def __len__(self):
+        return len(self.hashes)
+
+    @property
+    def altura(self):
+        return len(self.hashes) - 1
+
+    @property
+    def ultimo_hash(self):
+        return self.hashes[-1].hex() if self.hashes else HASH_ZERO
+
+    def criar_bloco(self, transacoes, **kwargs):
+        """Cria (sem gravar) o próximo bloco, ligado ao topo atual da cadeia"""
+        return Block.de_transacoes(transacoes, hash_anterior=self.ultimo_hash, **kwargs)
+
+    def adicionar_bloco(self, bloco):
+        if bloco.hash_anterior != self.ultimo_hash:
+            raise ValueError(f"Hash anterior {bloco.hash_anterior[:16]}... não é o topo da cadeia")
+
+        cabecalho = bloco.cabecalho()
+        hash_bloco = hash_cabecalho(cabecalho)
+        if hash_bloco in self.indice:
+            raise ValueError(f"Bloco {hash_bloco.hex()[:16]}... já está na cadeia")
+
+        self._arquivo.write(cabecalho)
+        self._arquivo_indice.write(hash_bloco)
+        self.indice[hash_bloco] = len(self.hashes)
+        self.hashes.append(hash_bloco)
+        return len(self.hashes) - 1
+
+    def sincronizar(self):
+        """Descarrega os buffers e força a gravação em disco"""
+        for arquivo in (self._arquivo, self._arquivo_indice):
+            arquivo.flush()
+            os.fsync(arquivo.fileno())
+
+    def _mapa_atualizado(self, tamanho_necessario):
+        # o mmap só enxerga o tamanho do arquivo no momento em que foi criado,
+        # então remapeia quando a leitura passa do fim do mapa atual
+        if self._tamanho_mapa < tamanho_necessario:
+            self._arquivo.flush()
+            if self._mapa is not None:
+                self._mapa.close()
+            with open(self.nome_arquivo, 'rb') as f:
+                self._mapa = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self._tamanho_mapa = len(self._mapa)
+        return self._mapa
+
+    def cabecalho_por_altura(self, altura):
+        if altura < 0:
+            altura += len(self.hashes)
+        if not 0 <= altura < len(self.hashes):
+            raise IndexError(f"Altura {altura} fora da cadeia (0..{self.altura})")
+        inicio = altura * TAMANHO_CABECALHO
+        mapa = self._mapa_atualizado(inicio + TAMANHO_CABECALHO)
+        return mapa[inicio:inicio + TAMANHO_CABECALHO]
+
+    def bloco_por_altura(self, altura):
+        return Block.de_cabecalho(self.cabecalho_por_altura(altura))
+
+    def altura_do_hash(self, hash_bloco):
+        if isinstance(hash_bloco, str):
+            hash_bloco = bytes.fromhex(hash_bloco)
+        return self.indice.get(hash_bloco)
+
+    def bloco_por_hash(self, hash_bloco):
+        altura = self.altura_do_hash(hash_bloco)
+        return None if altura is None else self.bloco_por_altura(altura)
+
+    def verificar_cadeia(self):
+        """Confere se cada cabeçalho aponta para o hash do anterior"""
+        anterior = HASH_ZERO
+        for altura in range(len(self.hashes)):
+            bloco = self.bloco_por_altura(altura)
+            if bloco.hash_anterior != anterior:
+                return altura
+            anterior = bloco.hash
+        return None
+
+    def fechar(self):
+        self._arquivo.close()
+        self._arquivo_indice.close()
+        if self._mapa is not None:
+            self._mapa.close()
+            self._mapa = None
+
+
+def benchmark_cadeia(num_blocos=10000, nome_arquivo="resultados/cadeia_benchmark.dat", prefixo_saida="resultados"):
+    """Mede blocos acrescentados por segundo e consultas por altura/hash por segundo"""
+    print(f"{'='*70}")
+    print(f"BENCHMARK: CADEIA DE BLOCOS COM {num_blocos:,} BLOCOS")
+    print(f"{'='*70}")
+
+    os.makedirs(prefixo_saida, exist_ok=True)
+    for arquivo in (nome_arquivo, os.path.splitext(nome_arquivo)[0] + ".idx"):
+        if os.path.exists(arquivo):
+            os.remove(arquivo)
+
+    cadeia = Blockchain(nome_arquivo)
+    raizes = [hash_transacao(str(i)) for i in range(num_blocos)]
+
+    inicio = time.perf_counter()
+    for i in range(num_blocos):
+        cadeia.adicionar_bloco(Block(cadeia.ultimo_hash, raizes[i], nonce=i))
+    cadeia.sincronizar()
+    tempo_acrescimo = time.perf_counter() - inicio
+
+    alturas = [random.randrange(num_blocos) for _ in range(num_blocos)]
+    inicio = time.perf_counter()
+    for altura in alturas:
+        cadeia.bloco_por_altura(altura)
+    tempo_altura = time.perf_counter() - inicio
+
+    hashes = [cadeia.hashes[a] for a in alturas]
+    inicio = time.perf_counter()
+    for hash_bloco in hashes:
+        cadeia.bloco_por_hash(hash_bloco)
+    tempo_hash = time.perf_counter() - inicio
+
+    quebra = cadeia.verificar_cadeia()
+    cadeia.fechar()
+
+    # reabre para conferir que o índice volta do disco
+    inicio = time.perf_counter()
+    reaberta = Blockchain(nome_arquivo)
+    tempo_reabertura = time.perf_counter() - inicio
+    reaberta_ok = len(reaberta) == num_blocos and reaberta.bloco_por_altura(-1).nonce == num_blocos - 1
+    reaberta.fechar()
+
+    print(f"  Acréscimo: {num_blocos / tempo_acrescimo:,.0f} blocos/segundo")
+    print(f"  Consulta por altura: {num_blocos / tempo_altura:,.0f} consultas/segundo")
+    print(f"  Consulta por hash: {num_blocos / tempo_hash:,.0f} consultas/segundo")
+    print(f"  Reabertura do índice: {tempo_reabertura*1000:.2f} ms")
+    print(f"  Ligações da cadeia: {'✓ íntegras' if quebra is None else f'✗ quebra na altura {quebra}'}")
+    print(f"  Reabertura: {'✓' if reaberta_ok else '✗'}")
+
+    nome_csv = f"{prefixo_saida}/benchmark_cadeia.csv"
+    with open(nome_csv, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['num_blocos', 'blocos_por_segundo', 'consultas_altura_por_segundo',
+                         'consultas_hash_por_segundo', 'tempo_reabertura_ms'])
+        writer.writerow([num_blocos, round(num_blocos / tempo_acrescimo, 1), round(num_blocos / tempo_altura, 1),
+                         round(num_blocos / tempo_hash, 1), round(tempo_reabertura * 1000, 2)])
+    print(f"\n✓ Resultados salvos em: {nome_csv}")
+
+
+if __name__ == "__main__":
+    benchmark_cadeia(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
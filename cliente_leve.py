@@ -0,0 +1,154 @@
+# cliente_leve.py
+# Cliente leve (SPV): guarda só os cabeçalhos dos blocos e verifica afirmações
+# "a transação X está no bloco H" usando a raiz de Merkle do cabeçalho e a prova de inclusão
+import os
+import sys
+import csv
+import time
+import random
+import tracemalloc
+
+from blockchain import hash_transacao, montar_niveis, caminho_dos_niveis, aplicar_caminho
+from cadeia import Block, Blockchain, TAMANHO_CABECALHO, HASH_ZERO, hash_cabecalho
+
+# posição da raiz de Merkle dentro dos 80 bytes (depois da versão e do hash anterior)
+INICIO_RAIZ = 4 + 32
+FIM_RAIZ = INICIO_RAIZ + 32
+
+
+class Cliente_leve:
+    def __init__(self):
+        # todos os cabeçalhos em um bytearray contínuo: 80 bytes por bloco e nada mais
+        self.cabecalhos = bytearray()
+        self.ultimo_hash = bytes.fromhex(HASH_ZERO)
+
+    def __len__(self):
+        return len(self.cabecalhos) // TAMANHO_CABECALHO
+
+    def adicionar_cabecalho(self, cabecalho):
+        """Aceita o cabeçalho só se ele apontar para o último cabeçalho conhecido"""
+        if cabecalho[4:INICIO_RAIZ] != self.ultimo_hash:
+            raise ValueError(f"Cabeçalho na altura {len(self)} não liga com o anterior")
+        self.cabecalhos += cabecalho
+        self.ultimo_hash = hash_cabecalho(cabecalho)
+
+    def sincronizar(self, cadeia):
+        """Baixa da cadeia completa os cabeçalhos que ainda faltam"""
+        for altura in range(len(self), len(cadeia)):
+            self.adicionar_cabecalho(cadeia.cabecalho_por_altura(altura))
+        return len(self)
+
+    def raiz_merkle(self, altura):
+        inicio = altura * TAMANHO_CABECALHO
+        return self.cabecalhos[inicio + INICIO_RAIZ:inicio + FIM_RAIZ].hex()
+
+    def verificar(self, transacao, altura, caminho):
+        if not 0 <= altura < len(self):
+            return False
+        return aplicar_caminho(hash_transacao(transacao), caminho) == self.raiz_merkle(altura)
+
+    def verificar_lote(self, afirmacoes):
+        """Verifica uma lista de (transacao, altura, caminho), agrupando por bloco para ler cada cabeçalho uma vez.
+        Retorna a lista de resultados na mesma ordem da entrada"""
+        por_bloco = {}
+        for posicao, (transacao, altura, caminho) in enumerate(afirmacoes):
+            por_bloco.setdefault(altura, []).append((posicao, transacao, caminho))
+
+        resultados = [False] * len(afirmacoes)
+        for altura, grupo in por_bloco.items():
+            if not 0 <= altura < len(self):
+                continue
+            raiz = self.raiz_merkle(altura)
+            for posicao, transacao, caminho in grupo:
+                resultados[posicao] = aplicar_caminho(hash_transacao(transacao), caminho) == raiz
+        return resultados
+
+
+def benchmark_cliente_leve(nome_arquivo="transacoes.txt", transacoes_por_bloco=100, num_afirmacoes=20000,
+                           num_cabecalhos_memoria=100000, prefixo_saida="resultados"):
+    """Mede afirmações verificadas por segundo e a memória do cliente por milhão de cabeçalhos"""
+    print(f"{'='*70}")
+    print("BENCHMARK: CLIENTE LEVE (SPV)")
+    print(f"{'='*70}")
+
+    if not os.path.exists(nome_arquivo):
+        print(f"ERRO: Arquivo '{nome_arquivo}' não encontrado!")
+        return None
+
+    with open(nome_arquivo, "r", encoding="utf-8") as f:
+        transacoes = [linha.strip() for linha in f if linha.strip()]
+
+    # lado do nó completo: monta os blocos, grava os cabeçalhos e guarda os níveis para gerar provas
+    os.makedirs(prefixo_saida, exist_ok=True)
+    nome_cadeia = f"{prefixo_saida}/cadeia_spv.dat"
+    for arquivo in (nome_cadeia, os.path.splitext(nome_cadeia)[0] + ".idx"):
+        if os.path.exists(arquivo):
+            os.remove(arquivo)
+
+    cadeia = Blockchain(nome_cadeia)
+    blocos = []
+    for inicio in range(0, len(transacoes), transacoes_por_bloco):
+        lote = transacoes[inicio:inicio + transacoes_por_bloco]
+        niveis = montar_niveis([hash_transacao(t) for t in lote])
+        cadeia.adicionar_bloco(Block(cadeia.ultimo_hash, niveis[-1][0]))
+        blocos.append((lote, niveis))
+
+    afirmacoes = []
+    for _ in range(num_afirmacoes):
+        altura = random.randrange(len(blocos))
+        lote, niveis = blocos[altura]
+        posicao = random.randrange(len(lote))
+        afirmacoes.append((lote[posicao], altura, caminho_dos_niveis(niveis, posicao)))
+
+    # lado do cliente leve: só os cabeçalhos
+    cliente = Cliente_leve()
+    cliente.sincronizar(cadeia)
+    cadeia.fechar()
+
+    inicio = time.perf_counter()
+    resultados = cliente.verificar_lote(afirmacoes)
+    tempo_lote = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    for transacao, altura, caminho in afirmacoes:
+        cliente.verificar(transacao, altura, caminho)
+    tempo_individual = time.perf_counter() - inicio
+
+    # uma afirmação falsa tem que ser rejeitada
+    transacao, altura, caminho = afirmacoes[0]
+    falsa_rejeitada = not cliente.verificar(transacao + "x", altura, caminho)
+
+    # memória: cabeçalhos sintéticos encadeados, medidos com tracemalloc
+    tracemalloc.start()
+    cliente_memoria = Cliente_leve()
+    anterior = HASH_ZERO
+    for i in range(num_cabecalhos_memoria):
+        bloco = Block(anterior, hash_transacao(str(i)), timestamp=i)
+        cabecalho = bloco.cabecalho()
+        cliente_memoria.adicionar_cabecalho(cabecalho)
+        anterior = hash_cabecalho(cabecalho).hex()
+    memoria, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    memoria_por_milhao = memoria / num_cabecalhos_memoria * 1_000_000
+
+    taxa_lote = len(afirmacoes) / tempo_lote
+    taxa_individual = len(afirmacoes) / tempo_individual
+    print(f"Blocos: {len(blocos):,} com até {transacoes_por_bloco} transações cada")
+    print(f"  Afirmações válidas: {sum(resultados):,}/{len(afirmacoes):,}")
+    print(f"  Verificação em lote (agrupada por bloco): {taxa_lote:,.0f} afirmações/segundo")
+    print(f"  Verificação uma a uma:                     {taxa_individual:,.0f} afirmações/segundo")
+    print(f"  Afirmação falsa rejeitada: {'✓' if falsa_rejeitada else '✗'}")
+    print(f"  Memória do cliente: {memoria_por_milhao / 1024**2:,.1f} MB por milhão de cabeçalhos")
+
+    nome_csv = f"{prefixo_saida}/benchmark_cliente_leve.csv"
+    with open(nome_csv, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['num_blocos', 'num_afirmacoes', 'afirmacoes_por_segundo_lote',
+                         'afirmacoes_por_segundo_individual', 'bytes_por_milhao_cabecalhos'])
+        writer.writerow([len(blocos), len(afirmacoes), round(taxa_lote, 1), round(taxa_individual, 1),
+                         round(memoria_por_milhao)])
+    print(f"\n✓ Resultados salvos em: {nome_csv}")
+
+
+if __name__ == "__main__":
+    benchmark_cliente_leve(sys.argv[1] if len(sys.argv) > 1 else "transacoes.txt")
@@ -0,0 +1,190 @@
+# compressao.py
+# Entrada comprimida (.gz, .bz2, .xz) lida em fluxo com a biblioteca padrão, sem descomprimir
+# para o disco. hash_em_fluxo é um produtor/consumidor: uma thread descomprime e corta as
+# linhas enquanto outras calculam o hash das folhas (zlib, bz2 e lzma soltam o GIL enquanto
+# descomprimem, então a descompressão roda de verdade em paralelo com os hashes)
+import os
+import sys
+import bz2
+import csv
+import gzip
+import lzma
+import time
+import queue
+import shutil
+import threading
+
+# formato -> (módulo, bytes mágicos no início do arquivo)
+FORMATOS = {
+    'gz': (gzip, b'\x1f\x8b'),
+    'bz2': (bz2, b'BZh'),
+    'xz': (lzma, b'\xfd7zXZ\x00'),
+}
+TAMANHO_PEDACO = 1 << 20  # bytes descomprimidos lidos por vez pelo produtor
+TAMANHO_FILA = 8  # lotes esperando hash; put() bloqueia quando cheia (contrapressão no descompressor)
+
+
+def formato_compressao(nome_arquivo):
+    """'gz', 'bz2', 'xz' ou None, pelos bytes mágicos (a extensão pode mentir)"""
+    try:
+        with open(nome_arquivo, 'rb') as f:
+            inicio = f.read(6)
+    except OSError:
+        return None
+    for formato, (_, magico) in FORMATOS.items():
+        if inicio.startswith(magico):
+            return formato
+    return None
+
+
+def abrir_binario(nome_arquivo):
+    formato = formato_compressao(nome_arquivo)
+    if formato is None:
+        return open(nome_arquivo, 'rb')
+    return FORMATOS[formato][0].open(nome_arquivo, 'rb')
+
+
+def abrir_texto(nome_arquivo):
+    """Mesmo contrato de open(nome, 'r', encoding='utf-8'), descomprimindo em fluxo se preciso"""
+    formato = formato_compressao(nome_arquivo)
+    if formato is None:
+        return open(nome_arquivo, 'r', encoding='utf-8')
+    return FORMATOS[formato][0].open(nome_arquivo, 'rt', encoding='utf-8')
+
+
+def ler_lotes_linhas(arquivo, tamanho_pedaco=TAMANHO_PEDACO):
+    """Lê o arquivo binário em pedaços e devolve listas de transações (linhas sem espaços nas
+    pontas e sem as vazias, como no leitura_arquivo). A linha cortada no fim do pedaço vai para o próximo"""
+    resto = b''
+    while True:
+        pedaco = arquivo.read(tamanho_pedaco)
+        if not pedaco:
+            break
+        pedaco = resto + pedaco
+        corte = pedaco.rfind(b'\n') + 1
+        resto = pedaco[corte:]
+        if corte:
+            yield [linha for linha in (l.strip() for l in pedaco[:corte].decode('utf-8').split('\n')) if linha]
+    if resto.strip():
+        yield [linha for linha in (l.strip() for l in resto.decode('utf-8').split('\n')) if linha]
+
+
+def hash_em_fluxo(nome_arquivo, hash_lote, num_hashers=4, tamanho_pedaco=TAMANHO_PEDACO, tamanho_fila=TAMANHO_FILA):
+    """Produtor (descompressão e corte das linhas) e num_hashers consumidores (hash_lote em cada lote).
+    Devolve (transações, hashes) na ordem do arquivo"""
+    fila = queue.Queue(maxsize=tamanho_fila)
+    resultados = {}  # número do lote -> (transações, hashes)
+    erros = []
+
+    def produtor():
+        try:
+            with abrir_binario(nome_arquivo) as arquivo:
+                for numero, linhas in enumerate(ler_lotes_linhas(arquivo, tamanho_pedaco)):
+                    fila.put((numero, linhas))
+        except Exception as e:  # arquivo corrompido ou truncado: repassa para quem chamou
+            erros.append(e)
+        finally:
+            for _ in range(num_hashers):
+                fila.put(None)
+
+    def consumidor():
+        while True:
+            item = fila.get()
+            if item is None:
+                return
+            numero, linhas = item
+            try:
+                resultados[numero] = (linhas, hash_lote(linhas))
+            except Exception as e:
+                erros.append(e)
+
+    threads = [threading.Thread(target=produtor)]
+    threads += [threading.Thread(target=consumidor) for _ in range(max(1, num_hashers))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    if erros:
+        raise erros[0]
+
+    transacoes, hashes = [], []
+    for numero in range(len(resultados)):
+        linhas, hashes_lote = resultados[numero]
+        transacoes += linhas
+        hashes += hashes_lote
+    return transacoes, hashes
+
+
+def comprimir_arquivo(nome_arquivo, formato, nome_saida=None):
+    nome_saida = nome_saida or f"{nome_arquivo}.{formato}"
+    with open(nome_arquivo, 'rb') as origem, FORMATOS[formato][0].open(nome_saida, 'wb') as destino:
+        shutil.copyfileobj(origem, destino, TAMANHO_PEDACO)
+    return nome_saida
+
+
+def benchmark_compressao(nome_arquivo="transacoes.txt", num_hashers=4, repeticoes=3, prefixo_saida="resultados"):
+    """MB/s efetivos (bytes descomprimidos por segundo) lendo e calculando o hash das folhas,
+    sem e com o fluxo produtor/consumidor, para o arquivo puro e as versões comprimidas"""
+    from blockchain import hash_lote_transacoes
+
+    print(f"{'='*70}")
+    print("BENCHMARK: ENTRADA COMPRIMIDA COM DESCOMPRESSÃO EM FLUXO")
+    print(f"{'='*70}")
+
+    if not os.path.exists(nome_arquivo):
+        print(f"ERRO: Arquivo '{nome_arquivo}' não encontrado!")
+        return None
+
+    diretorio = os.path.join(prefixo_saida, "compressao")
+    os.makedirs(diretorio, exist_ok=True)
+    tamanho_original = os.path.getsize(nome_arquivo)
+    arquivos = [("nenhuma", nome_arquivo)]
+    for formato in FORMATOS:
+        nome_saida = os.path.join(diretorio, f"{os.path.basename(nome_arquivo)}.{formato}")
+        arquivos.append((formato, comprimir_arquivo(nome_arquivo, formato, nome_saida)))
+    print(f"Arquivo: {nome_arquivo} ({tamanho_original / 2**20:.1f} MiB), {num_hashers} threads de hash (CPUs: {os.cpu_count()})")
+
+    referencia = None
+    linhas = []
+    for formato, nome in arquivos:
+        # sequencial: descomprime e lê tudo (o leitura_arquivo), depois calcula os hashes
+        def sequencial():
+            with abrir_texto(nome) as f:
+                transacoes = [linha.strip() for linha in f if linha.strip()]
+            return transacoes, hash_lote_transacoes(transacoes)
+
+        def em_fluxo():
+            return hash_em_fluxo(nome, hash_lote_transacoes, num_hashers)
+
+        for modo, funcao in (("sequencial", sequencial), ("fluxo", em_fluxo)):
+            tempos = []
+            for _ in range(repeticoes):
+                inicio = time.perf_counter()
+                transacoes, hashes = funcao()
+                tempos.append(time.perf_counter() - inicio)
+            if referencia is None:
+                referencia = hashes
+            iguais = hashes == referencia
+            tempo = min(tempos)
+            mb_s = tamanho_original / tempo / 2**20
+            if formato == "nenhuma" and modo == "sequencial":
+                mb_s_puro = mb_s
+            tamanho = os.path.getsize(nome)
+            print(f"  {formato:<8} {modo:<10}: {mb_s:6.1f} MiB/s ({mb_s / mb_s_puro:.2f}x o arquivo puro), "
+                  f"{len(hashes):,} folhas, arquivo {tamanho / tamanho_original:.0%} do original"
+                  + ("" if iguais else "  ✗ FOLHAS DIFERENTES"))
+            linhas.append([formato, modo, num_hashers, tamanho_original, tamanho, len(hashes), round(tempo, 4),
+                           round(mb_s, 2), round(mb_s / mb_s_puro, 3), iguais])
+
+    nome_csv = f"{prefixo_saida}/benchmark_compressao.csv"
+    with open(nome_csv, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['compressao', 'modo', 'num_hashers', 'bytes_descomprimidos', 'bytes_arquivo', 'num_folhas',
+                         'tempo_seg', 'mb_por_segundo', 'relativo_ao_puro', 'folhas_iguais'])
+        writer.writerows(linhas)
+    print(f"\n✓ Resultados salvos em: {nome_csv}")
+
+
+if __name__ == "__main__":
+    benchmark_compressao(sys.argv[1] if len(sys.argv) > 1 else "transacoes.txt",
+                         int(sys.argv[2]) if len(sys.argv) > 2 else 4)
@@ -0,0 +1,239 @@
+# consultas.py
+# Modo de consultas em lote, sem menu: lê consultas (buscar, provar, verificar) de um arquivo ou
+# da entrada padrão, responde em JSON lines e no fim mostra vazão e percentis de latência
+import os
+import sys
+import csv
+import json
+import time
+import contextlib
+from itertools import islice
+
+from blockchain import Merkle_tree, hash_transacao, caminho_dos_niveis, aplicar_caminho, atualizar_cabecalho_csv
+from sincronizacao import exportar_niveis, carregar_niveis
+from histograma import Histograma_latencia
+
+TAMANHO_BLOCO = 1000  # consultas lidas e respondidas por vez
+OPERACOES = {
+    'buscar': 'buscar', 'search': 'buscar',
+    'provar': 'provar', 'prove': 'provar',
+    'verificar': 'verificar', 'verify': 'verificar',
+}
+
+
+def caminho_bloom(nome_snapshot):
+    # mesma convenção do salvar_filtro_bloom: o filtro fica ao lado, com extensão .bloom
+    return os.path.splitext(nome_snapshot)[0] + ".bloom"
+
+
+class Indice_consultas:
+    """Níveis da árvore + índice hash da folha -> posição; busca e prova em O(1) e O(log n)"""
+    bloom = None  # filtro de Bloom opcional na frente do índice (anexar_filtro_bloom)
+
+    def __init__(self, niveis, aridade=2):
+        self.niveis = niveis
+        self.aridade = aridade  # as provas seguem a aridade dos níveis (passos k-ários com aridade > 2)
+        self.raiz = niveis[-1][0] if niveis and niveis[0] else None
+        self.posicoes = {}
+        for posicao, h in enumerate(niveis[0] if niveis else ()):
+            self.posicoes.setdefault(h, posicao)
+
+    @classmethod
+    def de_arquivo_transacoes(cls, nome_arquivo, num_threads=4):
+        # a construção imprime o progresso; vai para a saída de erro para não misturar com o JSON
+        with contextlib.redirect_stdout(sys.stderr):
+            arvore = Merkle_tree(nome_arquivo, num_threads=num_threads)
+        return cls(arvore.niveis(), arvore.aridade) if arvore.raiz else None
+
+    @classmethod
+    def de_snapshot(cls, nome_arquivo):
+        """Carrega os níveis e, se existir, o filtro de Bloom gravado ao lado (<snapshot>.bloom)"""
+        niveis, aridade = carregar_niveis(nome_arquivo)
+        indice = cls(niveis, aridade)
+        nome_bloom = caminho_bloom(nome_arquivo)
+        if os.path.exists(nome_bloom):
+            from bloom import Filtro_bloom
+            indice.anexar_filtro_bloom(Filtro_bloom.carregar(nome_bloom))
+        return indice
+
+    def salvar_snapshot(self, nome_arquivo):
+        exportar_niveis(self.niveis, nome_arquivo, self.aridade)
+        if self.bloom is not None:
+            self.bloom.salvar(caminho_bloom(nome_arquivo))
+
+    def anexar_filtro_bloom(self, filtro):
+        """Usa o filtro só se ele tem uma entrada por folha e contém todas elas (senão daria falso negativo)"""
+        folhas = self.niveis[0] if self.niveis else []
+        if filtro.itens != len(folhas) or not filtro.contem_todos(folhas):
+            print(f"Aviso: filtro de Bloom ({filtro.itens:,} itens) não corresponde às {len(folhas):,} folhas, "
+                  f"filtro ignorado", file=sys.stderr)
+            return False
+        self.bloom = filtro
+        return True
+
+    def responder(self, consulta):
+        operacao = OPERACOES.get(consulta.get('op'))
+        if operacao is None:
+            return {'erro': f"operação desconhecida: {consulta.get('op')}"}
+        transacao = consulta.get('transacao')
+        if transacao is None:
+            return {'erro': "consulta sem 'transacao'"}
+
+        hash_folha = hash_transacao(transacao)
+        # negativo do filtro é definitivo: nem olha o índice
+        posicao = None if self.bloom is not None and not self.bloom.contem(hash_folha) else self.posicoes.get(hash_folha)
+        if operacao == 'buscar':
+            return {'encontrada': posicao is not None, 'posicao': posicao}
+        if operacao == 'provar':
+            if posicao is None:
+                return {'encontrada': False}
+            return {'encontrada': True, 'posicao': posicao, 'raiz': self.raiz, 'aridade': self.aridade,
+                    'caminho': caminho_dos_niveis(self.niveis, posicao, self.aridade)}
+
+        caminho = consulta.get('caminho')
+        if caminho is None:
+            # sem caminho: verifica contra a prova gerada pela própria árvore
+            if posicao is None:
+                return {'valida': False}
+            caminho = caminho_dos_niveis(self.niveis, posicao, self.aridade)
+        caminho = [tuple(passo) for passo in caminho]
+        return {'valida': aplicar_caminho(hash_transacao(transacao), caminho, self.aridade) == self.raiz}
+
+
+def interpretar_linha(linha):
+    """Aceita JSON ({"op": "buscar", "transacao": "..."}) ou texto simples ("buscar <transação>")"""
+    linha = linha.strip()
+    if linha.startswith('{'):
+        return json.loads(linha)
+    operacao, _, transacao = linha.partition(' ')
+    return {'op': operacao, 'transacao': transacao}
+
+
+def processar_lote(indice, entrada, saida, tamanho_bloco=TAMANHO_BLOCO, primeira_linha=0):
+    """Responde as consultas de 'entrada' em blocos, escrevendo uma linha JSON por consulta em 'saida'.
+    Retorna (histograma das latências, tempo total)"""
+    latencias = Histograma_latencia()
+    numero = primeira_linha
+    inicio_total = time.perf_counter()
+    linhas = (linha for linha in entrada if linha.strip())
+    while True:
+        bloco = list(islice(linhas, tamanho_bloco))
+        if not bloco:
+            break
+        respostas = []
+        for linha in bloco:
+            inicio = time.perf_counter_ns()
+            try:
+                consulta = interpretar_linha(linha)
+                resposta = {'linha': numero, 'op': consulta.get('op'), **indice.responder(consulta)}
+            except (ValueError, TypeError, AttributeError) as e:
+                resposta = {'linha': numero, 'erro': str(e)}
+            latencias.registrar_ns(time.perf_counter_ns() - inicio)
+            respostas.append(json.dumps(resposta, ensure_ascii=False))
+            numero += 1
+        saida.write('\n'.join(respostas) + '\n')
+        saida.flush()
+    return latencias, time.perf_counter() - inicio_total
+
+
+def relatorio_lote(latencias, tempo_total):
+    """latencias: Histograma_latencia do lote"""
+    return {
+        'consultas': len(latencias),
+        'tempo_total_seg': tempo_total,
+        'consultas_por_segundo': len(latencias) / tempo_total if tempo_total > 0 else 0,
+        'latencia_p50_us': latencias.percentil(50) * 1e6,
+        'latencia_p95_us': latencias.percentil(95) * 1e6,
+        'latencia_p99_us': latencias.percentil(99) * 1e6,
+        'latencia_p999_us': latencias.percentil(99.9) * 1e6,
+        'latencia_max_us': latencias.maximo() * 1e6,
+    }
+
+
+def executar_lote(nome_arquivo=None, arquivo_consultas="-", snapshot=None, salvar_snapshot=None,
+                  num_threads=4, tamanho_bloco=TAMANHO_BLOCO, prefixo_saida="resultados", num_trabalhadores=1):
+    """Monta a árvore (ou carrega o snapshot), responde as consultas na saída padrão e
+    mostra o relatório na saída de erro. Com num_trabalhadores > 1 os níveis vão para memória
+    compartilhada e um pool de processos responde os blocos (memoria_compartilhada.py)"""
+    if snapshot:
+        if not os.path.exists(snapshot):
+            print(f"ERRO: Snapshot '{snapshot}' não encontrado!", file=sys.stderr)
+            return None
+        indice = Indice_consultas.de_snapshot(snapshot)
+    else:
+        if not nome_arquivo or not os.path.exists(nome_arquivo):
+            print(f"ERRO: Arquivo '{nome_arquivo}' não encontrado!", file=sys.stderr)
+            return None
+        indice = Indice_consultas.de_arquivo_transacoes(nome_arquivo, num_threads)
+        if indice is None:
+            print("ERRO: Falha na construção da árvore!", file=sys.stderr)
+            return None
+    if salvar_snapshot:
+        indice.salvar_snapshot(salvar_snapshot)
+        print(f"✓ Snapshot salvo em: {salvar_snapshot}", file=sys.stderr)
+
+    if num_trabalhadores > 1:
+        from memoria_compartilhada import Servidor_compartilhado
+        with Servidor_compartilhado(indice.niveis, num_trabalhadores, aridade=indice.aridade) as servidor:
+            if arquivo_consultas == "-":
+                latencias, tempo_total = servidor.processar_lote(sys.stdin, sys.stdout, tamanho_bloco)
+            else:
+                with open(arquivo_consultas, "r", encoding="utf-8") as entrada:
+                    latencias, tempo_total = servidor.processar_lote(entrada, sys.stdout, tamanho_bloco)
+    elif arquivo_consultas == "-":
+        latencias, tempo_total = processar_lote(indice, sys.stdin, sys.stdout, tamanho_bloco)
+    else:
+        with open(arquivo_consultas, "r", encoding="utf-8") as entrada:
+            latencias, tempo_total = processar_lote(indice, entrada, sys.stdout, tamanho_bloco)
+
+    relatorio = relatorio_lote(latencias, tempo_total)
+    print(f"{'='*70}", file=sys.stderr)
+    print(f"CONSULTAS EM LOTE: {relatorio['consultas']:,} em {relatorio['tempo_total_seg']:.3f} s "
+          f"({relatorio['consultas_por_segundo']:,.0f} consultas/segundo)", file=sys.stderr)
+    print(f"  Latência: p50 {relatorio['latencia_p50_us']:.1f} µs, p95 {relatorio['latencia_p95_us']:.1f} µs, "
+          f"p99 {relatorio['latencia_p99_us']:.1f} µs, p99.9 {relatorio['latencia_p999_us']:.1f} µs, "
+          f"máx {relatorio['latencia_max_us']:.1f} µs", file=sys.stderr)
+
+    os.makedirs(prefixo_saida, exist_ok=True)
+    nome_csv = f"{prefixo_saida}/benchmark_consultas.csv"
+    cabecalho = ['num_folhas', 'tamanho_bloco'] + list(relatorio.keys())
+    # um CSV gravado com outras colunas é reescrito com o cabeçalho atual antes de acrescentar a linha
+    atualizar_cabecalho_csv(nome_csv, cabecalho)
+    arquivo_existe = os.path.exists(nome_csv)
+    with open(nome_csv, 'a', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        if not arquivo_existe:
+            writer.writerow(cabecalho)
+        writer.writerow([len(indice.niveis[0]) if indice.niveis else 0, tamanho_bloco] +
+                        [round(v, 3) if isinstance(v, float) else v for v in relatorio.values()])
+    print(f"✓ Resultados salvos em: {nome_csv}", file=sys.stderr)
+    return relatorio
+
+
+def main_lote(argumentos):
+    """Argumentos: [arquivo_transacoes] [arquivo_consultas|-] [--snapshot arq] [--salvar-snapshot arq] [--bloco n]
+    [--threads n] [--trabalhadores n]"""
+    opcoes = {}
+    posicionais = []
+    i = 0
+    while i < len(argumentos):
+        if argumentos[i] in ("--snapshot", "--salvar-snapshot", "--bloco", "--threads", "--trabalhadores"):
+            opcoes[argumentos[i]] = argumentos[i + 1]
+            i += 2
+        else:
+            posicionais.append(argumentos[i])
+            i += 1
+
+    snapshot = opcoes.get("--snapshot")
+    if snapshot:
+        nome_arquivo, arquivo_consultas = None, posicionais[0] if posicionais else "-"
+    else:
+        nome_arquivo = posicionais[0] if posicionais else "transacoes.txt"
+        arquivo_consultas = posicionais[1] if len(posicionais) > 1 else "-"
+    return executar_lote(nome_arquivo, arquivo_consultas, snapshot, opcoes.get("--salvar-snapshot"),
+                         int(opcoes.get("--threads", 4)), int(opcoes.get("--bloco", TAMANHO_BLOCO)),
+                         num_trabalhadores=int(opcoes.get("--trabalhadores", 1)))
+
+
+if __name__ == "__main__":
+    main_lote(sys.argv[1:])
@@ -0,0 +1,247 @@
+# cordilheira.py
+# Merkle Mountain Range ("cordilheira"): acumulador só de inserção para um log de transações.
+# Cada inserção custa O(1) amortizado (só junta montanhas de mesma altura), a raiz é o
+# "ensacamento" dos picos e dá para provar inclusão contra qualquer tamanho anterior
+import os
+import sys
+import csv
+import time
+import random
+
+from blockchain import hash_transacao, hash_pai, aplicar_caminho, montar_niveis, caminho_dos_niveis
+
+TAMANHO_HASH = 32  # bytes de cada nó no arquivo
+
+
+def tamanho_cordilheira(num_folhas):
+    """Número de nós de uma cordilheira com num_folhas folhas: 2n - (bits 1 de n)"""
+    return 2 * num_folhas - bin(num_folhas).count('1')
+
+
+def montanhas(num_folhas):
+    """(altura, posição do pico, primeira folha) de cada montanha, da esquerda para a direita"""
+    resultado = []
+    inicio_posicao = 0
+    primeira_folha = 0
+    for altura in range(num_folhas.bit_length() - 1, -1, -1):
+        if num_folhas >> altura & 1:
+            tamanho = (1 << (altura + 1)) - 1
+            resultado.append((altura, inicio_posicao + tamanho - 1, primeira_folha))
+            inicio_posicao += tamanho
+            primeira_folha += 1 << altura
+    return resultado
+
+
+def ensacar_picos(picos):
+    """Junta os picos da direita para a esquerda em uma raiz só"""
+    if not picos:
+        return None
+    raiz = picos[-1]
+    for pico in reversed(picos[:-1]):
+        raiz = hash_pai(pico, raiz)
+    return raiz
+
+
+class Cordilheira_merkle:
+    def __init__(self, nome_arquivo=None):
+        """Em memória, ou com os nós gravados em um arquivo só de inserção (32 bytes por nó)"""
+        self.nome_arquivo = nome_arquivo
+        self.nos = []  # só usado sem arquivo
+        self.tamanho = 0  # nós gravados
+        self.num_folhas = 0
+        self.picos = []  # (altura, hash) das montanhas atuais; é tudo que a inserção precisa
+        self.arquivo = None
+
+        if nome_arquivo is not None:
+            self._abrir_arquivo(nome_arquivo)
+
+    def _abrir_arquivo(self, nome_arquivo):
+        modo = 'r+b' if os.path.exists(nome_arquivo) else 'w+b'
+        self.arquivo = open(nome_arquivo, modo)
+        tamanho_arquivo = os.path.getsize(nome_arquivo) // TAMANHO_HASH
+
+        # uma gravação interrompida pode deixar nós soltos: volta para o último tamanho válido
+        num_folhas = 0
+        while tamanho_cordilheira(num_folhas + 1) <= tamanho_arquivo:
+            num_folhas += 1
+        self.num_folhas = num_folhas
+        self.tamanho = tamanho_cordilheira(num_folhas)
+        self.arquivo.truncate(self.tamanho * TAMANHO_HASH)
+        self.arquivo.seek(0, os.SEEK_END)
+        self.picos = [(altura, self._no(posicao)) for altura, posicao, _ in montanhas(num_folhas)]
+
+    def _gravar(self, hash_no):
+        if self.arquivo is not None:
+            self.arquivo.write(bytes.fromhex(hash_no))
+        else:
+            self.nos.append(hash_no)
+        self.tamanho += 1
+
+    def _no(self, posicao):
+        if self.arquivo is None:
+            return self.nos[posicao]
+        return os.pread(self.arquivo.fileno(), TAMANHO_HASH, posicao * TAMANHO_HASH).hex()
+
+    def adicionar(self, transacao):
+        """Insere a transação; devolve o índice da folha"""
+        return self.adicionar_hash(hash_transacao(transacao))
+
+    def adicionar_hash(self, hash_folha):
+        indice = self.num_folhas
+        self._gravar(hash_folha)
+        altura, atual = 0, hash_folha
+        # enquanto a montanha anterior tem a mesma altura, as duas viram uma só
+        while self.picos and self.picos[-1][0] == altura:
+            _, esquerda = self.picos.pop()
+            atual = hash_pai(esquerda, atual)
+            self._gravar(atual)
+            altura += 1
+        self.picos.append((altura, atual))
+        self.num_folhas += 1
+        return indice
+
+    def sincronizar(self):
+        if self.arquivo is not None:
+            self.arquivo.flush()
+            os.fsync(self.arquivo.fileno())
+
+    def fechar(self):
+        if self.arquivo is not None:
+            self.arquivo.flush()
+            self.arquivo.close()
+            self.arquivo = None
+
+    def raiz(self, num_folhas=None):
+        """Raiz atual ou de um tamanho anterior"""
+        if num_folhas is None or num_folhas == self.num_folhas:
+            return ensacar_picos([h for _, h in self.picos])
+        self._validar_tamanho(num_folhas)
+        if self.arquivo is not None:
+            self.arquivo.flush()
+        return ensacar_picos([self._no(posicao) for _, posicao, _ in montanhas(num_folhas)])
+
+    def _validar_tamanho(self, num_folhas):
+        if not 0 < num_folhas <= self.num_folhas:
+            raise ValueError(f"Tamanho {num_folhas} fora da cordilheira (1..{self.num_folhas})")
+
+    def gerar_prova(self, indice, num_folhas=None):
+        """Prova de inclusão da folha 'indice' contra a raiz do tamanho num_folhas (padrão: o atual).
+        Devolve (caminho dentro da montanha, picos do tamanho, posição do pico da folha)"""
+        num_folhas = self.num_folhas if num_folhas is None else num_folhas
+        self._validar_tamanho(num_folhas)
+        if not 0 <= indice < num_folhas:
+            raise IndexError(f"Folha {indice} fora do tamanho {num_folhas}")
+        if self.arquivo is not None:
+            self.arquivo.flush()
+
+        lista_montanhas = montanhas(num_folhas)
+        picos = [self._no(posicao) for _, posicao, _ in lista_montanhas]
+        for numero, (altura, posicao, primeira_folha) in enumerate(lista_montanhas):
+            if indice < primeira_folha + (1 << altura):
+                break
+
+        # desce do pico até a folha: filho esquerdo em posicao - 2^h, direito em posicao - 1
+        deslocamento = indice - primeira_folha
+        irmaos = []
+        for h in range(altura, 0, -1):
+            esquerdo, direito = posicao - (1 << h), posicao - 1
+            if deslocamento >> (h - 1) & 1:
+                irmaos.append((self._no(esquerdo), "esquerda"))
+                posicao = direito
+            else:
+                irmaos.append((self._no(direito), "direita"))
+                posicao = esquerdo
+        irmaos.reverse()
+        return irmaos, picos, numero
+
+    def verificar_prova(self, transacao, prova, raiz):
+        return verificar_prova_cordilheira(hash_transacao(transacao), prova, raiz)
+
+
+def verificar_prova_cordilheira(hash_folha, prova, raiz):
+    caminho, picos, numero = prova
+    if not 0 <= numero < len(picos) or aplicar_caminho(hash_folha, caminho) != picos[numero]:
+        return False
+    return ensacar_picos(picos) == raiz
+
+
+def benchmark_cordilheira(nome_arquivo="transacoes.txt", num_reconstrucoes=2000, num_provas=1000,
+                          prefixo_saida="resultados"):
+    """Inserções por segundo e latência da prova contra reconstruir a árvore a cada chegada"""
+    print(f"{'='*70}")
+    print("BENCHMARK: CORDILHEIRA DE MERKLE (MERKLE MOUNTAIN RANGE)")
+    print(f"{'='*70}")
+
+    if not os.path.exists(nome_arquivo):
+        print(f"ERRO: Arquivo '{nome_arquivo}' não encontrado!")
+        return None
+
+    with open(nome_arquivo, "r", encoding="utf-8") as f:
+        transacoes = [linha.strip() for linha in f if linha.strip()]
+
+    os.makedirs(prefixo_saida, exist_ok=True)
+    nome_log = f"{prefixo_saida}/cordilheira.mmr"
+    if os.path.exists(nome_log):
+        os.remove(nome_log)
+
+    linhas = []
+    for rotulo, arquivo in (("memória", None), ("arquivo", nome_log)):
+        cordilheira = Cordilheira_merkle(arquivo)
+        inicio = time.perf_counter()
+        for transacao in transacoes:
+            cordilheira.adicionar(transacao)
+        cordilheira.sincronizar()
+        tempo_insercao = time.perf_counter() - inicio
+
+        # provas contra tamanhos históricos sorteados
+        tempos_prova, tempos_verificacao = [], []
+        validas = 0
+        for _ in range(num_provas):
+            tamanho = random.randint(1, len(transacoes))
+            indice = random.randrange(tamanho)
+            inicio = time.perf_counter()
+            prova = cordilheira.gerar_prova(indice, tamanho)
+            raiz = cordilheira.raiz(tamanho)
+            tempos_prova.append(time.perf_counter() - inicio)
+            inicio = time.perf_counter()
+            validas += cordilheira.verificar_prova(transacoes[indice], prova, raiz)
+            tempos_verificacao.append(time.perf_counter() - inicio)
+
+        taxa = len(transacoes) / tempo_insercao
+        prova_us = sum(tempos_prova) / num_provas * 1e6
+        verificacao_us = sum(tempos_verificacao) / num_provas * 1e6
+        print(f"  Cordilheira ({rotulo}): {taxa:,.0f} inserções/s, prova histórica {prova_us:.1f} µs, "
+              f"verificação {verificacao_us:.1f} µs, válidas {validas}/{num_provas}")
+        linhas.append([f"cordilheira_{'memoria' if arquivo is None else 'arquivo'}", len(transacoes),
+                       round(taxa, 1), round(prova_us, 2), round(verificacao_us, 2)])
+        cordilheira.fechar()
+
+    # reconstruir a árvore balanceada a cada chegada (o que o monta_tudo faria), nas primeiras chegadas
+    hashes = []
+    tempos_prova = []
+    quantidade = min(num_reconstrucoes, len(transacoes))
+    inicio = time.perf_counter()
+    for transacao in transacoes[:quantidade]:
+        hashes.append(hash_transacao(transacao))
+        niveis = montar_niveis(hashes)
+    tempo_reconstrucao = time.perf_counter() - inicio
+    for _ in range(num_provas):
+        inicio_prova = time.perf_counter()
+        caminho_dos_niveis(niveis, random.randrange(len(hashes)))
+        tempos_prova.append(time.perf_counter() - inicio_prova)
+    taxa = quantidade / tempo_reconstrucao
+    prova_us = sum(tempos_prova) / num_provas * 1e6
+    print(f"  Reconstrução a cada chegada ({quantidade:,} primeiras): {taxa:,.0f} inserções/s, "
+          f"prova {prova_us:.1f} µs (só contra o tamanho atual)")
+    linhas.append(["reconstrucao", quantidade, round(taxa, 1), round(prova_us, 2), ''])
+
+    nome_csv = f"{prefixo_saida}/benchmark_cordilheira.csv"
+    with open(nome_csv, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['estrutura', 'num_transacoes', 'insercoes_por_segundo', 'tempo_prova_us', 'tempo_verificacao_us'])
+        writer.writerows(linhas)
+    print(f"\n✓ Resultados salvos em: {nome_csv}")
+
+
+if __name__ == "__main__":
+    benchmark_cordilheira(sys.argv[1] if len(sys.argv) > 1 else "transacoes.txt")
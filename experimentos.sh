@@ -2,6 +2,12 @@
 
 # Script: experimentos.sh
 # Descrição: Roda todos os experimentos automaticamente
+# Uso: ./experimentos.sh [tamanho_maximo]
+#   tamanho_maximo: maior n da matriz (padrão: 10000000). A matriz vai até 10^9 transações
+#   sintéticas; em fluxo (~145 mil transações/s) 10^8 leva ~12 minutos e 10^9 ~2 horas.
+#   Use "tudo" para rodar a matriz inteira.
+
+TAMANHO_MAXIMO="${1:-10000000}"
 
 echo "================================================="
 echo "INICIANDO EXPERIMENTOS DE MERKLE TREE"
@@ -26,12 +32,18 @@ cp teste.txt transacoes.txt
 # Cria diretório para resultados
 mkdir -p resultados
 
-echo "Executando todos os experimentos..."
-echo "Isso pode levar alguns minutos..."
-echo ""
-
-# Executa todos os experimentos
-python3 blockchain.py --todos-experimentos
+if [ "$TAMANHO_MAXIMO" = "tudo" ]; then
+    echo "Executando todos os experimentos (até 10^9 transações)..."
+    echo "Isso leva mais de 2 horas (só 10^9 são ~2 horas em fluxo)."
+    echo ""
+    python3 blockchain.py --todos-experimentos
+else
+    echo "Executando os experimentos até $TAMANHO_MAXIMO transações..."
+    echo "Até 10^7 leva alguns minutos; 10^8 acrescenta ~12 minutos e 10^9 ~2 horas."
+    echo "(passe outro limite ou \"tudo\" como argumento: ./experimentos.sh tudo)"
+    echo ""
+    python3 blockchain.py --todos-experimentos --ate "$TAMANHO_MAXIMO"
+fi
 
 echo ""
 echo "================================================="
@@ -45,6 +57,10 @@ if [ -d "resultados" ]; then
     ls -lh resultados/
     
     echo ""
+    if [ -f "resultados/resultados.db" ]; then
+        echo "Banco de resultados: resultados/resultados.db ($(du -h resultados/resultados.db | cut -f1))"
+    fi
+
     echo "Resumo dos arquivos CSV:"
     for csv in resultados/*.csv; do
         if [ -f "$csv" ]; then
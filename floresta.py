@@ -0,0 +1,180 @@
+# floresta.py
+# Floresta de Merkle: as transações são divididas em K shards pelo prefixo do hash,
+# cada shard tem a sua própria árvore e uma árvore de topo compromete as raízes dos shards
+import os
+import sys
+import csv
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from blockchain import hash_transacao, montar_niveis, caminho_dos_niveis, aplicar_caminho
+
+# raiz usada para shard vazio, para a árvore de topo ter sempre K folhas
+HASH_SHARD_VAZIO = hash_transacao("")
+
+
+def shard_do_hash(hash_folha, num_shards):
+    # usa os 8 primeiros dígitos hex (32 bits) como prefixo e divide em faixas iguais
+    return (int(hash_folha[:8], 16) * num_shards) >> 32
+
+
+# executado nos processos do pool: recebe os hashes das folhas (já calculados na partição)
+# e devolve os níveis, então também pode rodar em outra máquina recebendo a lista pela rede
+def construir_shard(hashes_folhas):
+    return montar_niveis(hashes_folhas)
+
+
+class Floresta_merkle:
+    def __init__(self, transacoes, num_shards=16, num_processos=None):
+        self.num_shards = num_shards
+        self.num_processos = num_processos or os.cpu_count() or 1
+        self.shards = [[] for _ in range(num_shards)]  # hashes das folhas de cada shard, na ordem de chegada
+        self.niveis_shards = [None] * num_shards  # níveis da árvore de cada shard
+        self.indices_shards = [{} for _ in range(num_shards)]  # hash da folha -> posição no shard
+        self.niveis_topo = []
+        self.shards_alterados = set()
+        self.tempo_construcao = 0
+        self.tempo_ultima_atualizacao = 0
+
+        # a partição já calcula o hash de cada folha uma única vez, então entra no tempo de construção
+        inicio = time.time()
+        for transacao in transacoes:
+            hash_folha = hash_transacao(transacao)
+            self.shards[shard_do_hash(hash_folha, num_shards)].append(hash_folha)
+
+        self._reconstruir_shards(range(num_shards))
+        self._reconstruir_topo()
+        self.tempo_construcao = time.time() - inicio
+
+    @property
+    def raiz(self):
+        return self.niveis_topo[-1][0] if self.niveis_topo else None
+
+    def raiz_shard(self, shard):
+        niveis = self.niveis_shards[shard]
+        return niveis[-1][0] if niveis and niveis[0] else HASH_SHARD_VAZIO
+
+    def _reconstruir_shards(self, shards):
+        shards = [i for i in shards if self.shards[i]]
+        for i in range(self.num_shards):
+            if not self.shards[i]:
+                self.niveis_shards[i] = None
+                self.indices_shards[i] = {}
+
+        if self.num_processos > 1 and len(shards) > 1:
+            with ProcessPoolExecutor(max_workers=min(self.num_processos, len(shards))) as pool:
+                resultados = pool.map(construir_shard, [self.shards[i] for i in shards])
+                for i, niveis in zip(shards, resultados):
+                    self.niveis_shards[i] = niveis
+        else:
+            for i in shards:
+                self.niveis_shards[i] = construir_shard(self.shards[i])
+
+        for i in shards:
+            self.indices_shards[i] = {h: pos for pos, h in enumerate(self.niveis_shards[i][0])}
+
+    def _reconstruir_topo(self):
+        self.niveis_topo = montar_niveis([self.raiz_shard(i) for i in range(self.num_shards)])
+
+    def adicionar_transacao(self, transacao):
+        hash_folha = hash_transacao(transacao)
+        shard = shard_do_hash(hash_folha, self.num_shards)
+        self.shards[shard].append(hash_folha)
+        self.shards_alterados.add(shard)
+        return shard
+
+    def remover_transacao(self, transacao):
+        hash_folha = hash_transacao(transacao)
+        shard = shard_do_hash(hash_folha, self.num_shards)
+        if hash_folha not in self.shards[shard]:
+            return None
+        self.shards[shard].remove(hash_folha)
+        self.shards_alterados.add(shard)
+        return shard
+
+    def atualizar(self):
+        """Reconstrói apenas os shards alterados e a árvore de topo (K folhas)"""
+        if not self.shards_alterados:
+            return []
+        inicio = time.time()
+        alterados = sorted(self.shards_alterados)
+        self._reconstruir_shards(alterados)
+        self._reconstruir_topo()
+        self.shards_alterados.clear()
+        self.tempo_ultima_atualizacao = time.time() - inicio
+        return alterados
+
+    def busca_transacao(self, transacao):
+        hash_folha = hash_transacao(transacao)
+        shard = shard_do_hash(hash_folha, self.num_shards)
+        posicao = self.indices_shards[shard].get(hash_folha)
+        return None if posicao is None else (shard, posicao)
+
+    def gerar_prova_inclusao(self, transacao):
+        """Prova = caminho dentro do shard + caminho do shard na árvore de topo"""
+        local = self.busca_transacao(transacao)
+        if local is None:
+            return None
+        shard, posicao = local
+        prova_shard = caminho_dos_niveis(self.niveis_shards[shard], posicao)
+        prova_topo = caminho_dos_niveis(self.niveis_topo, shard)
+        return prova_shard, prova_topo
+
+    def verificar_prova(self, transacao, prova, raiz=None):
+        prova_shard, prova_topo = prova
+        raiz_shard = aplicar_caminho(hash_transacao(transacao), prova_shard)
+        return aplicar_caminho(raiz_shard, prova_topo) == (raiz or self.raiz)
+
+
+def benchmark_floresta(nome_arquivo="transacoes.txt", num_shards=16, prefixo_saida="resultados"):
+    """Compara construção completa, floresta e reconstrução de um único shard"""
+    print(f"{'='*70}")
+    print(f"BENCHMARK: FLORESTA DE MERKLE COM {num_shards} SHARDS")
+    print(f"{'='*70}")
+
+    if not os.path.exists(nome_arquivo):
+        print(f"ERRO: Arquivo '{nome_arquivo}' não encontrado!")
+        return None
+
+    with open(nome_arquivo, "r", encoding="utf-8") as f:
+        transacoes = [linha.strip() for linha in f if linha.strip()]
+
+    inicio = time.time()
+    montar_niveis([hash_transacao(t) for t in transacoes])
+    tempo_monolitico = time.time() - inicio
+
+    floresta = Floresta_merkle(transacoes, num_shards=num_shards)
+
+    # altera uma transação e mede a reconstrução só do shard afetado
+    floresta.adicionar_transacao("transacao-nova-benchmark")
+    alterados = floresta.atualizar()
+    tempo_atualizacao = floresta.tempo_ultima_atualizacao
+
+    prova = floresta.gerar_prova_inclusao(transacoes[0])
+    prova_ok = prova is not None and floresta.verificar_prova(transacoes[0], prova)
+
+    print(f"Transações: {len(transacoes):,}")
+    print(f"  Árvore única:            {tempo_monolitico:.4f} s")
+    print(f"  Floresta ({floresta.num_processos} processos): {floresta.tempo_construcao:.4f} s")
+    print(f"  Atualização de 1 shard:  {tempo_atualizacao:.4f} s (shards reconstruídos: {alterados})")
+    print(f"  Raiz das raízes: {floresta.raiz[:32]}...")
+    print(f"  Prova (shard + topo) verificada: {'✓' if prova_ok else '✗'}")
+
+    os.makedirs(prefixo_saida, exist_ok=True)
+    nome_csv = f"{prefixo_saida}/benchmark_floresta.csv"
+    with open(nome_csv, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['num_transacoes', 'num_shards', 'num_processos', 'tempo_arvore_unica_seg',
+                         'tempo_floresta_seg', 'tempo_atualizacao_shard_seg'])
+        writer.writerow([len(transacoes), num_shards, floresta.num_processos, round(tempo_monolitico, 4),
+                         round(floresta.tempo_construcao, 4), round(tempo_atualizacao, 4)])
+    print(f"\n✓ Resultados salvos em: {nome_csv}")
+
+    return floresta
+
+
+if __name__ == "__main__":
+    benchmark_floresta(
+        sys.argv[1] if len(sys.argv) > 1 else "transacoes.txt",
+        int(sys.argv[2]) if len(sys.argv) > 2 else 16
+    )
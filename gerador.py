@@ -0,0 +1,193 @@
+# gerador.py
+# Gerador determinístico de transações sintéticas: a mesma semente gera sempre a mesma sequência.
+# Gera em blocos grandes de bytes aleatórios, então dá para gravar 10^6-10^9 transações na
+# velocidade do disco ou mandar direto para a construção da árvore sem passar por arquivo
+import os
+import sys
+import csv
+import time
+import random
+
+from blockchain import (hash_transacao, raiz_incremental, aplicar_caminho, rss_pico, linha_estatisticas,
+                        salvar_estatisticas_banco)
+from histograma import Histograma_latencia
+
+# mesmo alfabeto das transações do teste.txt (letras e dígitos)
+ALFABETO = b"ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789"
+TABELA_ALFABETO = bytes(ALFABETO[b % len(ALFABETO)] for b in range(256))
+TRANSACOES_POR_BLOCO = 65536
+DISTRIBUICAO_PADRAO = ("fixa", 32)  # igual ao teste.txt
+
+
+def _tamanhos(rng, distribuicao, quantidade):
+    tipo = distribuicao[0]
+    if tipo == "fixa":
+        return None
+    if tipo == "uniforme":
+        _, minimo, maximo = distribuicao
+        return [rng.randint(minimo, maximo) for _ in range(quantidade)]
+    if tipo == "normal":
+        _, media, desvio = distribuicao
+        return [max(1, int(round(rng.gauss(media, desvio)))) for _ in range(quantidade)]
+    raise ValueError(f"Distribuição de tamanho desconhecida: {tipo}")
+
+
+def gerar_blocos(quantidade, semente=0, distribuicao=DISTRIBUICAO_PADRAO):
+    """Gera listas de transações (bytes, sem '\\n'), TRANSACOES_POR_BLOCO por vez.
+    distribuicao: ("fixa", n), ("uniforme", min, max) ou ("normal", media, desvio)"""
+    rng = random.Random(semente)
+    restantes = quantidade
+    while restantes > 0:
+        m = min(TRANSACOES_POR_BLOCO, restantes)
+        tamanhos = _tamanhos(rng, distribuicao, m)
+        if tamanhos is None:
+            largura = distribuicao[1]
+            dados = rng.randbytes(m * largura).translate(TABELA_ALFABETO)
+            yield [dados[i:i + largura] for i in range(0, m * largura, largura)]
+        else:
+            dados = rng.randbytes(sum(tamanhos)).translate(TABELA_ALFABETO)
+            bloco = []
+            inicio = 0
+            for tamanho in tamanhos:
+                bloco.append(dados[inicio:inicio + tamanho])
+                inicio += tamanho
+            yield bloco
+        restantes -= m
+
+
+def gerar_transacoes(quantidade, semente=0, distribuicao=DISTRIBUICAO_PADRAO):
+    """Transações uma a uma (bytes), para alimentar a construção diretamente"""
+    for bloco in gerar_blocos(quantidade, semente, distribuicao):
+        yield from bloco
+
+
+def gravar_transacoes(nome_arquivo, quantidade, semente=0, distribuicao=DISTRIBUICAO_PADRAO):
+    """Grava uma transação por linha (mesmo formato do teste.txt). Retorna (bytes gravados, segundos)"""
+    bytes_gravados = 0
+    inicio = time.perf_counter()
+    with open(nome_arquivo, "wb", buffering=1 << 20) as f:
+        for bloco in gerar_blocos(quantidade, semente, distribuicao):
+            dados = b"\n".join(bloco) + b"\n"
+            f.write(dados)
+            bytes_gravados += len(dados)
+    return bytes_gravados, time.perf_counter() - inicio
+
+
+class Arvore_sintetica:
+    """Resultado de uma construção em fluxo: tem as estatísticas no formato da Merkle_tree,
+    então vai para o mesmo banco de resultados (registrar_execucao)"""
+    def __init__(self, estatisticas, histograma_busca):
+        self.estatisticas = estatisticas
+        self.histograma_busca = histograma_busca
+
+    def linha_estatisticas(self):
+        return linha_estatisticas(self.estatisticas, self.histograma_busca)
+
+    def salvar_estatisticas_banco(self, caminho="resultados/resultados.db"):
+        return salvar_estatisticas_banco(self, caminho)
+
+
+def construir_em_fluxo(quantidade, semente=0, distribuicao=DISTRIBUICAO_PADRAO, num_buscas=5):
+    """Gera as transações e calcula a raiz sem guardar a árvore (memória O(log n)).
+    Os caminhos de prova de num_buscas folhas sorteadas são guardados durante a passada
+    e a "busca" medida é a verificação desses caminhos contra a raiz"""
+    posicoes = random.Random(semente + 1).sample(range(quantidade), min(num_buscas, quantidade))
+    procuradas = {}
+
+    def hashes():
+        for posicao, transacao in enumerate(gerar_transacoes(quantidade, semente, distribuicao)):
+            if posicao in caminhos_alvo:
+                procuradas[posicao] = transacao
+            yield hash_transacao(transacao)
+
+    caminhos_alvo = set(posicoes)
+    inicio = time.perf_counter()
+    raiz, num_folhas, caminhos = raiz_incremental(hashes(), posicoes)
+    tempo_construcao = time.perf_counter() - inicio
+
+    histograma_busca = Histograma_latencia()
+    for posicao in posicoes:
+        inicio = time.perf_counter_ns()
+        ok = aplicar_caminho(hash_transacao(procuradas[posicao]), caminhos[posicao]) == raiz
+        histograma_busca.registrar_ns(time.perf_counter_ns() - inicio)
+        if not ok:
+            raise RuntimeError(f"Caminho de prova da posição {posicao} não confere com a raiz")
+
+    altura = len(caminhos[posicoes[0]]) if posicoes else 0
+    estatisticas = {
+        'nome_arquivo': f"sintetico:semente={semente}:{'-'.join(str(v) for v in distribuicao)}",
+        'data_execucao': time.strftime("%Y-%m-%d %H:%M:%S"),
+        'total_transacoes_arquivo': quantidade,
+        'transacoes_processadas': num_folhas,
+        'num_threads': 1,
+        'representacao': "fluxo",
+        'cache_folhas': "desligado",
+        'folhas_criadas': num_folhas,
+        'altura_arvore': altura,
+        'tempo_construcao': tempo_construcao,
+        'taxa_processamento': num_folhas / tempo_construcao if tempo_construcao > 0 else 0,
+        'tamanho_raiz_bytes': len(raiz) // 2,
+        'hash_raiz': raiz[:32] + '...',
+    }
+    pico = rss_pico()
+    if pico is not None:
+        estatisticas['rss_pico_bytes'] = pico
+    return Arvore_sintetica(estatisticas, histograma_busca), raiz
+
+
+def executar_experimento_sintetico(quantidade, semente=0, prefixo_saida="resultados"):
+    """Experimento de escala com transações geradas: mesmo formato de saída do executar_experimento_automatico"""
+    print(f"\n{'='*60}")
+    print(f"EXPERIMENTO SINTÉTICO: {quantidade:,} transações (semente {semente})")
+    print(f"{'='*60}")
+
+    arvore, raiz = construir_em_fluxo(quantidade, semente)
+    estatisticas = arvore.estatisticas
+    print(f"✓ Raiz {raiz[:32]}... em {estatisticas['tempo_construcao']:.2f} segundos "
+          f"({estatisticas['taxa_processamento']:,.0f} transações/segundo), altura {estatisticas['altura_arvore']}")
+
+    os.makedirs(prefixo_saida, exist_ok=True)
+    return arvore.salvar_estatisticas_banco(f"{prefixo_saida}/resultados.db")
+
+
+def benchmark_gerador(quantidade=1_000_000, semente=0, prefixo_saida="resultados"):
+    """Mede a geração para arquivo (MB/s) e a construção em fluxo (transações/s)"""
+    print(f"{'='*70}")
+    print(f"BENCHMARK: GERADOR SINTÉTICO ({quantidade:,} transações)")
+    print(f"{'='*70}")
+
+    os.makedirs(prefixo_saida, exist_ok=True)
+    nome_arquivo = f"{prefixo_saida}/transacoes_sinteticas.txt"
+    bytes_gravados, tempo_gravacao = gravar_transacoes(nome_arquivo, quantidade, semente)
+    mb_por_segundo = bytes_gravados / 1024**2 / tempo_gravacao
+    print(f"  Gravação: {bytes_gravados / 1024**2:,.1f} MB em {tempo_gravacao:.2f} s ({mb_por_segundo:,.1f} MB/s)")
+    os.remove(nome_arquivo)
+
+    arvore, raiz = construir_em_fluxo(quantidade, semente)
+    estatisticas = arvore.estatisticas
+    print(f"  Construção em fluxo: {estatisticas['taxa_processamento']:,.0f} transações/segundo, raiz {raiz[:16]}...")
+
+    nome_csv = f"{prefixo_saida}/benchmark_gerador.csv"
+    with open(nome_csv, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['num_transacoes', 'semente', 'bytes_gravados', 'tempo_gravacao_seg', 'mb_por_segundo',
+                         'tempo_construcao_fluxo_seg', 'transacoes_por_segundo_fluxo', 'rss_pico_bytes'])
+        writer.writerow([quantidade, semente, bytes_gravados, round(tempo_gravacao, 4), round(mb_por_segundo, 1),
+                         round(estatisticas['tempo_construcao'], 4), round(estatisticas['taxa_processamento'], 1),
+                         estatisticas.get('rss_pico_bytes', '')])
+    print(f"\n✓ Resultados salvos em: {nome_csv}")
+
+
+if __name__ == "__main__":
+    # python3 gerador.py gravar <arquivo> <quantidade> [semente]
+    # python3 gerador.py raiz <quantidade> [semente]
+    # python3 gerador.py [quantidade]          (benchmark)
+    if len(sys.argv) > 3 and sys.argv[1] == "gravar":
+        semente = int(sys.argv[4]) if len(sys.argv) > 4 else 0
+        bytes_gravados, segundos = gravar_transacoes(sys.argv[2], int(sys.argv[3]), semente)
+        print(f"✓ {int(sys.argv[3]):,} transações ({bytes_gravados / 1024**2:,.1f} MB) gravadas em {sys.argv[2]} "
+              f"em {segundos:.2f} s ({bytes_gravados / 1024**2 / segundos:,.1f} MB/s)")
+    elif len(sys.argv) > 2 and sys.argv[1] == "raiz":
+        executar_experimento_sintetico(int(sys.argv[2]), int(sys.argv[3]) if len(sys.argv) > 3 else 0)
+    else:
+        benchmark_gerador(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -1,17 +1,68 @@
 # analisar_resultados.py
-import pandas as pd
-import matplotlib.pyplot as plt
-import numpy as np
+# No topo só entram módulos da biblioteca padrão: pandas, numpy, matplotlib e markdown são
+# importados dentro de cada função, para cada subcomando pagar só pelo que usa
 import glob
 import os
 import sys
 import re
+import math
+import argparse
 from datetime import datetime
-from scipy import stats as scipy_stats  # Renomear a importação
 
+from banco_resultados import CAMINHO_BANCO, CONFIGURACAO_BASE, abrir_banco, consulta_ultimas_execucoes, consulta_matriz
 
-def carregar_dados():
+
+def regressao_linear(x, y):
+    """Mínimos quadrados simples: retorna (inclinação, intercepto, r). Substitui o scipy.stats.linregress"""
+    x = [float(v) for v in x]
+    y = [float(v) for v in y]
+    n = len(x)
+    if n < 2:
+        return float('nan'), float('nan'), float('nan')
+    media_x = sum(x) / n
+    media_y = sum(y) / n
+    sxx = sum((a - media_x) ** 2 for a in x)
+    syy = sum((b - media_y) ** 2 for b in y)
+    sxy = sum((a - media_x) * (b - media_y) for a, b in zip(x, y))
+    if sxx == 0:
+        return float('nan'), float('nan'), float('nan')
+    inclinacao = sxy / sxx
+    r = sxy / math.sqrt(sxx * syy) if syy > 0 else 0.0
+    return inclinacao, media_y - inclinacao * media_x, r
+
+
+def carregar_dados(filtros=None, desde=None, caminho_banco=CAMINHO_BANCO):
+    """Carrega a última execução de cada número de transações do banco de resultados com uma única consulta.
+    Só entra a configuração de referência (CONFIGURACAO_BASE), com as colunas de 'filtros' trocadas"""
+    import pandas as pd
+
+    if not os.path.exists(caminho_banco):
+        # resultados antigos, de antes do banco consolidado
+        return carregar_dados_csv()
+
+    sql, parametros = consulta_ultimas_execucoes(filtros, desde)
+    conexao = abrir_banco(caminho_banco)  # garante as colunas novas em bancos antigos
+    try:
+        df = pd.read_sql_query(sql, conexao, params=parametros)
+    finally:
+        conexao.close()
+
+    if df.empty:
+        print(f"ERRO: Nenhuma execução encontrada em '{caminho_banco}' na configuração de referência "
+              f"(use --executor, --representacao, --threads ou --aridade para escolher outra)")
+        return None
+
+    df = df.loc[:, ~df.columns.duplicated()]
+    configuracao = {**CONFIGURACAO_BASE, **(filtros or {})}
+    print(f"✓ Carregadas {len(df)} execuções de '{caminho_banco}' "
+          f"({', '.join(f'{coluna}={valor}' for coluna, valor in configuracao.items())})")
+    return df
+
+def carregar_dados_csv():
     """Carrega todos os arquivos de estatísticas"""
+    import numpy as np
+    import pandas as pd
+
     arquivos = glob.glob("resultados/estatisticas_merkle_*.csv")
     
     if not arquivos:
@@ -69,6 +120,8 @@ def carregar_dados():
 
 def calcular_estatisticas_comparativas(df):
     """Calcula estatísticas comparativas"""
+    import numpy as np
+
     print("\n" + "="*80)
     print("ESTATÍSTICAS COMPARATIVAS")
     print("="*80)
@@ -106,7 +159,7 @@ def calcular_estatisticas_comparativas(df):
     y_tempo = df['tempo_construcao_seg'].values
     
     if len(x) > 1:
-        slope_tempo, intercept_tempo, r_tempo, p_tempo, std_err_tempo = scipy_stats.linregress(x, y_tempo)
+        slope_tempo, intercept_tempo, r_tempo = regressao_linear(x, y_tempo)
         r2_tempo = r_tempo**2
     else:
         slope_tempo = intercept_tempo = r_tempo = r2_tempo = float('nan')
@@ -121,7 +174,7 @@ def calcular_estatisticas_comparativas(df):
     y_altura = df['altura_arvore'].values
     
     if len(x_log) > 1:
-        slope_altura, intercept_altura, r_altura, p_altura, std_err_altura = scipy_stats.linregress(x_log, y_altura)
+        slope_altura, intercept_altura, r_altura = regressao_linear(x_log, y_altura)
         r2_altura = r_altura**2
     else:
         slope_altura = intercept_altura = r_altura = r2_altura = float('nan')
@@ -144,6 +197,9 @@ def calcular_estatisticas_comparativas(df):
     if 'tempo_medio_busca_ms' in df.columns:
         tempo_busca_medio = df['tempo_medio_busca_ms'].mean()
         print(f"  Tempo médio de busca: {tempo_busca_medio:.2f} ms")
+    if 'tempo_p99_busca_ms' in df.columns and df['tempo_p99_busca_ms'].notna().any():
+        print(f"  Cauda da busca (média entre experimentos): p50 {df['tempo_p50_busca_ms'].mean()*1000:.1f} µs, "
+              f"p99 {df['tempo_p99_busca_ms'].mean()*1000:.1f} µs, p99.9 {df['tempo_p999_busca_ms'].mean()*1000:.1f} µs")
     
     return {
         'slope_tempo': slope_tempo,
@@ -165,9 +221,12 @@ def gerar_tabela_comparativa(df):
                'altura_arvore', 'tamanho_raiz_bytes']
     
     tem_busca = 'tempo_medio_busca_ms' in df.columns
+    tem_percentis = tem_busca and 'tempo_p99_busca_ms' in df.columns and df['tempo_p99_busca_ms'].notna().any()
     
     if tem_busca:
         colunas.append('tempo_medio_busca_ms')
+    if tem_percentis:
+        colunas.append('tempo_p99_busca_ms')
     
     df_tabela = df[colunas].copy()
     
@@ -180,6 +239,9 @@ def gerar_tabela_comparativa(df):
     if tem_busca:
         df_tabela['tempo_medio_busca_ms'] = df_tabela['tempo_medio_busca_ms'].apply(lambda x: f"{x:.2f}")
         nomes_colunas = ['Transações', 'Tempo (s)', 'Taxa (trans/s)', 'Altura', 'Tamanho Raiz (bytes)', 'Busca (ms)']
+        if tem_percentis:
+            df_tabela['tempo_p99_busca_ms'] = df_tabela['tempo_p99_busca_ms'].apply(lambda x: f"{x:.4f}")
+            nomes_colunas.append('Busca p99 (ms)')
     else:
         nomes_colunas = ['Transações', 'Tempo (s)', 'Taxa (trans/s)', 'Altura', 'Tamanho Raiz (bytes)']
     
@@ -211,6 +273,9 @@ def gerar_tabela_comparativa(df):
 
 def gerar_graficos_comparativos(df, estatisticas):  # Mudei o nome do parâmetro
     """Gera gráficos comparativos"""
+    import numpy as np
+    import matplotlib.pyplot as plt
+
     print("\n" + "="*80)
     print("GERANDO GRÁFICOS COMPARATIVOS")
     print("="*80)
@@ -291,7 +356,7 @@ def gerar_graficos_comparativos(df, estatisticas):  # Mudei o nome do parâmetro
     # Gráfico 6: Tempo de busca (se disponível)
     ax6 = plt.subplot(2, 3, 6)
     if 'tempo_medio_busca_ms' in df.columns:
-        ax6.plot(df['num_transacoes'], df['tempo_medio_busca_ms'], 'yo-', linewidth=2, markersize=6)
+        ax6.plot(df['num_transacoes'], df['tempo_medio_busca_ms'], 'yo-', linewidth=2, markersize=6, label='média')
         ax6.set_xlabel('Número de Transações', fontsize=11)
         ax6.set_ylabel('Tempo Médio de Busca (ms)', fontsize=11)
         ax6.set_title('Tempo de Busca vs Número de Transações', fontsize=12, fontweight='bold')
@@ -302,9 +367,16 @@ def gerar_graficos_comparativos(df, estatisticas):  # Mudei o nome do parâmetro
         if len(df) > 2:
             x_log_busca = np.log(df['num_transacoes'])
             y_busca = df['tempo_medio_busca_ms']
-            slope_busca, _, r_busca, _, _ = scipy_stats.linregress(x_log_busca, y_busca)  # Usar scipy_stats
+            slope_busca, _, r_busca = regressao_linear(x_log_busca, y_busca)
             ax6.plot(df['num_transacoes'], slope_busca * np.log(df['num_transacoes']), 
                     'r--', alpha=0.7, label=f'O(log n), R²={r_busca**2:.3f}')
+        
+        # Percentis do histograma de busca (CSVs antigos não têm essas colunas)
+        for coluna, estilo, rotulo in (('tempo_p50_busca_ms', 'g.-', 'p50'), ('tempo_p99_busca_ms', 'm.-', 'p99'),
+                                       ('tempo_p999_busca_ms', 'k.-', 'p99.9')):
+            if coluna in df.columns and df[coluna].notna().any():
+                ax6.plot(df['num_transacoes'], df[coluna], estilo, linewidth=1, markersize=4, label=rotulo)
+        if ax6.get_legend_handles_labels()[0]:
             ax6.legend()
     else:
         # Gráfico de complexidade teórica
@@ -507,13 +579,420 @@ O tempo de busca cresce logaritmicamente, o que é ideal para verificações de
     
     print(f"  - resultados/relatorio_analise_{nome_arquivo}.html")
 
-def main():
+def gerar_graficos_memoria(df):
+    """Ajusta e plota bytes por folha em função de n, separando as categorias de memória"""
+    import numpy as np
+    import matplotlib.pyplot as plt
+
+    if 'bytes_por_folha' not in df.columns:
+        return None
+    df = df.dropna(subset=['bytes_por_folha', 'memoria_retida_bytes'])
+    if df.empty:
+        return None
+
+    print("\n" + "="*80)
+    print("ANÁLISE DE MEMÓRIA")
+    print("="*80)
+
+    x = df['num_transacoes'].values
+    y = df['memoria_retida_bytes'].values
+    # representação da árvore (folhas + nós internos + índices), que é o que cresce com n
+    y_arvore = (df['memoria_folhas_bytes'] + df['memoria_nos_internos_bytes'] + df['memoria_indices_bytes']).values
+    if len(x) > 1:
+        slope_memoria, intercept_memoria, r_memoria = regressao_linear(x, y_arvore)
+        r2_memoria = r_memoria**2
+    else:
+        slope_memoria = intercept_memoria = r2_memoria = float('nan')
+
+    print(f"  Memória da árvore (folhas + nós internos + índices): O(n)")
+    print(f"    Bytes por folha (coeficiente linear): {slope_memoria:,.1f}")
+    print(f"    Custo fixo (intercepto): {intercept_memoria:,.0f} bytes")
+    print(f"    R²: {r2_memoria:.4f}")
+    print(f"  Pico máximo medido: {df['memoria_pico_bytes'].max():,.0f} bytes")
+
+    fig = plt.figure(figsize=(16, 6))
+    fig.suptitle('Uso de Memória da Merkle Tree', fontsize=18, fontweight='bold')
+
+    # Gráfico 1: bytes por folha, separado por categoria
+    ax1 = plt.subplot(1, 2, 1)
+    # as transações lidas ficam de fora: dependem do arquivo inteiro, não do número de folhas
+    categorias = [('memoria_folhas_bytes', 'Folhas', 'lightgreen'),
+                  ('memoria_nos_internos_bytes', 'Nós internos', 'lightskyblue'),
+                  ('memoria_indices_bytes', 'Índices', 'khaki')]
+    base = np.zeros(len(df))
+    posicoes = np.arange(len(df))
+    for coluna, rotulo, cor in categorias:
+        valores = (df[coluna] / df['folhas_criadas']).fillna(0).values
+        ax1.bar(posicoes, valores, bottom=base, color=cor, label=rotulo)
+        base += valores
+    ax1.axhline(y=slope_memoria, color='r', linestyle='--', alpha=0.7, label=f'Ajuste: {slope_memoria:,.0f} bytes/folha')
+    ax1.set_xticks(posicoes)
+    ax1.set_xticklabels([f"{int(n):,}" for n in df['num_transacoes']], rotation=45)
+    ax1.set_xlabel('Número de Transações', fontsize=11)
+    ax1.set_ylabel('Bytes por Folha', fontsize=11)
+    ax1.set_title('Bytes por Folha por Categoria', fontsize=12, fontweight='bold')
+    ax1.grid(True, alpha=0.3, axis='y')
+    ax1.legend()
+
+    # Gráfico 2: memória retida e pico vs n, com a reta ajustada
+    ax2 = plt.subplot(1, 2, 2)
+    ax2.plot(x, y, 'bo-', linewidth=2, markersize=6, label='Retida')
+    ax2.plot(x, df['memoria_pico_bytes'], 'mo-', linewidth=2, markersize=6, label='Pico')
+    ax2.plot(x, y_arvore, 'go-', linewidth=2, markersize=6, label='Árvore (sem transações)')
+    x_fit = np.linspace(x.min(), x.max(), 100)
+    ax2.plot(x_fit, slope_memoria * x_fit + intercept_memoria, 'r--', alpha=0.7, label=f'O(n), R²={r2_memoria:.3f}')
+    ax2.set_xlabel('Número de Transações', fontsize=11)
+    ax2.set_ylabel('Memória (bytes)', fontsize=11)
+    ax2.set_title('Memória vs Número de Transações', fontsize=12, fontweight='bold')
+    ax2.grid(True, alpha=0.3)
+    ax2.set_xscale('log')
+    ax2.set_yscale('log')
+    ax2.legend()
+
+    plt.tight_layout()
+
+    data_atual = datetime.now().strftime("%Y%m%d_%H%M%S")
+    plt.savefig(f'resultados/graficos_memoria_{data_atual}.png', dpi=300, bbox_inches='tight')
+    plt.savefig(f'resultados/graficos_memoria_{data_atual}.pdf', bbox_inches='tight')
+
+    print(f"\n✓ Gráficos salvos em:")
+    print(f"  - resultados/graficos_memoria_{data_atual}.png")
+    print(f"  - resultados/graficos_memoria_{data_atual}.pdf")
+
+    plt.show()
+
+    return {'slope_memoria': slope_memoria, 'intercept_memoria': intercept_memoria, 'r2_memoria': r2_memoria}
+
+def carregar_dados_mineracao():
+    """Carrega os arquivos de estatísticas de mineração (um por número de processos)"""
+    import pandas as pd
+
+    arquivos = glob.glob("resultados/estatisticas_mineracao_*.csv")
+    if not arquivos:
+        return None
+
+    linhas = []
+    for arquivo in sorted(arquivos):
+        try:
+            df = pd.read_csv(arquivo)
+            if not df.empty:
+                linhas.append(df.iloc[-1].to_dict())
+        except Exception as e:
+            print(f"✗ Erro ao carregar {arquivo}: {e}")
+
+    if not linhas:
+        return None
+    return pd.DataFrame(linhas).sort_values('num_processos')
+
+def gerar_graficos_mineracao(df):
+    """Gera os gráficos de hashes/segundo e eficiência de escala da mineração"""
+    import matplotlib.pyplot as plt
+
+    print("\n" + "="*80)
+    print("GERANDO GRÁFICOS DE MINERAÇÃO")
+    print("="*80)
+
+    fig = plt.figure(figsize=(16, 6))
+    fig.suptitle('Prova de Trabalho: Escala com Número de Processos', fontsize=18, fontweight='bold')
+
+    # Gráfico 1: Hashes por segundo (total e ideal)
+    ax1 = plt.subplot(1, 3, 1)
+    ax1.plot(df['num_processos'], df['hashes_por_segundo'], 'bo-', linewidth=2, markersize=6, label='Medido')
+    ideal = df['hashes_por_segundo_por_nucleo'].iloc[0] * df['num_processos']
+    ax1.plot(df['num_processos'], ideal, 'r--', alpha=0.7, label='Escala linear ideal')
+    ax1.set_xlabel('Número de Processos', fontsize=11)
+    ax1.set_ylabel('Hashes por Segundo', fontsize=11)
+    ax1.set_title('Taxa Total de Hashes', fontsize=12, fontweight='bold')
+    ax1.grid(True, alpha=0.3)
+    ax1.legend()
+
+    # Gráfico 2: Hashes por segundo por núcleo
+    ax2 = plt.subplot(1, 3, 2)
+    ax2.plot(df['num_processos'], df['hashes_por_segundo_por_nucleo'], 'go-', linewidth=2, markersize=6)
+    ax2.set_xlabel('Número de Processos', fontsize=11)
+    ax2.set_ylabel('Hashes por Segundo por Núcleo', fontsize=11)
+    ax2.set_title('Taxa por Núcleo', fontsize=12, fontweight='bold')
+    ax2.grid(True, alpha=0.3)
+
+    # Gráfico 3: Eficiência de escala
+    ax3 = plt.subplot(1, 3, 3)
+    ax3.plot(df['num_processos'], df['eficiencia_escala'] * 100, 'mo-', linewidth=2, markersize=6)
+    ax3.axhline(y=100, color='r', linestyle='--', alpha=0.7, label='Ideal (100%)')
+    ax3.set_xlabel('Número de Processos', fontsize=11)
+    ax3.set_ylabel('Eficiência (%)', fontsize=11)
+    ax3.set_title('Eficiência de Escala', fontsize=12, fontweight='bold')
+    ax3.grid(True, alpha=0.3)
+    ax3.set_ylim(0, 110)
+    ax3.legend()
+
+    plt.tight_layout()
+
+    data_atual = datetime.now().strftime("%Y%m%d_%H%M%S")
+    plt.savefig(f'resultados/graficos_mineracao_{data_atual}.png', dpi=300, bbox_inches='tight')
+    plt.savefig(f'resultados/graficos_mineracao_{data_atual}.pdf', bbox_inches='tight')
+
+    print(f"\n✓ Gráficos salvos em:")
+    print(f"  - resultados/graficos_mineracao_{data_atual}.png")
+    print(f"  - resultados/graficos_mineracao_{data_atual}.pdf")
+
+    plt.show()
+
+def carregar_dados_matriz(filtros=None, desde=None, caminho_banco=CAMINHO_BANCO):
+    """Todas as execuções do banco com número de trabalhadores, executor e representação"""
+    import pandas as pd
+
+    if not os.path.exists(caminho_banco):
+        return None
+    sql, parametros = consulta_matriz(filtros, desde)
+    conexao = abrir_banco(caminho_banco)
+    try:
+        df = pd.read_sql_query(sql, conexao, params=parametros)
+    finally:
+        conexao.close()
+    df = df[df['representacao'] != 'fluxo'].dropna(subset=['tempo_construcao_seg'])
+    return df if not df.empty else None
+
+def ajustar_amdahl(trabalhadores, speedups):
+    """Fração paralelizável f da lei de Amdahl, S(p) = 1 / ((1 - f) + f / p), por mínimos quadrados em 1/S:
+    1/S = 1 - f * (1 - 1/p), uma reta sem intercepto em x = 1 - 1/p"""
+    x = [1 - 1 / p for p in trabalhadores]
+    y = [1 - 1 / s for s in speedups]
+    soma_xx = sum(v * v for v in x)
+    if soma_xx == 0:
+        return float('nan')
+    f = sum(a * b for a, b in zip(x, y)) / soma_xx
+    return min(max(f, 0.0), 1.0)
+
+def calcular_escalabilidade(df):
+    """Speedup e eficiência por (executor, representação, n), usando a mediana das repetições.
+    Só entra configuração que tem execução com 1 trabalhador (a referência) e pelo menos outra contagem"""
+    import pandas as pd
+
+    if df['aridade'].nunique() > 1:
+        # a escala é medida na árvore binária; outra aridade só com --aridade
+        df = df[df['aridade'] == 2]
+    medianas = (df.groupby(['executor', 'representacao', 'num_transacoes', 'num_threads'])['tempo_construcao_seg']
+                  .median().reset_index())
+    linhas = []
+    ajustes = []
+    for (executor, representacao, n), grupo in medianas.groupby(['executor', 'representacao', 'num_transacoes']):
+        grupo = grupo.sort_values('num_threads')
+        referencia = grupo[grupo['num_threads'] == 1]['tempo_construcao_seg']
+        if referencia.empty or len(grupo) < 2:
+            continue
+        t1 = referencia.iloc[0]
+        grupo = grupo.assign(speedup=t1 / grupo['tempo_construcao_seg'])
+        grupo = grupo.assign(eficiencia=grupo['speedup'] / grupo['num_threads'])
+        linhas.append(grupo)
+
+        f = ajustar_amdahl(grupo['num_threads'].tolist(), grupo['speedup'].tolist())
+        eficientes = grupo[grupo['eficiencia'] >= 0.7]['num_threads']
+        ajustes.append({
+            'executor': executor, 'representacao': representacao, 'num_transacoes': n,
+            'fracao_paralela': f,
+            'speedup_limite': 1 / (1 - f) if f < 1 else float('inf'),
+            'melhor_trabalhadores': int(grupo.loc[grupo['speedup'].idxmax(), 'num_threads']),
+            'melhor_speedup': grupo['speedup'].max(),
+            'max_trabalhadores_eficiencia_70': int(eficientes.max()) if not eficientes.empty else 1,
+        })
+    if not linhas:
+        return None, None
+    return pd.concat(linhas, ignore_index=True), pd.DataFrame(ajustes)
+
+def gerar_graficos_escalabilidade(df):
+    """Curvas de speedup (com o ajuste de Amdahl) e de eficiência paralela por configuração"""
+    import numpy as np
+    import matplotlib.pyplot as plt
+
+    escala, ajustes = calcular_escalabilidade(df)
+    if escala is None:
+        print("\nSem dados de escala: rode a matriz com mais de um número de trabalhadores, incluindo 1 "
+              "(python3 blockchain.py --todos-experimentos --matriz matriz_experimentos.json)")
+        return
+
+    print("\n" + "="*100)
+    print("ESCALABILIDADE PARALELA (LEI DE AMDAHL)")
+    print("="*100)
+    print(f"{'Executor':<10} {'Repr.':<6} {'n':>7} {'f paralela':>10} {'S máx (Amdahl)':>14} "
+          f"{'Melhor p':>8} {'S medido':>8} {'p (efic.>=70%)':>14}")
+    for _, a in ajustes.iterrows():
+        print(f"{a['executor']:<10} {a['representacao']:<6} {a['num_transacoes']:>7} {a['fracao_paralela']:>10.3f} "
+              f"{a['speedup_limite']:>14.2f} {a['melhor_trabalhadores']:>8} {a['melhor_speedup']:>8.2f} "
+              f"{a['max_trabalhadores_eficiencia_70']:>14}")
+
+    configuracoes = list(escala.groupby(['executor', 'representacao']).groups)
+    fig, eixos = plt.subplots(2, len(configuracoes), figsize=(6 * len(configuracoes), 10), squeeze=False)
+    fig.suptitle('Escalabilidade da construção: speedup e eficiência por configuração', fontsize=16, fontweight='bold')
+
+    for coluna, (executor, representacao) in enumerate(configuracoes):
+        ax_speedup, ax_eficiencia = eixos[0][coluna], eixos[1][coluna]
+        dados = escala[(escala['executor'] == executor) & (escala['representacao'] == representacao)]
+        for n, grupo in dados.groupby('num_transacoes'):
+            linha, = ax_speedup.plot(grupo['num_threads'], grupo['speedup'], 'o-', label=f'n={n:,}')
+            f = ajustes[(ajustes['executor'] == executor) & (ajustes['representacao'] == representacao) &
+                        (ajustes['num_transacoes'] == n)]['fracao_paralela'].iloc[0]
+            p = np.linspace(1, grupo['num_threads'].max(), 50)
+            ax_speedup.plot(p, 1 / ((1 - f) + f / p), '--', color=linha.get_color(), alpha=0.6)
+            ax_eficiencia.plot(grupo['num_threads'], grupo['eficiencia'], 'o-', label=f'n={n:,}')
+
+        maximo = dados['num_threads'].max()
+        ax_speedup.plot([1, maximo], [1, maximo], 'k:', alpha=0.4, label='Ideal')
+        ax_speedup.set_title(f'Speedup - {executor}, {representacao} (tracejado: Amdahl)')
+        ax_speedup.set_xlabel('Trabalhadores')
+        ax_speedup.set_ylabel('Speedup (T1 / Tp)')
+        ax_speedup.legend()
+        ax_speedup.grid(True, alpha=0.3)
+
+        ax_eficiencia.axhline(1.0, color='k', linestyle=':', alpha=0.4)
+        ax_eficiencia.set_title(f'Eficiência paralela - {executor}, {representacao}')
+        ax_eficiencia.set_xlabel('Trabalhadores')
+        ax_eficiencia.set_ylabel('Eficiência (speedup / p)')
+        ax_eficiencia.set_ylim(bottom=0)
+        ax_eficiencia.legend()
+        ax_eficiencia.grid(True, alpha=0.3)
+
+    plt.tight_layout()
+
+    # Salva gráficos
+    data_atual = datetime.now().strftime("%Y%m%d_%H%M%S")
+    plt.savefig(f'resultados/graficos_escalabilidade_{data_atual}.png', dpi=300, bbox_inches='tight')
+    plt.savefig(f'resultados/graficos_escalabilidade_{data_atual}.pdf', bbox_inches='tight')
+    ajustes.to_csv('resultados/tabela_escalabilidade.csv', index=False)
+
+    print(f"\n✓ Gráficos de escalabilidade salvos em:")
+    print(f"  - resultados/graficos_escalabilidade_{data_atual}.png")
+    print(f"  - resultados/graficos_escalabilidade_{data_atual}.pdf")
+    print(f"  - resultados/tabela_escalabilidade.csv")
+
+    plt.show()
+
+def calcular_aridade(df):
+    """Mediana do tempo de construção, do tamanho da prova e do tempo de verificação por (n, aridade)"""
+    df = df.dropna(subset=['tamanho_prova_bytes', 'tempo_verificacao_prova_us'])
+    if df.empty or df['aridade'].nunique() < 2:
+        return None
+    return (df.groupby(['num_transacoes', 'aridade'])[['tempo_construcao_seg', 'tamanho_prova_bytes',
+                                                       'tempo_verificacao_prova_us']]
+              .median().reset_index())
+
+def gerar_graficos_aridade(df):
+    """Trocas da aridade: construção mais rápida e árvore mais baixa contra provas mais largas"""
+    import matplotlib.pyplot as plt
+
+    tabela = calcular_aridade(df)
+    if tabela is None:
+        print("\nSem dados de aridade: rode a matriz com mais de uma aridade "
+              "(\"aridades\": [2, 4, 8, 16] no arquivo --matriz)")
+        return
+
+    print("\n" + "="*100)
+    print("ARIDADE: CONSTRUÇÃO x PROVA")
+    print("="*100)
+    print(f"{'n':>8} {'Aridade':>8} {'Construção (s)':>15} {'Prova (bytes)':>14} {'Verificação (µs)':>17}")
+    for _, linha in tabela.iterrows():
+        print(f"{int(linha['num_transacoes']):>8} {int(linha['aridade']):>8} {linha['tempo_construcao_seg']:>15.4f} "
+              f"{linha['tamanho_prova_bytes']:>14.0f} {linha['tempo_verificacao_prova_us']:>17.1f}")
+
+    fig, eixos = plt.subplots(1, 3, figsize=(18, 5))
+    fig.suptitle('Aridade da árvore: construção, tamanho da prova e verificação', fontsize=16, fontweight='bold')
+    metricas = [('tempo_construcao_seg', 'Tempo de construção (s)'),
+                ('tamanho_prova_bytes', 'Tamanho da prova (bytes)'),
+                ('tempo_verificacao_prova_us', 'Tempo de verificação (µs)')]
+    for ax, (coluna, titulo) in zip(eixos, metricas):
+        for n, grupo in tabela.groupby('num_transacoes'):
+            ax.plot(grupo['aridade'], grupo[coluna], 'o-', label=f'n={n:,}')
+        ax.set_xscale('log', base=2)
+        ax.set_xticks(sorted(tabela['aridade'].unique()))
+        ax.set_xticklabels([str(int(k)) for k in sorted(tabela['aridade'].unique())])
+        ax.set_title(titulo)
+        ax.set_xlabel('Aridade (filhos por nó)')
+        ax.set_ylabel(titulo)
+        ax.legend()
+        ax.grid(True, alpha=0.3)
+
+    plt.tight_layout()
+
+    # Salva gráficos
+    data_atual = datetime.now().strftime("%Y%m%d_%H%M%S")
+    plt.savefig(f'resultados/graficos_aridade_{data_atual}.png', dpi=300, bbox_inches='tight')
+    plt.savefig(f'resultados/graficos_aridade_{data_atual}.pdf', bbox_inches='tight')
+    tabela.to_csv('resultados/tabela_aridade.csv', index=False)
+
+    print(f"\n✓ Gráficos de aridade salvos em:")
+    print(f"  - resultados/graficos_aridade_{data_atual}.png")
+    print(f"  - resultados/graficos_aridade_{data_atual}.pdf")
+    print(f"  - resultados/tabela_aridade.csv")
+
+    plt.show()
+
+# pacotes de terceiros que cada subcomando precisa (nome do módulo -> nome no pip)
+DEPENDENCIAS_SUBCOMANDO = {
+    'resumo': {'pandas': 'pandas'},
+    'tabela': {'pandas': 'pandas'},
+    'graficos': {'pandas': 'pandas', 'matplotlib': 'matplotlib'},
+    'escalabilidade': {'pandas': 'pandas', 'matplotlib': 'matplotlib'},
+    'aridade': {'pandas': 'pandas', 'matplotlib': 'matplotlib'},
+    'relatorio': {'pandas': 'pandas', 'markdown': 'markdown'},
+    'tudo': {'pandas': 'pandas', 'matplotlib': 'matplotlib', 'markdown': 'markdown'},
+}
+
+def garantir_dependencias(subcomando):
+    """Instala só os pacotes que o subcomando usa e que ainda não estão disponíveis"""
+    import importlib.util
+    faltando = [pip for modulo, pip in DEPENDENCIAS_SUBCOMANDO[subcomando].items()
+                if importlib.util.find_spec(modulo) is None]
+    if faltando:
+        print(f"Instalando dependências: {', '.join(faltando)}...")
+        import subprocess
+        subprocess.run([sys.executable, "-m", "pip", "install", *faltando])
+
+def listar_arquivos_gerados():
+    print("\nArquivos gerados:")
+    for arquivo in os.listdir('resultados'):
+        if arquivo.startswith(('graficos_', 'tabela_', 'relatorio_')):
+            tamanho = os.path.getsize(f'resultados/{arquivo}')
+            print(f"  - {arquivo} ({tamanho:,} bytes)")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Analisador de resultados da Merkle tree")
+    parser.add_argument('subcomando', nargs='?', default='tudo', choices=list(DEPENDENCIAS_SUBCOMANDO),
+                        help="resumo: estatísticas no terminal; tabela: tabela comparativa; "
+                             "graficos: só as figuras; escalabilidade: speedup/eficiência da matriz; "
+                             "aridade: construção, prova e verificação por aridade; "
+                             "relatorio: só o relatório; tudo: o fluxo completo (padrão)")
+    parser.add_argument('--desde', help="considera só execuções a partir desta data (AAAA-MM-DD)")
+    parser.add_argument('--representacao', help="filtra pela representação das folhas (str, numpy, fluxo)")
+    parser.add_argument('--executor', help="filtra pelo executor das folhas (threads, processos)")
+    parser.add_argument('--threads', type=int, help="filtra pelo número de trabalhadores")
+    parser.add_argument('--aridade', type=int, help="filtra pela aridade da árvore (2, 4, 8, 16)")
+    argumentos = parser.parse_args(argv)
+
+    garantir_dependencias(argumentos.subcomando)
+    os.makedirs("resultados", exist_ok=True)
+
     print("="*100)
     print("ANALISADOR DE RESULTADOS - MERKLE TREE")
     print("="*100)
     
     # Carrega dados
-    df = carregar_dados()
+    filtros = {coluna: valor for coluna, valor in (('representacao', argumentos.representacao),
+                                                   ('executor', argumentos.executor),
+                                                   ('num_threads', argumentos.threads),
+                                                   ('aridade', argumentos.aridade)) if valor is not None}
+    subcomando = argumentos.subcomando
+    if subcomando in ('escalabilidade', 'aridade'):
+        df_matriz = carregar_dados_matriz(filtros, argumentos.desde)
+        if df_matriz is None:
+            print(f"ERRO: Nenhuma execução encontrada em '{CAMINHO_BANCO}'")
+            return
+        if subcomando == 'escalabilidade':
+            gerar_graficos_escalabilidade(df_matriz)
+        else:
+            gerar_graficos_aridade(df_matriz)
+        listar_arquivos_gerados()
+        return
+
+    df = carregar_dados(filtros, argumentos.desde)
     if df is None:
         return
     
@@ -521,48 +1000,50 @@ def main():
     print(f"  Total de experimentos: {len(df)}")
     print(f"  Faixa de transações: {df['num_transacoes'].min():,} a {df['num_transacoes'].max():,}")
     
-    # Calcula estatísticas
-    estatisticas = calcular_estatisticas_comparativas(df)  # Mudei o nome aqui também
+    if subcomando == 'tabela':
+        gerar_tabela_comparativa(df)
+        listar_arquivos_gerados()
+        return
+
+    # Calcula estatísticas (o resumo para aqui: não precisa de matplotlib nem scipy)
+    estatisticas = calcular_estatisticas_comparativas(df)
+    if subcomando == 'resumo':
+        return
+    
+    if subcomando == 'tudo':
+        # Gera tabela comparativa
+        gerar_tabela_comparativa(df)
     
-    # Gera tabela comparativa
-    gerar_tabela_comparativa(df)
+    if subcomando in ('graficos', 'tudo'):
+        # Gera gráficos
+        gerar_graficos_comparativos(df, estatisticas)
     
-    # Gera gráficos
-    gerar_graficos_comparativos(df, estatisticas)  # Passar o novo nome
+    if subcomando in ('relatorio', 'tudo'):
+        # Gera relatório completo
+        gerar_relatorio_completo(df, estatisticas)
     
-    # Gera relatório completo
-    gerar_relatorio_completo(df, estatisticas)  # Passar o novo nome
+    if subcomando in ('graficos', 'tudo'):
+        # Gráficos de memória (se os CSVs têm as colunas de memória)
+        gerar_graficos_memoria(df)
+        
+        # Gráficos de mineração (se os experimentos de mineracao.py foram rodados)
+        df_mineracao = carregar_dados_mineracao()
+        if df_mineracao is not None:
+            gerar_graficos_mineracao(df_mineracao)
+        
+        # Speedup e eficiência (se a matriz de experimentos variou o número de trabalhadores)
+        df_matriz = carregar_dados_matriz(filtros, argumentos.desde)
+        if df_matriz is not None and df_matriz['num_threads'].nunique() > 1:
+            gerar_graficos_escalabilidade(df_matriz)
+        
+        # Construção x prova por aridade (se a matriz variou a aridade)
+        if df_matriz is not None and df_matriz['aridade'].nunique() > 1:
+            gerar_graficos_aridade(df_matriz)
     
     print("\n" + "="*100)
     print("ANÁLISE CONCLUÍDA COM SUCESSO!")
     print("="*100)
-    print("\nArquivos gerados:")
-    for arquivo in os.listdir('resultados'):
-        if arquivo.startswith(('graficos_', 'tabela_', 'relatorio_')):
-            tamanho = os.path.getsize(f'resultados/{arquivo}')
-            print(f"  - {arquivo} ({tamanho:,} bytes)")
+    listar_arquivos_gerados()
 
 if __name__ == "__main__":
-    # Instala dependências se necessário
-    try:
-        import pandas
-        import matplotlib
-        import markdown
-    except ImportError:
-        print("Instalando dependências...")
-        import subprocess
-        subprocess.run([sys.executable, "-m", "pip", "install", "pandas", "matplotlib", "markdown"])
-    
-    # Verifica scipy separadamente
-    try:
-        from scipy import stats as scipy_stats
-    except ImportError:
-        print("Instalando scipy...")
-        import subprocess
-        subprocess.run([sys.executable, "-m", "pip", "install", "scipy"])
-        from scipy import stats as scipy_stats
-    
-    # Cria diretório se não existir
-    os.makedirs("resultados", exist_ok=True)
-    
-    main()
\ No newline at end of file
+    main()
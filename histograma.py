@@ -0,0 +1,133 @@
+# histograma.py
+# Histograma de latência com baldes logarítmicos (no estilo HDR): memória constante, resolução de
+# nanossegundos e erro relativo de no máximo 1/2^BITS_PRECISAO em qualquer percentil. Dois
+# histogramas com a mesma configuração se somam balde a balde, então cada thread ou processo
+# mantém o seu e no fim eles são mesclados
+import math
+from array import array
+
+BITS_PRECISAO = 8  # 2^(8-1) = 128 baldes por potência de 2: erro relativo < 0,8% (metade disso no ponto médio)
+MAXIMO_NS = 2**40  # ~18 minutos; latências maiores caem no último balde (o máximo exato continua guardado)
+
+
+def indice_balde(ns, bits=BITS_PRECISAO):
+    """Valores menores que 2^bits têm balde próprio; acima disso, cada potência de 2 tem 2^(bits-1) baldes"""
+    if ns < (1 << bits):
+        return ns
+    deslocamento = ns.bit_length() - bits
+    return (deslocamento << (bits - 1)) + (ns >> deslocamento)
+
+
+def limites_balde(indice, bits=BITS_PRECISAO):
+    """(menor, maior) valor em ns que cai no balde"""
+    if indice < (1 << bits):
+        return indice, indice
+    deslocamento = (indice >> (bits - 1)) - 1
+    mantissa = indice - (deslocamento << (bits - 1))
+    return mantissa << deslocamento, ((mantissa + 1) << deslocamento) - 1
+
+
+class Histograma_latencia:
+    def __init__(self, bits_precisao=BITS_PRECISAO, maximo_ns=MAXIMO_NS):
+        self.bits = bits_precisao
+        self.maximo_ns = maximo_ns
+        self.contagens = array('Q', bytes(8 * (indice_balde(maximo_ns, bits_precisao) + 1)))
+        self.total = 0
+        self.soma_ns = 0
+        self.min_ns = None
+        self.max_ns = None
+
+    @classmethod
+    def de_amostras(cls, segundos):
+        histograma = cls()
+        for valor in segundos:
+            histograma.registrar(valor)
+        return histograma
+
+    def registrar_ns(self, ns):
+        # sem trava: cada thread registra no seu histograma e eles são mesclados depois
+        ns = max(0, int(ns))
+        self.contagens[indice_balde(min(ns, self.maximo_ns), self.bits)] += 1
+        self.total += 1
+        self.soma_ns += ns
+        if self.min_ns is None or ns < self.min_ns:
+            self.min_ns = ns
+        if self.max_ns is None or ns > self.max_ns:
+            self.max_ns = ns
+
+    def registrar(self, segundos):
+        self.registrar_ns(round(segundos * 1e9))
+
+    def __len__(self):
+        return self.total
+
+    def mesclar(self, outro):
+        if (outro.bits, outro.maximo_ns) != (self.bits, self.maximo_ns):
+            raise ValueError("Histogramas com configurações diferentes não podem ser mesclados")
+        contagens = self.contagens
+        for indice, contagem in enumerate(outro.contagens):
+            if contagem:
+                contagens[indice] += contagem
+        self.total += outro.total
+        self.soma_ns += outro.soma_ns
+        if outro.total:
+            self.min_ns = outro.min_ns if self.min_ns is None else min(self.min_ns, outro.min_ns)
+            self.max_ns = outro.max_ns if self.max_ns is None else max(self.max_ns, outro.max_ns)
+        return self
+
+    def percentil_ns(self, p):
+        """Percentil p (0-100): ponto médio do balde que contém a amostra de ordem ceil(p% do total),
+        limitado ao mínimo e ao máximo observados"""
+        if not self.total:
+            return 0
+        if p >= 100:
+            return self.max_ns
+        ordem = max(1, math.ceil(self.total * p / 100))
+        acumulado = 0
+        for indice, contagem in enumerate(self.contagens):
+            acumulado += contagem
+            if acumulado >= ordem:
+                menor, maior = limites_balde(indice, self.bits)
+                return min(max((menor + maior) // 2, self.min_ns), self.max_ns)
+        return self.max_ns
+
+    def percentil(self, p):
+        return self.percentil_ns(p) / 1e9
+
+    def media(self):
+        return self.soma_ns / self.total / 1e9 if self.total else 0
+
+    def minimo(self):
+        return self.min_ns / 1e9 if self.total else 0
+
+    def maximo(self):
+        return self.max_ns / 1e9 if self.total else 0
+
+    def baldes(self):
+        """(menor ns, maior ns, contagem) de cada balde não vazio"""
+        for indice, contagem in enumerate(self.contagens):
+            if contagem:
+                menor, maior = limites_balde(indice, self.bits)
+                yield menor, maior, contagem
+
+    def bytes_memoria(self):
+        return self.contagens.itemsize * len(self.contagens)
+
+    def para_dict(self):
+        """Forma esparsa (só baldes não vazios) para mandar entre processos ou gravar em JSON"""
+        return {
+            'bits': self.bits, 'maximo_ns': self.maximo_ns, 'total': self.total, 'soma_ns': self.soma_ns,
+            'min_ns': self.min_ns, 'max_ns': self.max_ns,
+            'contagens': {indice: contagem for indice, contagem in enumerate(self.contagens) if contagem},
+        }
+
+    @classmethod
+    def de_dict(cls, dados):
+        histograma = cls(dados['bits'], dados['maximo_ns'])
+        for indice, contagem in dados['contagens'].items():
+            histograma.contagens[int(indice)] = contagem
+        histograma.total = dados['total']
+        histograma.soma_ns = dados['soma_ns']
+        histograma.min_ns = dados['min_ns']
+        histograma.max_ns = dados['max_ns']
+        return histograma
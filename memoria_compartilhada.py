@@ -0,0 +1,287 @@
+# memoria_compartilhada.py
+# Árvore servida por vários processos: os níveis e uma tabela hash das folhas vão para
+# segmentos de multiprocessing.shared_memory, e cada trabalhador se anexa a eles sem copiar
+# nada. Para os trabalhadores só passa um descritor pequeno (nomes dos segmentos e tamanhos dos níveis)
+import io
+import os
+import sys
+import csv
+import time
+import random
+import contextlib
+import multiprocessing
+from array import array
+from itertools import islice
+from multiprocessing import shared_memory, util
+
+from consultas import Indice_consultas, processar_lote, relatorio_lote, TAMANHO_BLOCO
+from histograma import Histograma_latencia
+
+TAMANHO_HASH = 32
+TAMANHO_POSICAO = 4  # cada entrada da tabela é posição + 1 em uint32 (0 = vazia)
+
+
+class Nivel_compartilhado:
+    """Um nível da árvore lido direto do segmento; nivel[i] devolve o hash em hexadecimal"""
+    def __init__(self, buffer, inicio, tamanho):
+        self.buffer = buffer
+        self.inicio = inicio
+        self.tamanho = tamanho
+
+    def __len__(self):
+        return self.tamanho
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(self.tamanho))]
+        if i < 0:
+            i += self.tamanho
+        if not 0 <= i < self.tamanho:
+            raise IndexError("posição fora do nível")
+        inicio = self.inicio + i * TAMANHO_HASH
+        return self.buffer[inicio:inicio + TAMANHO_HASH].hex()
+
+
+class Posicoes_compartilhadas:
+    """Hash da folha -> posição (faz o papel do dict do Indice_consultas) em uma tabela de endereçamento
+    aberto no segmento. O hash da folha já é um SHA-256, então os 8 primeiros bytes servem de chave da
+    tabela; a comparação final é com a folha no segmento dos níveis"""
+    def __init__(self, buffer_tabela, folhas, capacidade):
+        self.tabela = buffer_tabela.cast('I')
+        self.folhas = folhas  # memoryview do nível 0
+        self.mascara = capacidade - 1
+
+    def get(self, hash_folha, padrao=None):
+        alvo = bytes.fromhex(hash_folha)
+        tabela, folhas, mascara = self.tabela, self.folhas, self.mascara
+        slot = int.from_bytes(alvo[:8], 'little') & mascara
+        while True:
+            entrada = tabela[slot]
+            if entrada == 0:
+                return padrao
+            posicao = entrada - 1
+            if folhas[posicao * TAMANHO_HASH:(posicao + 1) * TAMANHO_HASH] == alvo:
+                return posicao
+            slot = (slot + 1) & mascara
+
+    def liberar(self):
+        self.tabela.release()
+        self.folhas.release()
+
+
+def capacidade_tabela(num_folhas):
+    # potência de 2 com ocupação de no máximo 50%: sondagem linear curta
+    return 1 << max(1, (2 * num_folhas - 1).bit_length())
+
+
+def publicar_niveis(niveis, aridade=2):
+    """Copia os níveis para um segmento e a tabela hash das folhas para outro.
+    Devolve (segmentos, descritor); quem publica é quem fecha e remove os segmentos"""
+    tamanhos = [len(nivel) for nivel in niveis]
+    segmento_niveis = shared_memory.SharedMemory(create=True, size=max(1, sum(tamanhos) * TAMANHO_HASH))
+    posicao = 0
+    for nivel in niveis:
+        dados = b''.join(bytes.fromhex(h) for h in nivel)
+        segmento_niveis.buf[posicao:posicao + len(dados)] = dados
+        posicao += len(dados)
+
+    # hash repetido fica com a primeira posição, como o setdefault do Indice_consultas
+    folhas = niveis[0] if niveis else []
+    capacidade = capacidade_tabela(len(folhas))
+    tabela = array('I', bytes(capacidade * TAMANHO_POSICAO))
+    mascara = capacidade - 1
+    for posicao, h in enumerate(folhas):
+        slot = int.from_bytes(bytes.fromhex(h[:16]), 'little') & mascara
+        while tabela[slot] and folhas[tabela[slot] - 1] != h:
+            slot = (slot + 1) & mascara
+        if not tabela[slot]:
+            tabela[slot] = posicao + 1
+    segmento_tabela = shared_memory.SharedMemory(create=True, size=capacidade * TAMANHO_POSICAO)
+    segmento_tabela.buf[:] = tabela.tobytes()
+
+    descritor = {'niveis': segmento_niveis.name, 'tabela': segmento_tabela.name, 'tamanhos': tamanhos,
+                 'capacidade': capacidade, 'aridade': aridade}
+    return [segmento_niveis, segmento_tabela], descritor
+
+
+class Indice_compartilhado(Indice_consultas):
+    """O Indice_consultas sobre os segmentos: mesmas respostas, sem copiar nenhum hash para o processo"""
+    def __init__(self, descritor):
+        self.segmentos = [shared_memory.SharedMemory(name=descritor['niveis']),
+                          shared_memory.SharedMemory(name=descritor['tabela'])]
+        # só leitura: uma escrita por engano dá erro em vez de corromper a árvore dos outros processos
+        self._buffers = [segmento.buf.toreadonly() for segmento in self.segmentos]
+        self.niveis = []
+        inicio = 0
+        for tamanho in descritor['tamanhos']:
+            self.niveis.append(Nivel_compartilhado(self._buffers[0], inicio, tamanho))
+            inicio += tamanho * TAMANHO_HASH
+        self.raiz = self.niveis[-1][0] if self.niveis and len(self.niveis[0]) else None
+        self.aridade = descritor['aridade']
+        num_folhas = descritor['tamanhos'][0] if descritor['tamanhos'] else 0
+        self.posicoes = Posicoes_compartilhadas(self._buffers[1][:descritor['capacidade'] * TAMANHO_POSICAO],
+                                                self._buffers[0][:num_folhas * TAMANHO_HASH], descritor['capacidade'])
+
+    def fechar(self):
+        # as visões precisam ser liberadas antes do close, senão o mmap continua exportado
+        self.posicoes.liberar()
+        self.niveis = []
+        for buffer in self._buffers:
+            buffer.release()
+        for segmento in self.segmentos:
+            segmento.close()
+
+
+# índice do processo trabalhador (um por processo, criado pelo inicializador do pool)
+_indice_trabalhador = None
+
+def _anexar_trabalhador(descritor):
+    global _indice_trabalhador
+    _indice_trabalhador = Indice_compartilhado(descritor)
+    # solta as visões antes do processo sair; senão o SharedMemory.__del__ reclama de ponteiros exportados
+    util.Finalize(_indice_trabalhador, _indice_trabalhador.fechar, exitpriority=10)
+
+def _carregar_copia_trabalhador(nome_snapshot):
+    # referência do benchmark: cada trabalhador com a própria cópia da árvore
+    global _indice_trabalhador
+    _indice_trabalhador = Indice_consultas.de_snapshot(nome_snapshot)
+
+def _responder_bloco(bloco):
+    """Roda no trabalhador: responde um bloco (número da primeira linha, linhas).
+    Devolve (JSON lines, histograma das latências em forma esparsa)"""
+    primeira_linha, linhas = bloco
+    saida = io.StringIO()
+    latencias, _ = processar_lote(_indice_trabalhador, linhas, saida, len(linhas), primeira_linha)
+    return saida.getvalue(), latencias.para_dict()
+
+
+class Servidor_compartilhado:
+    """Publica os níveis e mantém um pool de processos anexados a eles respondendo consultas"""
+    def __init__(self, niveis, num_trabalhadores=None, metodo_inicio="spawn", copias=None, aridade=2):
+        self.num_trabalhadores = num_trabalhadores or os.cpu_count() or 1
+        contexto = multiprocessing.get_context(metodo_inicio)
+        if copias:
+            # copias = snapshot que cada trabalhador carrega por conta própria (sem memória compartilhada)
+            self.segmentos, self.descritor = [], None
+            self.pool = contexto.Pool(self.num_trabalhadores, initializer=_carregar_copia_trabalhador, initargs=(copias,))
+        else:
+            self.segmentos, self.descritor = publicar_niveis(niveis, aridade)
+            self.pool = contexto.Pool(self.num_trabalhadores, initializer=_anexar_trabalhador, initargs=(self.descritor,))
+
+    def bytes_compartilhados(self):
+        return sum(segmento.size for segmento in self.segmentos)
+
+    def processar_lote(self, entrada, saida, tamanho_bloco=TAMANHO_BLOCO):
+        """Mesmo contrato do consultas.processar_lote, com os blocos respondidos em paralelo
+        (imap mantém a ordem das respostas)"""
+        latencias = Histograma_latencia()
+        inicio_total = time.perf_counter()
+        linhas = (linha for linha in entrada if linha.strip())
+
+        def blocos():
+            numero = 0
+            while True:
+                bloco = list(islice(linhas, tamanho_bloco))
+                if not bloco:
+                    return
+                yield numero, bloco
+                numero += len(bloco)
+
+        for texto, latencias_bloco in self.pool.imap(_responder_bloco, blocos()):
+            saida.write(texto)
+            saida.flush()
+            latencias.mesclar(Histograma_latencia.de_dict(latencias_bloco))
+        return latencias, time.perf_counter() - inicio_total
+
+    def pss_trabalhadores(self):
+        """Soma do PSS dos trabalhadores (páginas compartilhadas divididas entre quem as mapeia)"""
+        valores = [pss_processo(processo.pid) for processo in multiprocessing.active_children()]
+        return sum(valores) if valores and None not in valores else None
+
+    def fechar(self):
+        self.pool.close()
+        self.pool.join()
+        for segmento in self.segmentos:
+            segmento.close()
+            segmento.unlink()
+        self.segmentos = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excecao):
+        self.fechar()
+
+
+# PSS de um processo em bytes (Linux); None se o sistema não informar
+def pss_processo(pid):
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for linha in f:
+                if linha.startswith("Pss:"):
+                    return int(linha.split()[1]) * 1024
+    except (OSError, ValueError):
+        return None
+    return None
+
+
+def benchmark_memoria_compartilhada(nome_arquivo="transacoes.txt", trabalhadores=(1, 2, 4), num_consultas=20000,
+                                    prefixo_saida="resultados"):
+    """Vazão e memória dos trabalhadores: árvore em memória compartilhada x uma cópia por trabalhador"""
+    print(f"{'='*70}")
+    print("BENCHMARK: ÁRVORE EM MEMÓRIA COMPARTILHADA ENTRE PROCESSOS")
+    print(f"{'='*70}")
+
+    if not os.path.exists(nome_arquivo):
+        print(f"ERRO: Arquivo '{nome_arquivo}' não encontrado!")
+        return None
+
+    with contextlib.redirect_stderr(io.StringIO()):
+        indice = Indice_consultas.de_arquivo_transacoes(nome_arquivo)
+    if indice is None:
+        print("ERRO: Falha na construção da árvore!")
+        return None
+    os.makedirs(prefixo_saida, exist_ok=True)
+    nome_snapshot = f"{prefixo_saida}/memoria_compartilhada.niveis"
+    indice.salvar_snapshot(nome_snapshot)
+
+    with open(nome_arquivo, "r", encoding="utf-8") as f:
+        transacoes = [linha.strip() for linha in f if linha.strip()]
+    consultas = [f"{random.choice(('buscar', 'provar'))} "
+                 f"{random.choice(transacoes) if random.random() < 0.8 else f'ausente-{i}'}\n"
+                 for i in range(num_consultas)]
+    print(f"Folhas: {len(indice.niveis[0]):,}, consultas: {num_consultas:,} (CPUs: {os.cpu_count()})")
+
+    linhas = []
+    for modo in ("compartilhada", "copias"):
+        for num_trabalhadores in trabalhadores:
+            with Servidor_compartilhado(indice.niveis, num_trabalhadores,
+                                        copias=nome_snapshot if modo == "copias" else None) as servidor:
+                # aquecimento: garante que todos os trabalhadores já se anexaram (ou carregaram a cópia)
+                servidor.processar_lote(consultas[:num_trabalhadores * 10], io.StringIO(), 10)
+                saida = io.StringIO()
+                latencias, tempo_total = servidor.processar_lote(consultas, saida)
+                relatorio = relatorio_lote(latencias, tempo_total)
+                pss = servidor.pss_trabalhadores()
+                compartilhados = servidor.bytes_compartilhados()
+
+            print(f"  {modo:<13} {num_trabalhadores} trabalhadores: {relatorio['consultas_por_segundo']:>9,.0f} consultas/s, "
+                  f"p99 {relatorio['latencia_p99_us']:.1f} µs, PSS dos trabalhadores "
+                  f"{pss / 2**20 if pss else float('nan'):.1f} MiB"
+                  + (f" (segmentos: {compartilhados / 2**20:.1f} MiB)" if compartilhados else ""))
+            linhas.append([modo, num_trabalhadores, len(indice.niveis[0]), num_consultas,
+                           round(relatorio['consultas_por_segundo'], 1), round(relatorio['latencia_p50_us'], 2),
+                           round(relatorio['latencia_p99_us'], 2), pss if pss is not None else '', compartilhados])
+
+    nome_csv = f"{prefixo_saida}/benchmark_memoria_compartilhada.csv"
+    with open(nome_csv, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['modo', 'num_trabalhadores', 'num_folhas', 'num_consultas', 'consultas_por_segundo',
+                         'latencia_p50_us', 'latencia_p99_us', 'pss_trabalhadores_bytes', 'bytes_compartilhados'])
+        writer.writerows(linhas)
+    print(f"\n✓ Resultados salvos em: {nome_csv}")
+
+
+if __name__ == "__main__":
+    benchmark_memoria_compartilhada(sys.argv[1] if len(sys.argv) > 1 else "transacoes.txt",
+                                    tuple(int(p) for p in sys.argv[2:]) or (1, 2, 4))
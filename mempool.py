@@ -0,0 +1,199 @@
+# mempool.py
+# Mempool concorrente: várias threads produtoras submetem transações em uma fila limitada
+# e um montador de blocos drena lotes (por tamanho ou por tempo) e monta uma árvore por bloco
+import os
+import sys
+import csv
+import time
+import queue
+import threading
+
+from blockchain import hash_transacao, montar_niveis
+from cadeia import Block, HASH_ZERO
+
+
+def percentil(valores_ordenados, p):
+    """Percentil p (0-100) por interpolação linear sobre uma lista já ordenada"""
+    if not valores_ordenados:
+        return 0
+    posicao = (len(valores_ordenados) - 1) * p / 100
+    baixo = int(posicao)
+    alto = min(baixo + 1, len(valores_ordenados) - 1)
+    return valores_ordenados[baixo] + (valores_ordenados[alto] - valores_ordenados[baixo]) * (posicao - baixo)
+
+
+class Mempool:
+    def __init__(self, capacidade=10000, tamanho_bloco=1000, tempo_limite_bloco=0.5, cadeia=None):
+        self.fila = queue.Queue(maxsize=capacidade)  # put() bloqueia quando cheia: é a contrapressão
+        self.capacidade = capacidade
+        self.tamanho_bloco = tamanho_bloco
+        self.tempo_limite_bloco = tempo_limite_bloco
+        self.cadeia = cadeia  # Blockchain opcional onde os blocos montados são gravados
+        self.ultimo_hash = cadeia.ultimo_hash if cadeia is not None else HASH_ZERO
+
+        # hashes já admitidos (na fila ou em bloco), para rejeitar duplicadas
+        self.vistas = set()
+        self.lock_vistas = threading.Lock()
+
+        self.blocos = []  # (hash do bloco, raiz de Merkle, número de transações)
+        self.latencias = []  # admissão -> commit, em segundos
+        self.profundidades = []  # tamanho da fila a cada bloco montado
+        self.admitidas = 0
+        self.duplicadas = 0
+        self.rejeitadas_fila_cheia = 0
+        self.confirmadas = 0
+
+        self._parar = threading.Event()
+        self._montador = None
+
+    def submeter(self, transacao, timeout=None):
+        """Admite a transação. Retorna False se for duplicada ou se a fila continuar cheia após o timeout"""
+        hash_folha = hash_transacao(transacao)
+        with self.lock_vistas:
+            if hash_folha in self.vistas:
+                self.duplicadas += 1
+                return False
+            self.vistas.add(hash_folha)
+
+        try:
+            self.fila.put((hash_folha, time.perf_counter()), timeout=timeout)
+        except queue.Full:
+            with self.lock_vistas:
+                self.vistas.discard(hash_folha)  # pode ser reenviada depois
+                self.rejeitadas_fila_cheia += 1
+            return False
+
+        with self.lock_vistas:
+            self.admitidas += 1
+        return True
+
+    def _drenar_lote(self):
+        # espera a primeira transação e depois junta até encher o bloco ou estourar o tempo limite
+        try:
+            lote = [self.fila.get(timeout=0.05)]
+        except queue.Empty:
+            return []
+
+        prazo = time.perf_counter() + self.tempo_limite_bloco
+        while len(lote) < self.tamanho_bloco:
+            restante = prazo - time.perf_counter()
+            if restante <= 0:
+                break
+            try:
+                lote.append(self.fila.get(timeout=restante))
+            except queue.Empty:
+                break
+        return lote
+
+    def _montar_bloco(self, lote):
+        profundidade = self.fila.qsize()
+        niveis = montar_niveis([hash_folha for hash_folha, _ in lote])
+        bloco = Block(self.ultimo_hash, niveis[-1][0])
+        if self.cadeia is not None:
+            self.cadeia.adicionar_bloco(bloco)
+        self.ultimo_hash = bloco.hash
+
+        instante_commit = time.perf_counter()
+        self.latencias.extend(instante_commit - admissao for _, admissao in lote)
+        self.profundidades.append(profundidade)
+        self.blocos.append((self.ultimo_hash, niveis[-1][0], len(lote)))
+        self.confirmadas += len(lote)
+
+    def _loop_montador(self):
+        while not (self._parar.is_set() and self.fila.empty()):
+            lote = self._drenar_lote()
+            if lote:
+                self._montar_bloco(lote)
+
+    def iniciar(self):
+        self._montador = threading.Thread(target=self._loop_montador, daemon=True)
+        self._montador.start()
+
+    def parar(self):
+        """Para o montador depois de confirmar tudo que ainda está na fila"""
+        self._parar.set()
+        if self._montador is not None:
+            self._montador.join()
+
+    def relatorio(self, tempo_total):
+        latencias = sorted(self.latencias)
+        return {
+            'transacoes_admitidas': self.admitidas,
+            'transacoes_confirmadas': self.confirmadas,
+            'duplicadas_rejeitadas': self.duplicadas,
+            'rejeitadas_fila_cheia': self.rejeitadas_fila_cheia,
+            'blocos_montados': len(self.blocos),
+            'transacoes_por_segundo': self.confirmadas / tempo_total if tempo_total > 0 else 0,
+            'profundidade_media_fila': sum(self.profundidades) / len(self.profundidades) if self.profundidades else 0,
+            'profundidade_max_fila': max(self.profundidades) if self.profundidades else 0,
+            'latencia_p50_ms': percentil(latencias, 50) * 1000,
+            'latencia_p95_ms': percentil(latencias, 95) * 1000,
+            'latencia_p99_ms': percentil(latencias, 99) * 1000,
+            'latencia_max_ms': latencias[-1] * 1000 if latencias else 0,
+        }
+
+
+def executar_carga_mempool(nome_arquivo="transacoes.txt", num_produtores=8, capacidade=2000, tamanho_bloco=500,
+                           tempo_limite_bloco=0.2, fracao_duplicadas=0.05, prefixo_saida="resultados"):
+    """Submete as transações do arquivo a partir de várias threads e mede a vazão sustentada"""
+    print(f"{'='*70}")
+    print(f"MEMPOOL: {num_produtores} PRODUTORES, FILA DE {capacidade}, BLOCOS DE ATÉ {tamanho_bloco}")
+    print(f"{'='*70}")
+
+    if not os.path.exists(nome_arquivo):
+        print(f"ERRO: Arquivo '{nome_arquivo}' não encontrado!")
+        return None
+
+    with open(nome_arquivo, "r", encoding="utf-8") as f:
+        transacoes = [linha.strip() for linha in f if linha.strip()]
+
+    # parte das transações é reenviada por outro produtor para exercitar a deduplicação
+    num_duplicadas = int(len(transacoes) * fracao_duplicadas)
+    partes = [transacoes[i::num_produtores] for i in range(num_produtores)]
+    for i in range(num_duplicadas):
+        partes[(i + 1) % num_produtores].append(transacoes[i])
+
+    mempool = Mempool(capacidade, tamanho_bloco, tempo_limite_bloco)
+
+    def produtor(parte):
+        for transacao in parte:
+            mempool.submeter(transacao)
+
+    inicio = time.perf_counter()
+    mempool.iniciar()
+    produtores = [threading.Thread(target=produtor, args=(parte,)) for parte in partes]
+    for t in produtores:
+        t.start()
+    for t in produtores:
+        t.join()
+    mempool.parar()
+    tempo_total = time.perf_counter() - inicio
+
+    relatorio = mempool.relatorio(tempo_total)
+    print(f"  Transações confirmadas: {relatorio['transacoes_confirmadas']:,} em {relatorio['blocos_montados']} blocos")
+    print(f"  Duplicadas rejeitadas: {relatorio['duplicadas_rejeitadas']:,}")
+    print(f"  Vazão sustentada: {relatorio['transacoes_por_segundo']:,.0f} transações/segundo")
+    print(f"  Profundidade da fila: média {relatorio['profundidade_media_fila']:.0f}, máxima {relatorio['profundidade_max_fila']}")
+    print(f"  Latência admissão->commit: p50 {relatorio['latencia_p50_ms']:.2f} ms, "
+          f"p95 {relatorio['latencia_p95_ms']:.2f} ms, p99 {relatorio['latencia_p99_ms']:.2f} ms")
+
+    os.makedirs(prefixo_saida, exist_ok=True)
+    nome_csv = f"{prefixo_saida}/benchmark_mempool.csv"
+    arquivo_existe = os.path.exists(nome_csv)
+    with open(nome_csv, 'a', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        if not arquivo_existe:
+            writer.writerow(['num_produtores', 'capacidade_fila', 'tamanho_bloco'] + list(relatorio.keys()))
+        writer.writerow([num_produtores, capacidade, tamanho_bloco] +
+                        [round(v, 3) if isinstance(v, float) else v for v in relatorio.values()])
+    print(f"\n✓ Resultados salvos em: {nome_csv}")
+
+    return relatorio
+
+
+if __name__ == "__main__":
+    executar_carga_mempool(
+        sys.argv[1] if len(sys.argv) > 1 else "transacoes.txt",
+        num_produtores=int(sys.argv[2]) if len(sys.argv) > 2 else 8,
+        tamanho_bloco=int(sys.argv[3]) if len(sys.argv) > 3 else 500
+    )
@@ -0,0 +1,249 @@
+# mineracao.py
+# Prova de trabalho para os cabeçalhos da cadeia: o espaço de nonces (32 bits) é dividido
+# em faixas distribuídas entre processos, e todos param assim que um deles acha a solução
+import os
+import sys
+import csv
+import time
+import struct
+import hashlib
+import multiprocessing
+from datetime import datetime
+
+from blockchain import Merkle_tree
+from cadeia import Block, Blockchain, TAMANHO_CABECALHO, HASH_ZERO
+
+NONCE_MAXIMO = 2**32
+TAMANHO_FAIXA_PADRAO = 2**16
+VERIFICA_CANCELAMENTO_A_CADA = 4096  # nonces entre uma checagem e outra do evento de parada
+
+
+def bits_para_alvo(bits):
+    # formato compacto do Bitcoin: 1 byte de expoente e 3 de mantissa
+    expoente = bits >> 24
+    mantissa = bits & 0x7fffff
+    if expoente <= 3:
+        return mantissa >> (8 * (3 - expoente))
+    return mantissa << (8 * (expoente - 3))
+
+def alvo_para_bits(alvo):
+    tamanho = (alvo.bit_length() + 7) // 8
+    if tamanho <= 3:
+        mantissa = alvo << (8 * (3 - tamanho))
+    else:
+        mantissa = alvo >> (8 * (tamanho - 3))
+    # o bit mais alto da mantissa é de sinal, então empurra um byte para o expoente
+    if mantissa & 0x800000:
+        mantissa >>= 8
+        tamanho += 1
+    return (tamanho << 24) | mantissa
+
+def bits_de_dificuldade(zeros_iniciais):
+    """Alvo compacto para exigir pelo menos `zeros_iniciais` bits zero no início do hash"""
+    return alvo_para_bits((1 << (256 - zeros_iniciais)) - 1)
+
+def prova_trabalho_valida(bloco):
+    # o hash é lido na mesma ordem em que aparece em hex, então os zeros ficam visíveis no início
+    return int(bloco.hash, 16) <= bits_para_alvo(bloco.bits)
+
+
+# estado global de cada processo do pool, preenchido pelo initializer
+_evento_parada = None
+_prefixo = None
+_alvo = None
+_contador_hashes = None  # hashes de todas as faixas, inclusive as largadas no meio pelo evento
+_faixas_ativas = None  # faixas em andamento agora; o processo principal espera zerar antes do terminate
+
+def _inicializa_processo(evento, prefixo, alvo, contador_hashes, faixas_ativas):
+    global _evento_parada, _prefixo, _alvo, _contador_hashes, _faixas_ativas
+    _evento_parada = evento
+    _prefixo = prefixo
+    _alvo = alvo
+    _contador_hashes = contador_hashes
+    _faixas_ativas = faixas_ativas
+
+def buscar_faixa(faixa, prefixo=None, alvo=None, evento=None):
+    """Procura um nonce válido em [inicio, fim). Retorna (nonce ou None, hashes calculados)"""
+    prefixo = _prefixo if prefixo is None else prefixo
+    alvo = _alvo if alvo is None else alvo
+    evento = _evento_parada if evento is None else evento
+    inicio, fim = faixa
+
+    # midstate: o primeiro bloco de 64 bytes do SHA-256 é sempre o mesmo, só o resto
+    # (12 bytes do prefixo + 4 do nonce) muda, então cada tentativa parte de uma cópia
+    estado_inicial = hashlib.sha256(prefixo[:64])
+    resto = prefixo[64:]
+    sha256 = hashlib.sha256
+    empacota = struct.Struct('<I').pack
+
+    for base in range(inicio, fim, VERIFICA_CANCELAMENTO_A_CADA):
+        if evento is not None and evento.is_set():
+            return None, base - inicio
+        for nonce in range(base, min(base + VERIFICA_CANCELAMENTO_A_CADA, fim)):
+            estado = estado_inicial.copy()
+            estado.update(resto + empacota(nonce))
+            if int.from_bytes(sha256(estado.digest()).digest(), 'big') <= alvo:
+                return nonce, nonce - inicio + 1
+    return None, fim - inicio
+
+
+def _buscar_faixa_processo(faixa):
+    # roda no pool: soma os hashes no contador compartilhado antes de devolver a faixa
+    with _faixas_ativas.get_lock():
+        _faixas_ativas.value += 1
+    try:
+        nonce, hashes = buscar_faixa(faixa)
+        with _contador_hashes.get_lock():
+            _contador_hashes.value += hashes
+        return nonce, hashes
+    finally:
+        with _faixas_ativas.get_lock():
+            _faixas_ativas.value -= 1
+
+
+def minerar(bloco, num_processos=None, tamanho_faixa=TAMANHO_FAIXA_PADRAO, nonce_inicial=0, limite_nonces=None):
+    """Procura um nonce para o bloco. Retorna (nonce ou None, hashes calculados, tempo em segundos)"""
+    num_processos = num_processos or os.cpu_count() or 1
+    prefixo = bloco.cabecalho()[:TAMANHO_CABECALHO - 4]
+    alvo = bits_para_alvo(bloco.bits)
+    fim_total = min(NONCE_MAXIMO, nonce_inicial + limite_nonces) if limite_nonces else NONCE_MAXIMO
+    faixas = [(i, min(i + tamanho_faixa, fim_total)) for i in range(nonce_inicial, fim_total, tamanho_faixa)]
+
+    encontrado = None
+    total_hashes = 0
+    inicio = time.perf_counter()
+
+    if num_processos == 1:
+        for faixa in faixas:
+            nonce, hashes = buscar_faixa(faixa, prefixo, alvo)
+            total_hashes += hashes
+            if nonce is not None:
+                encontrado = nonce
+                break
+    else:
+        evento = multiprocessing.Event()
+        contador_hashes = multiprocessing.Value('Q', 0)
+        faixas_ativas = multiprocessing.Value('i', 0)
+        with multiprocessing.Pool(num_processos, initializer=_inicializa_processo,
+                                  initargs=(evento, prefixo, alvo, contador_hashes, faixas_ativas)) as pool:
+            for nonce, _ in pool.imap_unordered(_buscar_faixa_processo, faixas):
+                if nonce is not None and encontrado is None:
+                    encontrado = nonce
+                    evento.set()  # avisa os outros processos para largarem as faixas em andamento
+                    break
+            # as faixas em andamento param em até VERIFICA_CANCELAMENTO_A_CADA nonces e somam o que já
+            # calcularam; as que começarem depois do evento saem sem calcular nenhum hash
+            while faixas_ativas.value:
+                time.sleep(0.001)
+            pool.terminate()
+        total_hashes = contador_hashes.value
+
+    tempo = time.perf_counter() - inicio
+    if encontrado is not None:
+        bloco.nonce = encontrado
+    return encontrado, total_hashes, tempo
+
+
+def salvar_estatisticas_mineracao_csv(linha, nome_arquivo):
+    """Salva uma linha de estatísticas de mineração no mesmo formato dos CSVs da árvore"""
+    arquivo_existe = os.path.exists(nome_arquivo)
+    with open(nome_arquivo, 'a', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        if not arquivo_existe:
+            writer.writerow(list(linha.keys()))
+        writer.writerow(list(linha.values()))
+
+
+def executar_experimentos_mineracao(nome_arquivo="transacoes.txt", nonces_por_processo=200000, prefixo_saida="resultados"):
+    """Mede hashes/segundo por núcleo e eficiência de escala para 1, 2, 4, ... processos"""
+    print(f"{'='*70}")
+    print("EXPERIMENTOS DE MINERAÇÃO (PROVA DE TRABALHO)")
+    print(f"{'='*70}")
+
+    if not os.path.exists(nome_arquivo):
+        print(f"ERRO: Arquivo '{nome_arquivo}' não encontrado!")
+        return None
+
+    os.makedirs(prefixo_saida, exist_ok=True)
+    arvore = Merkle_tree(nome_arquivo=nome_arquivo, num_threads=4)
+    if not arvore.raiz:
+        print("ERRO: Falha na construção da árvore!")
+        return None
+
+    # alvo impossível (zero) para todos os processos varrerem a mesma quantidade de nonces
+    bloco = Block(HASH_ZERO, arvore.raiz.hash, bits=alvo_para_bits(0))
+
+    max_processos = os.cpu_count() or 1
+    contagens = [1]
+    while contagens[-1] * 2 <= max_processos:
+        contagens.append(contagens[-1] * 2)
+    if contagens[-1] != max_processos:
+        contagens.append(max_processos)
+
+    taxa_base = None
+    resultados = []
+    for num_processos in contagens:
+        _, hashes, tempo = minerar(bloco, num_processos, limite_nonces=nonces_por_processo * num_processos)
+        taxa = hashes / tempo if tempo > 0 else 0
+        taxa_por_nucleo = taxa / num_processos
+        if taxa_base is None:
+            taxa_base = taxa_por_nucleo
+        eficiencia = taxa_por_nucleo / taxa_base if taxa_base else 0
+
+        print(f"  {num_processos:3} processos: {taxa:,.0f} hashes/s ({taxa_por_nucleo:,.0f} por núcleo, eficiência {eficiencia*100:.1f}%)")
+        linha = {
+            'data_execucao': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            'num_processos': num_processos,
+            'hashes_calculados': hashes,
+            'tempo_mineracao_seg': round(tempo, 4),
+            'hashes_por_segundo': round(taxa, 1),
+            'hashes_por_segundo_por_nucleo': round(taxa_por_nucleo, 1),
+            'eficiencia_escala': round(eficiencia, 4),
+            'hash_raiz_32chars': arvore.raiz.hash[:32] + '...',
+        }
+        salvar_estatisticas_mineracao_csv(linha, f"{prefixo_saida}/estatisticas_mineracao_{num_processos}.csv")
+        resultados.append(linha)
+
+    print(f"\n✓ Estatísticas salvas em: {prefixo_saida}/estatisticas_mineracao_<processos>.csv")
+    return resultados
+
+
+def minerar_bloco(nome_arquivo="transacoes.txt", zeros_iniciais=16, num_processos=None, nome_cadeia="cadeia.dat"):
+    """Minera um bloco de verdade sobre a raiz da Merkle_tree e acrescenta na cadeia"""
+    arvore = Merkle_tree(nome_arquivo=nome_arquivo, num_threads=4)
+    if not arvore.raiz:
+        print("ERRO: Falha na construção da árvore!")
+        return None
+
+    cadeia = Blockchain(nome_cadeia)
+    bloco = Block(cadeia.ultimo_hash, arvore.raiz.hash, bits=bits_de_dificuldade(zeros_iniciais))
+    print(f"\nMinerando bloco na altura {len(cadeia)} com {zeros_iniciais} bits zero...")
+
+    nonce, hashes, tempo = minerar(bloco, num_processos)
+    if nonce is None:
+        print("✗ Nenhum nonce válido no espaço de 32 bits (mude o timestamp e tente de novo)")
+        cadeia.fechar()
+        return None
+
+    if not prova_trabalho_valida(bloco):
+        print("✗ Nonce encontrado não atende o alvo")
+        cadeia.fechar()
+        return None
+
+    altura = cadeia.adicionar_bloco(bloco)
+    cadeia.sincronizar()
+    cadeia.fechar()
+    print(f"✓ Nonce {nonce} encontrado em {tempo:.2f} s ({hashes / tempo:,.0f} hashes/s)")
+    print(f"  Hash do bloco: {bloco.hash}")
+    print(f"  Altura na cadeia: {altura}")
+    return bloco
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--bloco":
+        minerar_bloco(
+            sys.argv[2] if len(sys.argv) > 2 else "transacoes.txt",
+            int(sys.argv[3]) if len(sys.argv) > 3 else 16
+        )
+    else:
+        executar_experimentos_mineracao(sys.argv[1] if len(sys.argv) > 1 else "transacoes.txt")
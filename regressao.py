@@ -0,0 +1,270 @@
+# regressao.py
+# Portão de regressão: roda um perfil fixo de benchmark, compara com uma linha de base gravada
+# (várias amostras por métrica) usando o teste de Mann-Whitney e sai com código 1 se piorou
+import gc
+import io
+import os
+import sys
+import csv
+import json
+import math
+import random
+import time
+import contextlib
+from datetime import datetime
+
+from blockchain import Merkle_tree, hash_transacao
+
+ARQUIVO_BASE = "baseline_regressao.json"
+FORMATO_BASE = 2  # linhas de base de formato anterior (busca pela média, folhas em 4 threads) são gravadas de novo
+
+# perfil fixo: mesmos tamanhos, repetições e sementes em toda execução. Com uma thread a ordem das
+# folhas só depende da semente, e as buscas são sempre nas mesmas posições das folhas: o custo da
+# busca em profundidade depende da posição, então cada repetição faz exatamente o mesmo trabalho
+PERFIL_PADRAO = {
+    'tamanhos': [1024, 4096],
+    'repeticoes': 11,
+    'num_threads': 1,
+    'buscas_por_repeticao': 50,
+    'semente': 2024,
+}
+
+# variação relativa tolerada da mediana e o sentido em que a métrica melhora
+TOLERANCIAS_PADRAO = {
+    'taxa_processamento': 0.10,
+    'tempo_busca_ms': 0.15,
+}
+MAIOR_MELHOR = {'taxa_processamento': True, 'tempo_busca_ms': False}
+ALFA = 0.05  # nível de significância do teste
+VEZES_BUSCA = 3  # buscas repetidas por posição; a menor descarta interrupções do sistema
+# carga de calibração medida em cada repetição (hash duplo de transações fixas): a velocidade da máquina
+# muda entre execuções, então as amostras são comparadas como se rodassem na velocidade da linha de base
+TRANSACOES_REFERENCIA = [f"referencia-{i}" for i in range(5000)]
+# a tolerância de cada métrica nunca fica abaixo de DISPERSOES vezes a dispersão relativa da própria base
+DISPERSOES = 3
+
+
+def mediana(valores):
+    ordenados = sorted(valores)
+    meio = len(ordenados) // 2
+    if len(ordenados) % 2:
+        return ordenados[meio]
+    return (ordenados[meio - 1] + ordenados[meio]) / 2
+
+
+def dispersao_relativa(valores):
+    """Desvio absoluto mediano (escalado para equivaler ao desvio padrão) dividido pela mediana"""
+    centro = mediana(valores)
+    if not centro:
+        return 0.0
+    return 1.4826 * mediana([abs(v - centro) for v in valores]) / abs(centro)
+
+
+def mann_whitney_unilateral(base, atual, atual_maior):
+    """p-valor unilateral de Mann-Whitney (aproximação normal com correção de empates e de continuidade).
+    atual_maior=True testa se as amostras atuais tendem a ser maiores que as da base"""
+    n1, n2 = len(base), len(atual)
+    if n1 == 0 or n2 == 0:
+        return 1.0
+
+    # postos médios para empates
+    todos = sorted([(v, 0) for v in base] + [(v, 1) for v in atual])
+    postos = [0.0] * len(todos)
+    grupos_empate = []
+    i = 0
+    while i < len(todos):
+        j = i
+        while j + 1 < len(todos) and todos[j + 1][0] == todos[i][0]:
+            j += 1
+        for k in range(i, j + 1):
+            postos[k] = (i + j) / 2 + 1
+        grupos_empate.append(j - i + 1)
+        i = j + 1
+
+    soma_postos_atual = sum(posto for posto, (_, grupo) in zip(postos, todos) if grupo == 1)
+    u_atual = soma_postos_atual - n2 * (n2 + 1) / 2
+
+    n = n1 + n2
+    media_u = n1 * n2 / 2
+    correcao_empates = sum(t ** 3 - t for t in grupos_empate) / (n * (n - 1)) if n > 1 else 0
+    variancia_u = n1 * n2 / 12 * ((n + 1) - correcao_empates)
+    if variancia_u <= 0:
+        return 1.0
+
+    desvio = u_atual - media_u if atual_maior else media_u - u_atual
+    z = (desvio - 0.5) / math.sqrt(variancia_u)
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def medir_referencia():
+    """Menor tempo (ms) de VEZES_BUSCA passadas pela carga de calibração"""
+    tempos = []
+    for _ in range(VEZES_BUSCA):
+        inicio = time.perf_counter()
+        for transacao in TRANSACOES_REFERENCIA:
+            hash_transacao(transacao)
+        tempos.append(time.perf_counter() - inicio)
+    return min(tempos) * 1000
+
+
+def executar_perfil(nome_arquivo="transacoes.txt", perfil=PERFIL_PADRAO):
+    """Roda o perfil e devolve {métrica_n: [amostras]}; a saída da construção e das buscas é silenciada.
+    A amostra de busca de cada repetição é a mediana, entre posições fixas das folhas, do menor tempo
+    de VEZES_BUSCA buscas na mesma posição"""
+    amostras = {}
+    arvore = None
+    for n in perfil['tamanhos']:
+        for repeticao in range(perfil['repeticoes']):
+            random.seed(perfil['semente'] + repeticao)
+            # a árvore anterior sai antes da construção, senão o coletor de lixo percorre as duas
+            del arvore
+            gc.collect()
+            referencia = medir_referencia()
+            with contextlib.redirect_stdout(io.StringIO()):
+                arvore = Merkle_tree(nome_arquivo, num_threads=perfil['num_threads'], transacoes_por_thread=n)
+                if not arvore.raiz:
+                    raise RuntimeError(f"Falha na construção da árvore com {n} transações")
+                # posições espaçadas igualmente da primeira à última folha
+                por_hash = {hash_transacao(t): t for t in arvore.transacoes_selecionadas}
+                num_folhas = len(arvore.folhas)
+                buscas = perfil['buscas_por_repeticao']
+                posicoes = [i * (num_folhas - 1) // max(1, buscas - 1) for i in range(buscas)]
+                gc.disable()
+                try:
+                    tempos_busca = [min(arvore.busca_transacao(por_hash[arvore.folhas[p].hash])[1]
+                                        for _ in range(VEZES_BUSCA)) for p in posicoes]
+                finally:
+                    gc.enable()
+
+            amostras.setdefault(f"taxa_processamento_{n}", []).append(arvore.estatisticas['taxa_processamento'])
+            amostras.setdefault(f"tempo_busca_ms_{n}", []).append(mediana(tempos_busca) * 1000)
+            amostras.setdefault(f"referencia_ms_{n}", []).append(referencia)
+        print(f"  {n:6} transações: {perfil['repeticoes']} repetições")
+    return amostras
+
+
+def _metrica_base(nome):
+    # "taxa_processamento_1024" -> "taxa_processamento"
+    return nome.rsplit('_', 1)[0]
+
+
+def gravar_base(nome_arquivo="transacoes.txt", arquivo_base=ARQUIVO_BASE, perfil=PERFIL_PADRAO):
+    print(f"{'='*70}")
+    print("REGRESSÃO: GRAVANDO LINHA DE BASE")
+    print(f"{'='*70}")
+
+    if not os.path.exists(nome_arquivo):
+        print(f"ERRO: Arquivo '{nome_arquivo}' não encontrado!")
+        return None
+
+    amostras = executar_perfil(nome_arquivo, perfil)
+    base = {
+        'formato': FORMATO_BASE,
+        'data_execucao': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        'nome_arquivo': nome_arquivo,
+        'perfil': perfil,
+        'tolerancias': TOLERANCIAS_PADRAO,
+        'amostras': amostras,
+    }
+    with open(arquivo_base, 'w', encoding='utf-8') as f:
+        json.dump(base, f, indent=2)
+    print(f"\n✓ Linha de base salva em: {arquivo_base}")
+    return base
+
+
+def normalizar(amostras, referencias, referencia_base, maior_melhor):
+    """Cada amostra na velocidade da máquina da linha de base: fator = referência da repetição / da base"""
+    fatores = [referencia / referencia_base for referencia in referencias]
+    return [v * f if maior_melhor else v / f for v, f in zip(amostras, fatores)]
+
+
+def comparar(base, amostras_atuais):
+    """Linhas da tabela de comparação: (métrica, mediana base, mediana atual, variação, tolerância, p, regrediu).
+    As amostras das duas execuções são normalizadas pela carga de calibração da própria repetição"""
+    tolerancias = {**TOLERANCIAS_PADRAO, **base.get('tolerancias', {})}
+    linhas = []
+    for nome, amostras_base in base['amostras'].items():
+        if nome not in amostras_atuais or nome.startswith('referencia_ms_'):
+            continue
+        metrica = _metrica_base(nome)
+        maior_melhor = MAIOR_MELHOR[metrica]
+        n = nome.rsplit('_', 1)[1]
+        referencias_base = base['amostras'][f"referencia_ms_{n}"]
+        referencia_base = mediana(referencias_base)
+        amostras_base = normalizar(amostras_base, referencias_base, referencia_base, maior_melhor)
+        amostras_atuais_n = normalizar(amostras_atuais[nome], amostras_atuais[f"referencia_ms_{n}"], referencia_base,
+                                       maior_melhor)
+        mediana_base = mediana(amostras_base)
+        mediana_atual = mediana(amostras_atuais_n)
+        variacao = (mediana_atual - mediana_base) / mediana_base if mediana_base else 0.0
+
+        # uma métrica que já oscila muito na própria base ganha uma tolerância maior
+        tolerancia = max(tolerancias[metrica], DISPERSOES * dispersao_relativa(amostras_base))
+
+        # regressão = piora maior que a tolerância E estatisticamente significativa
+        piora = -variacao if maior_melhor else variacao
+        p = mann_whitney_unilateral(amostras_base, amostras_atuais_n, atual_maior=not maior_melhor)
+        regrediu = piora > tolerancia and p < ALFA
+        linhas.append((nome, mediana_base, mediana_atual, variacao, tolerancia, p, regrediu))
+    return linhas
+
+
+def verificar_regressao(nome_arquivo="transacoes.txt", arquivo_base=ARQUIVO_BASE, prefixo_saida="resultados"):
+    """Roda o perfil gravado na linha de base e retorna 0 (ok), 1 (regressão) ou 2 (erro)"""
+    print(f"{'='*70}")
+    print("REGRESSÃO: COMPARANDO COM A LINHA DE BASE")
+    print(f"{'='*70}")
+
+    if not os.path.exists(arquivo_base):
+        print(f"ERRO: Linha de base '{arquivo_base}' não encontrada! Grave com: python3 regressao.py gravar")
+        return 2
+    if not os.path.exists(nome_arquivo):
+        print(f"ERRO: Arquivo '{nome_arquivo}' não encontrado!")
+        return 2
+
+    with open(arquivo_base, 'r', encoding='utf-8') as f:
+        base = json.load(f)
+    if base.get('formato', 1) < FORMATO_BASE:
+        print(f"ERRO: Linha de base '{arquivo_base}' é de um perfil antigo! Grave de novo com: python3 regressao.py gravar")
+        return 2
+    print(f"Linha de base de {base['data_execucao']} ({base['nome_arquivo']})")
+
+    amostras = executar_perfil(nome_arquivo, base['perfil'])
+    linhas = comparar(base, amostras)
+
+    print(f"\n{'Métrica':<28} {'Base':>12} {'Atual':>12} {'Variação':>9} {'Tolerância':>10} {'p':>8}  Situação")
+    print("-" * 95)
+    for nome, mediana_base, mediana_atual, variacao, tolerancia, p, regrediu in linhas:
+        situacao = "✗ REGRESSÃO" if regrediu else "✓"
+        print(f"{nome:<28} {mediana_base:>12.3f} {mediana_atual:>12.3f} {variacao:>+8.1%} {tolerancia:>10.0%} "
+              f"{p:>8.4f}  {situacao}")
+
+    os.makedirs(prefixo_saida, exist_ok=True)
+    nome_csv = f"{prefixo_saida}/benchmark_regressao.csv"
+    with open(nome_csv, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['metrica', 'mediana_base', 'mediana_atual', 'variacao', 'tolerancia', 'p_valor', 'regressao'])
+        for nome, mediana_base, mediana_atual, variacao, tolerancia, p, regrediu in linhas:
+            writer.writerow([nome, round(mediana_base, 4), round(mediana_atual, 4), round(variacao, 4),
+                             tolerancia, round(p, 5), int(regrediu)])
+    print(f"\n✓ Resultados salvos em: {nome_csv}")
+
+    regressoes = sum(1 for linha in linhas if linha[-1])
+    if regressoes:
+        print(f"\n✗ {regressoes} métrica(s) regrediram além da tolerância")
+        return 1
+    print("\n✓ Nenhuma regressão detectada")
+    return 0
+
+
+if __name__ == "__main__":
+    modo = sys.argv[1] if len(sys.argv) > 1 else "verificar"
+    arquivo = sys.argv[2] if len(sys.argv) > 2 else "transacoes.txt"
+    base = sys.argv[3] if len(sys.argv) > 3 else ARQUIVO_BASE
+    if modo == "gravar":
+        sys.exit(0 if gravar_base(arquivo, base) else 2)
+    elif modo == "verificar":
+        sys.exit(verificar_regressao(arquivo, base))
+    else:
+        print("Uso: python3 regressao.py [gravar|verificar] [arquivo_transacoes] [arquivo_base]")
+        sys.exit(2)
@@ -0,0 +1,235 @@
+# sincronizacao.py
+# Diferença entre duas árvores de Merkle e sincronização de réplicas: desce apenas pelas
+# subárvores cujos hashes diferem, então o custo é O(k log n) para k folhas diferentes
+import os
+import sys
+import csv
+import time
+import random
+import struct
+
+from blockchain import hash_transacao, hash_pai, hash_grupo, completar_grupo, montar_niveis, ARIDADES
+
+TAMANHO_HASH = 32  # bytes de um hash trocado entre réplicas
+TAMANHO_POSICAO = 4  # bytes de uma posição pedida
+# o primeiro uint32 do arquivo de níveis guarda o número de níveis nos 16 bits baixos e a aridade
+# nos altos; arquivos antigos têm 0 ali e continuam sendo lidos como binários
+DESLOCAMENTO_ARIDADE = 16
+MASCARA_NUM_NIVEIS = (1 << DESLOCAMENTO_ARIDADE) - 1
+
+
+def exportar_niveis(niveis, nome_arquivo, aridade=2):
+    """Grava os níveis em binário: número de níveis e aridade, tamanho de cada nível e os hashes de 32 bytes"""
+    with open(nome_arquivo, 'wb') as f:
+        f.write(struct.pack('<I', len(niveis) | (aridade << DESLOCAMENTO_ARIDADE)))
+        f.write(struct.pack(f'<{len(niveis)}Q', *[len(nivel) for nivel in niveis]))
+        for nivel in niveis:
+            f.write(b''.join(bytes.fromhex(h) for h in nivel))
+
+
+def ler_num_niveis_aridade(campo):
+    return campo & MASCARA_NUM_NIVEIS, (campo >> DESLOCAMENTO_ARIDADE) or 2
+
+def carregar_niveis(nome_arquivo):
+    """Devolve (níveis, aridade) de um arquivo gravado pelo exportar_niveis"""
+    with open(nome_arquivo, 'rb') as f:
+        dados = f.read()
+    num_niveis, aridade = ler_num_niveis_aridade(struct.unpack_from('<I', dados, 0)[0])
+    if aridade not in ARIDADES:
+        raise ValueError(f"Aridade inválida no arquivo de níveis: {aridade}")
+    tamanhos = struct.unpack_from(f'<{num_niveis}Q', dados, 4)
+    posicao = 4 + 8 * num_niveis
+    niveis = []
+    for tamanho in tamanhos:
+        niveis.append([dados[posicao + i * TAMANHO_HASH:posicao + (i + 1) * TAMANHO_HASH].hex() for i in range(tamanho)])
+        posicao += tamanho * TAMANHO_HASH
+    return niveis, aridade
+
+
+class Replica:
+    """Uma cópia da árvore (níveis + transações na ordem das folhas) que responde consultas de outra réplica"""
+    def __init__(self, transacoes, niveis=None, aridade=2):
+        self.transacoes = list(transacoes)
+        self.aridade = aridade  # filhos por nó interno: a descida e o recálculo seguem a mesma regra da árvore
+        self.niveis = niveis if niveis is not None else montar_niveis([hash_transacao(t) for t in self.transacoes], aridade)
+        self.bytes_enviados = 0
+
+    @classmethod
+    def de_arvore(cls, arvore):
+        """Cria a réplica a partir de uma Merkle_tree já construída, sem recalcular os nós internos"""
+        niveis = arvore.niveis()
+        por_hash = {hash_transacao(t): t for t in arvore.transacoes_selecionadas}
+        return cls([por_hash[h] for h in niveis[0]], niveis, arvore.aridade) if niveis else cls([], [], arvore.aridade)
+
+    @classmethod
+    def de_arquivo(cls, nome_arquivo, transacoes=()):
+        niveis, aridade = carregar_niveis(nome_arquivo)
+        return cls(transacoes, niveis, aridade)
+
+    @property
+    def raiz(self):
+        return self.niveis[-1][0] if self.niveis and self.niveis[0] else None
+
+    # --- lado que responde (cada resposta conta os bytes que iriam pela rede) ---
+
+    def tamanhos_niveis(self):
+        self.bytes_enviados += 8 * len(self.niveis)
+        return [len(nivel) for nivel in self.niveis]
+
+    def hashes_nivel(self, nivel, posicoes):
+        self.bytes_enviados += TAMANHO_HASH * len(posicoes)
+        return [self.niveis[nivel][p] for p in posicoes]
+
+    def transacoes_nas_posicoes(self, posicoes):
+        resposta = [self.transacoes[p] for p in posicoes]
+        self.bytes_enviados += sum(len(t.encode('utf-8')) + 4 for t in resposta)
+        return resposta
+
+    # --- lado que pergunta ---
+
+    def diferenca(self, remota):
+        """Posições das folhas que diferem da réplica remota e bytes trocados (pedidos + respostas)"""
+        if remota.aridade != self.aridade:
+            raise ValueError(f"Réplicas com aridades diferentes ({self.aridade} e {remota.aridade}) não podem ser comparadas")
+        bytes_antes = remota.bytes_enviados
+        bytes_pedidos = 0
+
+        tamanhos_remotos = remota.tamanhos_niveis()
+        tamanhos_locais = [len(nivel) for nivel in self.niveis]
+        num_niveis = max(len(tamanhos_locais), len(tamanhos_remotos))
+
+        def tamanho(tamanhos, nivel):
+            return tamanhos[nivel] if nivel < len(tamanhos) else 0
+
+        # começa pelo nível mais alto das duas árvores e só desce onde os hashes diferem;
+        # se uma árvore for mais baixa, o nível que falta conta como diferente
+        nivel = num_niveis - 1
+        candidatas = list(range(max(tamanho(tamanhos_locais, nivel), tamanho(tamanhos_remotos, nivel))))
+        while True:
+            pedir = [p for p in candidatas if p < tamanho(tamanhos_remotos, nivel)]
+            bytes_pedidos += TAMANHO_POSICAO * len(pedir)
+            remotos = dict(zip(pedir, remota.hashes_nivel(nivel, pedir))) if pedir else {}
+
+            diferentes = []
+            for p in candidatas:
+                local = self.niveis[nivel][p] if p < tamanho(tamanhos_locais, nivel) else None
+                if local is None or remotos.get(p) != local:
+                    diferentes.append(p)
+
+            if nivel == 0 or not diferentes:
+                # pela regra de duplicação, [a, b, c] e [a, b, c, c] têm a mesma raiz:
+                # as folhas que só existem em uma das árvores sempre contam como diferentes
+                folhas_locais, folhas_remotas = tamanho(tamanhos_locais, 0), tamanho(tamanhos_remotos, 0)
+                if nivel != 0:
+                    diferentes = []
+                extras = range(min(folhas_locais, folhas_remotas), max(folhas_locais, folhas_remotas))
+                return sorted(set(diferentes).union(extras)), remota.bytes_enviados - bytes_antes + bytes_pedidos
+
+            nivel -= 1
+            limite = max(tamanho(tamanhos_locais, nivel), tamanho(tamanhos_remotos, nivel))
+            candidatas = [f for p in diferentes for f in range(self.aridade * p, self.aridade * (p + 1)) if f < limite]
+
+    def sincronizar_com(self, remota):
+        """Traz da réplica remota só as folhas diferentes e recalcula os ancestrais afetados"""
+        diferentes, bytes_trocados = self.diferenca(remota)
+        if not diferentes:
+            return diferentes, bytes_trocados
+
+        bytes_antes = remota.bytes_enviados
+        num_folhas_remoto = remota.tamanhos_niveis()[0]
+        presentes = [p for p in diferentes if p < num_folhas_remoto]
+        novas = dict(zip(presentes, remota.transacoes_nas_posicoes(presentes)))
+        bytes_trocados += remota.bytes_enviados - bytes_antes + TAMANHO_POSICAO * len(presentes)
+
+        # ajusta o tamanho e substitui as folhas diferentes
+        del self.transacoes[num_folhas_remoto:]
+        while len(self.transacoes) < num_folhas_remoto:
+            self.transacoes.append(None)
+        for p, transacao in novas.items():
+            self.transacoes[p] = transacao
+
+        if len(self.niveis[0]) != num_folhas_remoto:
+            # o formato da árvore mudou, os nós de borda mudam em todos os níveis
+            self.niveis = montar_niveis([hash_transacao(t) for t in self.transacoes], self.aridade)
+        else:
+            self._recalcular_caminhos(novas)
+        return diferentes, bytes_trocados
+
+    def _recalcular_caminhos(self, novas):
+        alteradas = set()
+        for p, transacao in novas.items():
+            self.niveis[0][p] = hash_transacao(transacao)
+            alteradas.add(p)
+
+        # cada pai alterado é recalculado uma vez só, mesmo se vários filhos mudaram
+        aridade = self.aridade
+        for nivel in range(1, len(self.niveis)):
+            abaixo = self.niveis[nivel - 1]
+            pais = {p // aridade for p in alteradas}
+            for pai in pais:
+                if aridade > 2:
+                    grupo = abaixo[aridade * pai:aridade * (pai + 1)]
+                    self.niveis[nivel][pai] = hash_grupo(completar_grupo(grupo, aridade))
+                else:
+                    esq = abaixo[2 * pai]
+                    dir = abaixo[2 * pai + 1] if 2 * pai + 1 < len(abaixo) else esq
+                    self.niveis[nivel][pai] = hash_pai(esq, dir)
+            alteradas = pais
+
+
+def diferenca_arvores(arvore_a, arvore_b):
+    """Posições das folhas em que duas Merkle_tree diferem (comparando a ordem das folhas)"""
+    replica_b = Replica([], arvore_b.niveis(), arvore_b.aridade)
+    posicoes, _ = Replica([], arvore_a.niveis(), arvore_a.aridade).diferenca(replica_b)
+    return posicoes
+
+
+def benchmark_sincronizacao(nome_arquivo="transacoes.txt", alteracoes=(1, 10, 100, 1000), prefixo_saida="resultados"):
+    """Compara bytes e tempo da sincronização por descida com a transferência completa"""
+    print(f"{'='*70}")
+    print("BENCHMARK: DIFERENÇA E SINCRONIZAÇÃO DE RÉPLICAS")
+    print(f"{'='*70}")
+
+    if not os.path.exists(nome_arquivo):
+        print(f"ERRO: Arquivo '{nome_arquivo}' não encontrado!")
+        return None
+
+    with open(nome_arquivo, "r", encoding="utf-8") as f:
+        transacoes = [linha.strip() for linha in f if linha.strip()]
+
+    bytes_completo = sum(len(t.encode('utf-8')) + 4 for t in transacoes)
+    linhas = []
+    for k in alteracoes:
+        k = min(k, len(transacoes))
+        remota_transacoes = list(transacoes)
+        for p in random.sample(range(len(transacoes)), k):
+            remota_transacoes[p] = f"alterada-{p}-{remota_transacoes[p]}"
+        remota = Replica(remota_transacoes)
+
+        local = Replica(transacoes)
+        inicio = time.perf_counter()
+        diferentes, bytes_trocados = local.sincronizar_com(remota)
+        tempo_sincronizacao = time.perf_counter() - inicio
+
+        # transferência completa: recebe tudo e reconstrói
+        inicio = time.perf_counter()
+        Replica(list(remota.transacoes))
+        tempo_completo = time.perf_counter() - inicio
+
+        ok = local.raiz == remota.raiz and len(diferentes) == k
+        print(f"  {k:5} folhas alteradas: {bytes_trocados:>9,} bytes em {tempo_sincronizacao*1000:8.2f} ms "
+              f"(completo: {bytes_completo:,} bytes em {tempo_completo*1000:.2f} ms) {'✓' if ok else '✗'}")
+        linhas.append([len(transacoes), k, bytes_trocados, round(tempo_sincronizacao, 6), bytes_completo, round(tempo_completo, 6)])
+
+    os.makedirs(prefixo_saida, exist_ok=True)
+    nome_csv = f"{prefixo_saida}/benchmark_sincronizacao.csv"
+    with open(nome_csv, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['num_transacoes', 'folhas_alteradas', 'bytes_sincronizacao', 'tempo_sincronizacao_seg',
+                         'bytes_transferencia_completa', 'tempo_transferencia_completa_seg'])
+        writer.writerows(linhas)
+    print(f"\n✓ Resultados salvos em: {nome_csv}")
+
+
+if __name__ == "__main__":
+    benchmark_sincronizacao(sys.argv[1] if len(sys.argv) > 1 else "transacoes.txt")
@@ -0,0 +1,281 @@
+# versionamento.py
+# Árvores de Merkle persistentes (copy-on-write): cada atualização cria uma nova raiz que
+# compartilha todos os nós que não mudaram, então leitores usam um snapshot sem precisar de lock
+import os
+import sys
+import csv
+import time
+import random
+import bisect
+import threading
+from collections import deque
+
+from blockchain import No, hash_transacao, hash_pai, aplicar_caminho
+
+
+def montar_nos(folhas):
+    # mesma construção do monta_tudo, só que iterativa
+    nivel = list(folhas)
+    altura = 0
+    while len(nivel) > 1:
+        proximo = []
+        for i in range(0, len(nivel), 2):
+            esq = nivel[i]
+            dir = nivel[i+1] if i+1 < len(nivel) else nivel[i]
+            proximo.append(No(hash_pai(esq.hash, dir.hash), esq, dir))
+        nivel = proximo
+        altura += 1
+    return nivel[0], altura
+
+
+class Versao:
+    """Snapshot imutável de uma versão da árvore; pode ser lido de qualquer thread sem lock"""
+    def __init__(self, numero, raiz, num_folhas, altura, posicoes):
+        self.numero = numero
+        self.raiz = raiz
+        self.num_folhas = num_folhas
+        self.altura = altura  # número de níveis acima das folhas
+        self.criada_em = time.time()
+        self._posicoes = posicoes  # índice compartilhado: hash da folha -> posições em alguma versão retida
+
+    def _descer(self, posicao):
+        # desce da raiz até a folha usando os bits da posição; devolve a folha e os irmãos do caminho
+        no = self.raiz
+        irmaos = []
+        for nivel in range(self.altura, 0, -1):
+            if (posicao >> (nivel - 1)) & 1:
+                irmaos.append((no.esq.hash, "esquerda"))
+                no = no.dir
+            else:
+                irmaos.append((no.dir.hash, "direita"))
+                no = no.esq
+        irmaos.reverse()
+        return no, irmaos
+
+    def busca_transacao(self, transacao):
+        """Posição da transação nesta versão, ou None"""
+        hash_folha = hash_transacao(transacao)
+        # list() copia o conjunto de uma vez (sob o GIL), então dá para ler sem lock enquanto o escritor mexe nele;
+        # o índice vale para todas as versões retidas, por isso a folha é conferida nesta versão
+        for posicao in list(self._posicoes.get(hash_folha, ())):
+            if posicao < self.num_folhas and self._descer(posicao)[0].hash == hash_folha:
+                return posicao
+        return None
+
+    def gerar_prova_inclusao(self, transacao):
+        posicao = self.busca_transacao(transacao)
+        if posicao is None:
+            return None
+        return self._descer(posicao)[1]
+
+    def verificar_prova(self, transacao, caminho):
+        return aplicar_caminho(hash_transacao(transacao), caminho) == self.raiz.hash
+
+
+class Arvore_versionada:
+    def __init__(self, transacoes=None, manter_ultimas=16, manter_segundos=None, folhas=None):
+        if folhas is None:
+            folhas = [No(valor_hash=hash_transacao(t)) for t in transacoes]
+        if not folhas:
+            raise ValueError("A árvore precisa de pelo menos uma transação")
+
+        self.manter_ultimas = manter_ultimas  # política de retenção por quantidade
+        self.manter_segundos = manter_segundos  # e/ou por idade
+        self.fixadas = set()  # versões que nunca são coletadas
+        self.lock_escrita = threading.Lock()  # só os escritores se excluem entre si
+
+        # hash da folha -> conjunto de posições em que ele está em alguma versão retida (sem repetição)
+        self._posicoes = {}
+        for posicao, folha in enumerate(folhas):
+            self._posicoes.setdefault(folha.hash, set()).add(posicao)
+        # só para as posições já reescritas: (versão em que o valor atual entrou, hash) e quantos
+        # intervalos ainda vivos (o atual e os encerrados não coletados) têm cada hash naquela posição
+        self._atuais = {}
+        self._vivos = {}
+        # intervalos encerrados (início, fim, posição, hash), em ordem de fim: ficam até nenhuma versão
+        # retida cair dentro deles; os que contêm uma versão fixada ficam para sempre
+        self._encerrados = deque()
+        self._presos = []
+
+        raiz, altura = montar_nos(folhas)
+        versao = Versao(0, raiz, len(folhas), altura, self._posicoes)
+        self.versoes = {0: versao}
+        self.atual = versao  # troca de referência é atômica: leitores pegam sempre uma versão completa
+
+    @classmethod
+    def de_arvore(cls, arvore, **kwargs):
+        """Passa a versionar uma Merkle_tree já construída, reaproveitando as folhas dela"""
+        return cls(folhas=arvore.folhas, **kwargs)
+
+    def snapshot(self, numero=None):
+        if numero is None:
+            return self.atual
+        return self.versoes.get(numero)
+
+    def _substituir(self, no, nivel, alteracoes):
+        # alteracoes: {posição relativa à subárvore: nova folha}
+        if nivel == 0:
+            return alteracoes[0]
+
+        metade = 1 << (nivel - 1)
+        esquerda = {p: f for p, f in alteracoes.items() if p < metade}
+        direita = {p - metade: f for p, f in alteracoes.items() if p >= metade}
+
+        novo_esq = self._substituir(no.esq, nivel - 1, esquerda) if esquerda else no.esq
+        if no.dir is no.esq:
+            novo_dir = novo_esq  # nó duplicado no fim de nível ímpar continua duplicado
+        else:
+            novo_dir = self._substituir(no.dir, nivel - 1, direita) if direita else no.dir
+        return No(hash_pai(novo_esq.hash, novo_dir.hash), novo_esq, novo_dir)
+
+    def atualizar_lote(self, alteracoes):
+        """Aplica {posição: nova transação} e publica uma nova versão; ancestrais comuns são recalculados uma vez"""
+        with self.lock_escrita:
+            base = self.atual
+            folhas = {}
+            for posicao, transacao in alteracoes.items():
+                if not 0 <= posicao < base.num_folhas:
+                    raise IndexError(f"Posição {posicao} fora da árvore (0..{base.num_folhas - 1})")
+                folhas[posicao] = No(valor_hash=hash_transacao(transacao))
+
+            raiz = self._substituir(base.raiz, base.altura, folhas)
+            numero = base.numero + 1
+            for posicao, folha in folhas.items():
+                self._registrar_escrita(base, numero, posicao, folha.hash)
+
+            versao = Versao(numero, raiz, base.num_folhas, base.altura, self._posicoes)
+            self.versoes[versao.numero] = versao
+            self.atual = versao
+            self.coletar_lixo()
+            return versao
+
+    def _registrar_escrita(self, base, numero, posicao, hash_folha):
+        if posicao in self._atuais:
+            inicio, anterior = self._atuais[posicao]
+        else:
+            inicio, anterior = 0, base._descer(posicao)[0].hash
+            self._vivos[posicao] = {anterior: 1}
+        if anterior == hash_folha:
+            return  # mesmo valor: a posição continua no mesmo intervalo, nada muda no índice
+        self._encerrados.append((inicio, numero - 1, posicao, anterior))
+        self._atuais[posicao] = (numero, hash_folha)
+        vivos = self._vivos[posicao]
+        vivos[hash_folha] = vivos.get(hash_folha, 0) + 1
+        self._posicoes.setdefault(hash_folha, set()).add(posicao)
+
+    def _podar_posicoes(self, numeros):
+        """Tira do índice os intervalos encerrados em que nenhuma versão retida cai"""
+        fixadas = sorted(n for n in self.fixadas if n in self.versoes)
+        # abaixo da versão retida mais antiga fora das fixadas, só as fixadas seguram um intervalo
+        limite = min((n for n in numeros if n not in self.fixadas), default=self.atual.numero)
+        while self._encerrados and self._encerrados[0][1] < limite:
+            intervalo = self._encerrados.popleft()
+            inicio, fim, posicao, hash_folha = intervalo
+            i = bisect.bisect_left(fixadas, inicio)
+            if i < len(fixadas) and fixadas[i] <= fim:
+                self._presos.append(intervalo)
+                continue
+            vivos = self._vivos[posicao]
+            vivos[hash_folha] -= 1
+            if not vivos[hash_folha]:
+                del vivos[hash_folha]
+                posicoes = self._posicoes[hash_folha]
+                posicoes.discard(posicao)
+                if not posicoes:
+                    del self._posicoes[hash_folha]
+
+    def atualizar(self, posicao, transacao):
+        return self.atualizar_lote({posicao: transacao})
+
+    def fixar(self, numero):
+        self.fixadas.add(numero)
+
+    def coletar_lixo(self):
+        """Remove as versões fora da política de retenção; os nós só delas são liberados pelo Python
+        quando nenhum leitor tiver mais o snapshot"""
+        agora = time.time()
+        numeros = sorted(self.versoes)
+        manter = set(numeros[-self.manter_ultimas:]) if self.manter_ultimas else set(numeros)
+        if self.manter_segundos is not None:
+            manter = {n for n in manter if agora - self.versoes[n].criada_em <= self.manter_segundos}
+        manter.add(self.atual.numero)
+        manter |= self.fixadas
+
+        removidas = [n for n in numeros if n not in manter]
+        for n in removidas:
+            del self.versoes[n]
+        # um snapshot já coletado que algum leitor ainda tenha pode não achar as posições que só ele usava
+        self._podar_posicoes(sorted(self.versoes))
+        return removidas
+
+
+def benchmark_versionamento(nome_arquivo="transacoes.txt", num_leitores=4, duracao=2.0, prefixo_saida="resultados"):
+    """Mede leituras (busca + prova) por segundo sem escrita e com um escritor contínuo"""
+    print(f"{'='*70}")
+    print("BENCHMARK: ÁRVORE VERSIONADA (COPY-ON-WRITE)")
+    print(f"{'='*70}")
+
+    if not os.path.exists(nome_arquivo):
+        print(f"ERRO: Arquivo '{nome_arquivo}' não encontrado!")
+        return None
+
+    with open(nome_arquivo, "r", encoding="utf-8") as f:
+        transacoes = [linha.strip() for linha in f if linha.strip()]
+
+    linhas = []
+    for com_escritor in (False, True):
+        arvore = Arvore_versionada(transacoes, manter_ultimas=64)
+        originais = list(transacoes)
+        parar = threading.Event()
+        leituras = [0] * num_leitores
+        inconsistentes = [0] * num_leitores
+        escritas = [0]
+
+        def leitor(indice):
+            while not parar.is_set():
+                versao = arvore.snapshot()  # snapshot consistente durante toda a leitura
+                transacao = random.choice(originais)
+                caminho = versao.gerar_prova_inclusao(transacao)
+                # a transação pode ter sido substituída nesta versão; se achou, a prova tem que bater
+                if caminho is not None and not versao.verificar_prova(transacao, caminho):
+                    inconsistentes[indice] += 1
+                leituras[indice] += 1
+
+        def escritor():
+            contador = 0
+            while not parar.is_set():
+                posicao = random.randrange(len(originais))
+                arvore.atualizar(posicao, f"nova-{contador}")
+                contador += 1
+            escritas[0] = contador
+
+        threads = [threading.Thread(target=leitor, args=(i,)) for i in range(num_leitores)]
+        if com_escritor:
+            threads.append(threading.Thread(target=escritor))
+        for t in threads:
+            t.start()
+        time.sleep(duracao)
+        parar.set()
+        for t in threads:
+            t.join()
+
+        taxa_leitura = sum(leituras) / duracao
+        taxa_escrita = escritas[0] / duracao
+        rotulo = "com escritor" if com_escritor else "sem escritor"
+        print(f"  {rotulo}: {taxa_leitura:,.0f} leituras/s, {taxa_escrita:,.0f} versões/s, "
+              f"{len(arvore.versoes)} versões retidas, inconsistências: {sum(inconsistentes)}")
+        linhas.append([len(transacoes), num_leitores, int(com_escritor), round(taxa_leitura, 1),
+                       round(taxa_escrita, 1), sum(inconsistentes)])
+
+    os.makedirs(prefixo_saida, exist_ok=True)
+    nome_csv = f"{prefixo_saida}/benchmark_versionamento.csv"
+    with open(nome_csv, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['num_transacoes', 'num_leitores', 'com_escritor', 'leituras_por_segundo',
+                         'versoes_por_segundo', 'inconsistencias'])
+        writer.writerows(linhas)
+    print(f"\n✓ Resultados salvos em: {nome_csv}")
+
+
+if __name__ == "__main__":
+    benchmark_versionamento(sys.argv[1] if len(sys.argv) > 1 else "transacoes.txt")